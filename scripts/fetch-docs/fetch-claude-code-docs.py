@@ -2,11 +2,22 @@
 """
 Claude Code 官方文档爬取脚本 (Playwright版)
 增加等待机制，处理网络慢的情况
+--incremental: 按清单做条件请求，未变化的文档不再获取和改写，最后输出变更列表
 """
 
 from playwright.sync_api import sync_playwright
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+import argparse
 import re
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "web"))
+from static_fetch import fetch_html, looks_like_js_shell
+from readiness import wait_for_ready
+from resource_profiles import ResourceStats, apply_resource_profile
+from incremental import Manifest, UNCHANGED
 
 # 目标文档 - 中文版 Claude Code 文档
 DOCS = {
@@ -22,6 +33,11 @@ DOCS = {
 }
 
 OUTPUT_DIR = Path(__file__).parent.parent / "docs" / "claude-code"
+# 增量清单是 SQLite 二进制文件（运行时还有 -wal/-shm），放在缓存目录而不是受版本管理的文档目录
+MANIFEST_PATH = Path.home() / ".cache" / "web-crawler" / "manifests" / "claude-code-docs.db"
+
+NOT_FOUND_TEXT = 'Page not found'  # 文档站 404 / 路由未完成时的占位文本
+NOT_FOUND_POLL_MS = 1000
 
 
 def clean_html_to_markdown(html_content: str) -> str:
@@ -132,63 +148,74 @@ def clean_html_to_markdown(html_content: str) -> str:
 def wait_for_page_load(page, timeout=45000):
     """
     等待页面加载完成
-    策略：
-    1. 等待 networkidle
-    2. 检测主要内容出现
-    3. 最多等待 timeout 秒
+    策略：网络短暂空闲 + DOM 静默 + 正文达到 500 字符，满足即返回，最多等待 timeout
     """
     print("  等待页面加载...")
 
-    # 策略1: 等待网络空闲（最可靠）
-    try:
-        page.wait_for_load_state("networkidle", timeout=30000)
-        print("  ✓ 网络空闲")
-    except Exception as e:
-        print(f"  ⚠ 网络idle超时: {e}")
-
-    # 策略2: 等待 body 内容开始渲染
-    try:
-        page.wait_for_selector('body', state='visible', timeout=15000)
-        print("  ✓ Body 可见")
-    except Exception as e:
-        print(f"  ⚠ Body超时: {e}")
-
-    # 策略3: 额外等待确保 JavaScript 执行
-    print("  等待 JavaScript 渲染...")
-    for i in range(9):  # 9 * 5s = 45s
-        page.wait_for_timeout(5000)
-
-        # 检测是否有主要内容
-        content = page.content()
-        if len(content) > 5000 and 'Page not found' not in content:
-            # 检查是否有实际内容
-            text = page.locator('body').text_content()
-            if text and len(text) > 500:
-                print(f"  ✓ 页面已渲染完成 ({len(text)} 字符)")
-                return True
-
-        print(f"  等待中... {(i+1)*5}s")
-
-    print("  ⚠ 等待超时，但尝试获取内容")
+    deadline = time.monotonic() + timeout / 1000
+    state = wait_for_ready(page, timeout / 1000, min_chars=500)
+    # 客户端路由完成前可能先渲染 'Page not found' 占位页，继续等到真实内容出现
+    while NOT_FOUND_TEXT in page.content():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            print(f"  ⚠ 页面仍显示 '{NOT_FOUND_TEXT}'，但尝试获取内容")
+            return True
+        page.wait_for_timeout(min(NOT_FOUND_POLL_MS, remaining * 1000))
+        state = wait_for_ready(page, max(0.0, deadline - time.monotonic()), min_chars=500)
+    if state['ready']:
+        print(f"  ✓ 页面已渲染完成 ({state['text_length']} 字符, {state['elapsed_ms']}ms)")
+    else:
+        print(f"  ⚠ 等待超时 ({state['reason']})，但尝试获取内容")
     return True
 
 
-def fetch_doc(name: str, url: str) -> str:
-    """爬取单个文档"""
+def response_validators(headers: Dict) -> Dict:
+    """响应头中的 ETag / Last-Modified（增量模式下次做条件请求用）"""
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    return {'etag': headers.get('etag'), 'last_modified': headers.get('last-modified')}
+
+
+def fetch_doc_static(url: str) -> Optional[Tuple[str, Dict]]:
+    """静态层：直接 HTTP 获取服务端渲染的 HTML，返回 (Markdown, 校验器)，不够用时返回 None"""
+    page = fetch_html(url)
+    if (page is None or page['status'] >= 400 or len(page['html']) < 5000
+            or NOT_FOUND_TEXT in page['html']):
+        return None
+
+    markdown_content = clean_html_to_markdown(page['html'])
+    if not markdown_content or len(markdown_content) < 500:
+        return None
+    if looks_like_js_shell(page['html'], markdown_content):
+        return None
+
+    return markdown_content, response_validators(page['headers'])
+
+
+def fetch_doc(name: str, url: str,
+              resource_stats: ResourceStats = None) -> Tuple[Optional[str], Dict]:
+    """爬取单个文档（先静态获取，失败再用浏览器渲染），返回 (Markdown, 校验器)"""
     print(f"\n{'='*50}")
     print(f"正在爬取: {name}")
     print(f"URL: {url}")
     print('='*50)
 
+    static = fetch_doc_static(url)
+    if static:
+        print(f"  ✓ 静态获取: {len(static[0])} 字符（未启动浏览器）")
+        return static
+
+    print("  静态内容不足，使用浏览器渲染...")
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False)
         context = browser.new_context()
+        apply_resource_profile(context, 'text-only', resource_stats)
         page = context.new_page()
 
         try:
             # 访问页面
             print("  正在访问页面...")
-            page.goto(url, wait_until="domcontentloaded", timeout=120000)
+            response = page.goto(url, wait_until="domcontentloaded", timeout=120000)
+            validators = response_validators(response.headers if response else {})
             print(f"  ✓ DOM 加载完成")
 
             # 等待页面加载
@@ -206,13 +233,13 @@ def fetch_doc(name: str, url: str) -> str:
             if len(html_content) < 5000:
                 print(f"  ✗ 内容太少: {len(html_content)} 字符")
                 browser.close()
-                return None
+                return None, {}
 
             # 检查标题是否包含 "Page not found"
-            if 'Page not found' in title:
+            if NOT_FOUND_TEXT in title:
                 print(f"  ✗ 页面不存在: {title}")
                 browser.close()
-                return None
+                return None, {}
 
             print(f"  ✓ 页面有效: {len(html_content)} 字符")
 
@@ -221,7 +248,7 @@ def fetch_doc(name: str, url: str) -> str:
             if not markdown_content or len(markdown_content) < 500:
                 print(f"  ✗ 转换失败或内容太少")
                 browser.close()
-                return None
+                return None, {}
 
             print(f"  ✓ 转换为 Markdown: {len(markdown_content)} 字符")
 
@@ -231,32 +258,55 @@ def fetch_doc(name: str, url: str) -> str:
                 print(f"  ✓ 文档标题: {title_match.group(1)}")
 
             browser.close()
-            return markdown_content
+            return markdown_content, validators
 
         except Exception as e:
             print(f"  ✗ 错误: {e}")
             browser.close()
-            return None
+            return None, {}
 
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='Claude Code 官方文档爬取工具')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'增量同步：条件请求未变化的文档直接跳过（清单: {MANIFEST_PATH}）')
+    args = parser.parse_args()
+
     print("Claude Code 官方文档爬取工具")
     print("="*50)
     print(f"目标: {len(DOCS)} 个文档")
-    print("每个文档最长等待: 45秒")
+    print("每个文档最长等待: 45秒（就绪即继续）")
     print("="*50)
 
     # 确保输出目录存在
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+    manifest = None
+    if args.incremental:
+        manifest = Manifest(MANIFEST_PATH)
+        manifest.begin({'docs': 'claude-code'})
+
     results = {}
+    resource_stats = ResourceStats()
 
     for name, url in DOCS.items():
-        content = fetch_doc(name, url)
+        output_file = OUTPUT_DIR / f"{name}.md"
+        if manifest is not None and output_file.exists() and manifest.check(url):
+            print(f"✓ 未变化: {name}（304，跳过）")
+            results[name] = "未变化"
+            continue
+
+        content, validators = fetch_doc(name, url, resource_stats)
         if content and len(content) > 500:
+            if manifest is not None:
+                change = manifest.record(url, content, name, validators)
+                if change == UNCHANGED and output_file.exists():
+                    print(f"✓ 内容未变化: {name}，不改写文件")
+                    results[name] = "未变化"
+                    continue
+
             # 保存文件
-            output_file = OUTPUT_DIR / f"{name}.md"
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(f"# {name.replace('-', ' ').title()} 官方文档\n\n")
                 f.write(f"> 来源: {url}\n\n")
@@ -269,15 +319,26 @@ def main():
         else:
             results[name] = "失败"
             print(f"✗ 跳过: {name}")
+            if manifest is not None:
+                manifest.touch(url)  # 获取失败不算删除
 
     # 打印总结
     print("\n" + "="*50)
     print("爬取完成!")
     print("="*50)
-    success = sum(1 for s in results.values() if s == "成功")
+    success = sum(1 for s in results.values() if s != "失败")
     print(f"成功: {success}/{len(results)}")
     for name, status in results.items():
         print(f"- {name}: {status}")
+    print(f"资源拦截 (text-only): {resource_stats.summary()}")
+
+    if manifest is not None:
+        changes = manifest.finish()
+        manifest.close()
+        print(f"\n增量: {manifest.summary()}")
+        for kind in ('added', 'modified', 'removed'):
+            for url in changes[kind]:
+                print(f"  {kind}: {url}")
 
 
 if __name__ == "__main__":
@@ -6,9 +6,13 @@ Headless UI (v1/vue) 文档爬取脚本
 
 import json
 import re
+import sys
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "web"))
+from resource_profiles import ResourceStats, apply_resource_profile
+
 # 输出目录
 OUTPUT_DIR = Path(__file__).parent.parent.parent / "docs" / "frameworks"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -269,14 +273,15 @@ def main():
     print(f"📦 共 {len(COMPONENTS)} 个组件")
 
     all_docs = []
+    resource_stats = ResourceStats()
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
         page.set_viewport_size({"width": 1280, "height": 800})
 
-        # 设置请求拦截，阻止图片和字体加载（加速）
-        page.route("**/*.{png,jpg,jpeg,gif,svg,woff,woff2,ttf}", lambda route: route.abort())
+        # 设置请求拦截，阻止图片、字体和统计脚本加载（加速）
+        apply_resource_profile(page, 'render', resource_stats)
 
         try:
             for component in COMPONENTS:
@@ -307,6 +312,7 @@ def main():
     print(f"   - 代码示例: {total_examples}")
     print(f"   - API 条目: {total_props}")
     print(f"   - 文档大小: {len(markdown) / 1024:.1f} KB")
+    print(f"   - 资源拦截 (render): {resource_stats.summary()}")
 
 
 if __name__ == "__main__":
@@ -6,9 +6,13 @@ Headless UI 文档爬取脚本
 
 import json
 import re
+import sys
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "web"))
+from resource_profiles import ResourceStats, apply_resource_profile
+
 # 输出目录
 OUTPUT_DIR = Path(__file__).parent.parent.parent / "docs" / "frameworks"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -204,6 +208,7 @@ def main():
     print(f"📁 输出目录: {OUTPUT_DIR}")
 
     all_docs = []
+    resource_stats = ResourceStats()
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
@@ -212,6 +217,9 @@ def main():
         # 设置视窗大小
         page.set_viewport_size({"width": 1280, "height": 800})
 
+        # 阻止图片、字体和统计脚本加载（加速）
+        apply_resource_profile(page, 'render', resource_stats)
+
         try:
             for component in COMPONENTS:
                 print(f"\n📦 处理组件: {component}")
@@ -244,6 +252,7 @@ def main():
 
     print(f"\n✅ 完成！文档已保存到: {output_file}")
     print(f"📊 共处理 {len(all_docs)} 个组件")
+    print(f"🚫 资源拦截 (render): {resource_stats.summary()}")
 
 
 if __name__ == "__main__":
@@ -5,9 +5,14 @@ https://www.radix-vue.com/
 """
 
 import re
+import sys
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "web"))
+from readiness import wait_for_ready
+from resource_profiles import ResourceStats, apply_resource_profile
+
 OUTPUT_DIR = Path(__file__).parent.parent.parent / "docs" / "frameworks"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -30,7 +35,7 @@ def extract_component_docs(page, component):
 
     try:
         page.goto(url, wait_until="networkidle", timeout=30000)
-        page.wait_for_timeout(2000)
+        wait_for_ready(page, 2)
 
         docs = {
             "name": name,
@@ -357,17 +362,15 @@ def main():
     print(f"📦 共 {len(CORE_COMPONENTS)} 个核心组件")
 
     all_docs = []
+    resource_stats = ResourceStats()
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
         page.set_viewport_size({"width": 1280, "height": 800})
 
-        # 阻止图片和字体加载（加速）
-        page.route(
-            "**/*.{png,jpg,jpeg,gif,svg,woff,woff2,ttf,eot}",
-            lambda route: route.abort(),
-        )
+        # 阻止图片、字体和统计脚本加载（加速），保留 CSS
+        apply_resource_profile(page, 'render', resource_stats)
 
         try:
             for component in CORE_COMPONENTS:
@@ -400,6 +403,7 @@ def main():
     print(f"   - Props: {total_props}")
     print(f"   - Events: {total_events}")
     print(f"   - 文档大小: {len(markdown) / 1024:.1f} KB")
+    print(f"   - 资源拦截 (render): {resource_stats.summary()}")
 
 
 if __name__ == "__main__":
@@ -6,10 +6,15 @@ Claude Code 文档爬取脚本 (使用 Playwright)
 
 import os
 import re
-import time
+import sys
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, str(Path(__file__).parent / "web"))
+from readiness import wait_for_ready
+from resource_profiles import ResourceStats, apply_resource_profile
+from politeness import PolitenessScheduler
+
 # 要获取的核心文档列表
 CORE_DOCS = [
     "skills",
@@ -109,15 +114,18 @@ def clean_html_to_markdown(html_content):
     return text
 
 
-def fetch_page(url, playwright):
+def fetch_page(url, playwright, scheduler=None, resource_stats=None):
     """获取页面内容"""
     browser = playwright.chromium.launch(headless=True)
     page = browser.new_page()
+    apply_resource_profile(page, 'text-only', resource_stats)
 
     try:
-        page.goto(url, wait_until="networkidle", timeout=30000)
-        # 等待页面加载完成
-        time.sleep(2)
+        response = page.goto(url, wait_until="networkidle", timeout=30000)
+        if response is not None and scheduler is not None:
+            scheduler.report(url, response.status, response.headers)
+        # 等待页面渲染稳定（最多 2 秒）
+        wait_for_ready(page, 2)
 
         # 获取渲染后的 HTML
         html = page.content()
@@ -171,6 +179,10 @@ def main():
     print(f"Output directory: {OUTPUT_DIR}")
     print(f"Fetching {len(CORE_DOCS)} core documents with Playwright...\n")
 
+    # 每秒最多 1 个请求（同时遵守 robots.txt 和 429/503 退避），替代固定 sleep
+    scheduler = PolitenessScheduler(rate=1.0, burst=1, host_concurrency=1)
+    resource_stats = ResourceStats()
+
     with sync_playwright() as playwright:
         success_count = 0
         failed_docs = []
@@ -179,7 +191,8 @@ def main():
             url = f"{BASE_URL}/{doc}"
             print(f"[{i+1}/{len(CORE_DOCS)}] Fetching: {doc}")
 
-            html = fetch_page(url, playwright)
+            with scheduler.slot(url):
+                html = fetch_page(url, playwright, scheduler, resource_stats)
             if html:
                 # 提取标题
                 title = extract_title(html)
@@ -198,10 +211,9 @@ def main():
                 print(f"  -> Failed to fetch")
                 failed_docs.append(doc)
 
-            time.sleep(1)  # 避免请求过快
-
     print(f"\n{'='*50}")
     print(f"Completed: {success_count}/{len(CORE_DOCS)} successful")
+    print(f"Resource profile (text-only): {resource_stats.summary()}")
 
     if failed_docs:
         print(f"Failed: {', '.join(failed_docs)}")
@@ -7,6 +7,23 @@ from .url_pattern_analyzer import URLPatternAnalyzer, analyze_urls
 from .batch_crawler import BatchCrawler
 from .structured_extractor import StructuredExtractor
 from .report_generator import ReportGenerator
+from .browser_pool import BrowserPool, AsyncBrowserPool
+from .page_pool import PagePool, AsyncPagePool
+from .page_cache import PageCache
+from .crawl_store import CrawlStore
+from .frontier import PriorityFrontier, URLScorer
+from .url_seen import URLSeen
+from .dedup import DuplicateIndex
+from .jsonl_sink import JSONLSink, iter_jsonl
+from .incremental import Manifest
+from .timing import TimingRecorder
+from .politeness import PolitenessScheduler
+from .resource_profiles import ResourceStats, apply_resource_profile
+from .retry_policy import RetryPolicy, CircuitBreaker, FetchError
+from .budget import Budget
+from .sessions import SessionStore
+from .blob_store import BlobStore
+from .docs_index import DocsIndex
 
 __all__ = [
     'fetch_single_url',
@@ -17,4 +34,28 @@ __all__ = [
     'BatchCrawler',
     'StructuredExtractor',
     'ReportGenerator',
+    'BrowserPool',
+    'AsyncBrowserPool',
+    'PagePool',
+    'AsyncPagePool',
+    'PageCache',
+    'CrawlStore',
+    'PriorityFrontier',
+    'URLScorer',
+    'URLSeen',
+    'DuplicateIndex',
+    'JSONLSink',
+    'iter_jsonl',
+    'Manifest',
+    'TimingRecorder',
+    'PolitenessScheduler',
+    'ResourceStats',
+    'apply_resource_profile',
+    'RetryPolicy',
+    'CircuitBreaker',
+    'FetchError',
+    'Budget',
+    'SessionStore',
+    'BlobStore',
+    'DocsIndex',
 ]
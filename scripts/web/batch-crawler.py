@@ -8,17 +8,57 @@
 - 从 URL 模式批量生成 URL
 - 并发爬取
 - 进度显示
+- 状态落盘，中断后 --resume 跳过已完成的 URL
+- 按主机限速/限并发，多主机时可放心调高全局并发
+- 按失败类型重试（404/DNS 不重试，5xx/超时退避加抖动），主机连续失败时熔断
+- 时间预算：全局截止时间到了不再开始新 URL，已完成的结果照常保存；单页、单主机预算
+- 登录会话（--sessions）：注入 browser-session.py 录制的 Cookie 和 localStorage
+- 正文存储（--blob-store）：正文按内容哈希压缩保存一次，JSON/JSONL 和状态文件只记哈希
+- 流式 JSONL 输出：每个页面完成即追加落盘，内存中只保留摘要
+- 分阶段计时：排队、限速、取浏览器、导航、渲染、提取、写入各自的 p50/p95/p99
 """
 
 import argparse
+import importlib.util
 import sys
 import time
 import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from fetch_url import retry_fetch, normalize_url, is_same_domain
+from retry_policy import (FetchError, RetryPolicy, CircuitBreaker, DEFAULT_BREAKER_THRESHOLD,
+                          DEFAULT_BREAKER_COOLDOWN, summarize_outcomes)
+from budget import Budget, DEFAULT_PAGE_BUDGET
+from browser_pool import BrowserPool, DEFAULT_PAGES_PER_BROWSER
+from page_pool import PagePool
+from sessions import SessionStore, DEFAULT_SESSION_DIR
+from blob_store import BlobStore
+from page_cache import PageCache, DEFAULT_TTL
+from resource_profiles import PROFILES, DEFAULT_PROFILE, ResourceStats, apply_resource_profile
+from crawl_store import CrawlStore
+from politeness import PolitenessScheduler, DEFAULT_RATE
+from dedup import DuplicateIndex
+from jsonl_sink import JSONLSink, iter_jsonl, jsonl_path
+from timing import PageTimer, TimingRecorder
+
+
+def _load_fetch_url():
+    """fetch-url.py 带连字符不能按模块名导入，按路径加载并登记为 fetch_url（已加载则直接复用）"""
+    if 'fetch_url' in sys.modules:
+        return sys.modules['fetch_url']
+    spec = importlib.util.spec_from_file_location('fetch_url', Path(__file__).parent / 'fetch-url.py')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['fetch_url'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+fetch_url = _load_fetch_url()
+retry_fetch = fetch_url.retry_fetch
+normalize_url = fetch_url.normalize_url
+is_same_domain = fetch_url.is_same_domain
 
 
 class BatchCrawler:
@@ -28,17 +68,59 @@ class BatchCrawler:
                  concurrency: int = 3,
                  wait_time: int = 5,
                  max_retries: int = 3,
-                 output_dir: str = None):
+                 output_dir: str = None,
+                 pages_per_browser: int = DEFAULT_PAGES_PER_BROWSER,
+                 cache: PageCache = None,
+                 static_first: bool = False,
+                 resource_profile: str = DEFAULT_PROFILE,
+                 store: CrawlStore = None,
+                 resume: bool = False,
+                 scheduler: PolitenessScheduler = None,
+                 dedup: bool = True,
+                 sink: JSONLSink = None,
+                 timing: TimingRecorder = None,
+                 breaker: CircuitBreaker = None,
+                 budget: Budget = None,
+                 reuse_tabs: bool = False,
+                 sessions: SessionStore = None,
+                 blobs: BlobStore = None):
         self.concurrency = concurrency
         self.wait_time = wait_time
         self.max_retries = max_retries
         self.output_dir = Path(output_dir) if output_dir else None
 
+        # 每个工作线程一个长期存活的浏览器，URL 和重试之间复用
+        self.pool = BrowserPool(size=concurrency, max_pages_per_browser=pages_per_browser)
+        self.cache = cache
+        self.static_first = static_first
+        self.resource_profile = resource_profile
+        self.resource_stats = ResourceStats()
+        self.sessions = sessions
+        # 复用标签页：每个线程按源保留 context 和标签页，不再每个 URL 新建 context
+        self.pages = PagePool(self.pool, setup=lambda context: apply_resource_profile(
+            context, resource_profile, self.resource_stats), sessions=sessions) if reuse_tabs else None
+        self.store = store
+        self.resume = resume
+        self.scheduler = scheduler
+        self.dedup = DuplicateIndex() if dedup else None
+        # 有 sink 时成功的条目逐条写入 JSONL，self.results 只保留不含正文的摘要
+        self.sink = sink
+        # 正文存储：条目中只留 blob 哈希，每次 crawl() 登记为一个 run
+        self.blobs = blobs
+        self.blob_run: Optional[int] = None
+        self.timing = timing if timing is not None else TimingRecorder()
+        # 按失败类型重试；breaker 为 None 时不熔断
+        self.policy = RetryPolicy(max_retries)
+        self.breaker = breaker
+        # 时间预算；到截止时间或主机预算用完时 URL 跳过（不算失败，--resume 时会重新爬取）
+        self.budget = budget
+
         if self.output_dir:
             self.output_dir.mkdir(parents=True, exist_ok=True)
 
         self.results: List[Dict] = []
         self.failed: List[Dict] = []
+        self.skipped: List[Dict] = []
 
     def load_urls_from_file(self, filepath: str) -> List[str]:
         """从文件加载 URL"""
@@ -62,21 +144,54 @@ class BatchCrawler:
             urls.append(url)
         return urls
 
-    def crawl_url(self, url: str) -> Dict:
-        """爬取单个 URL"""
+    def crawl_url(self, url: str, timer: PageTimer = None) -> Dict:
+        """爬取单个 URL（timer 在提交时创建，开始前的等待记为 queue）"""
         start_time = time.time()
-
-        result = retry_fetch(url, self.wait_time, self.max_retries)
+        if timer is not None:
+            timer.add('queue', timer.elapsed_ms())
+
+        if self.budget is not None:
+            reason = self.budget.allow(url)
+            if reason:
+                return {'url': url, 'success': False, 'skipped': reason, 'elapsed': 0.0}
+
+        try:
+            result = retry_fetch(url, self.wait_time, self.max_retries,
+                                 pool=self.pool, cache=self.cache,
+                                 static_first=self.static_first,
+                                 resource_profile=self.resource_profile,
+                                 resource_stats=self.resource_stats,
+                                 scheduler=self.scheduler,
+                                 timer=timer,
+                                 policy=self.policy,
+                                 breaker=self.breaker,
+                                 budget=self.budget,
+                                 pages=self.pages,
+                                 sessions=self.sessions,
+                                 raise_errors=True)
+            error = None
+        except FetchError as e:
+            result, error = None, e
 
         elapsed = time.time() - start_time
+        if self.budget is not None:
+            self.budget.charge(url, elapsed)
 
         if result:
+            duplicate_of = self.dedup.check(url, result.get('content', '')) if self.dedup else None
+            if duplicate_of:
+                result['content'] = ''  # 与规范页内容相同，不重复保存
+            content_length = len(result.get('content', ''))
+            if self.blobs is not None:
+                self.blobs.detach(self.blob_run, url, result)
             return {
                 'url': url,
                 'success': True,
+                'duplicate_of': duplicate_of,
                 'title': result.get('title', ''),
-                'content_length': len(result.get('content', '')),
+                'content_length': content_length,
                 'elapsed': elapsed,
+                'tier': result.get('tier', 'browser'),
                 'result': result
             }
         else:
@@ -84,32 +199,59 @@ class BatchCrawler:
                 'url': url,
                 'success': False,
                 'elapsed': elapsed,
-                'error': 'Failed to fetch'
+                'outcome': error.outcome,
+                'status': error.status,
+                'error': str(error)
             }
 
     def crawl(self, urls: List[str], show_progress: bool = True) -> List[Dict]:
         """批量爬取"""
+        results = []
+        if self.blobs is not None:
+            self.blob_run = self.blobs.begin_run('batch')
+
+        if self.store is not None:
+            self.store.begin({'mode': 'batch'}, resume=self.resume)
+            self.store.add((url, 0) for url in urls)
+            if self.resume:
+                # 已完成的 URL 直接取回结果，只爬剩下的
+                results = [self._record(self._detach(entry)) for entry in self.store.iter_results()]
+                finished = self.store.finished()
+                urls = [url for url in urls if url not in finished]
+                print(f"从断点恢复: 已完成 {len(results)}, 剩余 {len(urls)}")
+
         total = len(urls)
         completed = 0
-        results = []
 
         print(f"\n开始批量爬取: {total} 个 URL")
         print(f"并发数: {self.concurrency}")
+        if self.scheduler is not None:
+            print(f"礼貌调度: {self.scheduler.describe()}")
         print(f"重试次数: {self.max_retries}")
         print("-" * 50)
 
         with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            timers = {url: self.timing.start(url) for url in urls}
             future_to_url = {
-                executor.submit(self.crawl_url, url): url
+                executor.submit(self.crawl_url, url, timers[url]): url
                 for url in urls
             }
 
             for future in as_completed(future_to_url):
                 completed += 1
+                timer = timers.pop(future_to_url[future])
 
                 try:
                     result = future.result()
-                    results.append(result)
+                    if result.get('skipped'):
+                        # 未开始的 URL 留在状态存储的待爬队列中
+                        results.append(result)
+                        continue
+                    with timer.span('write'):
+                        if self.store is not None:
+                            self.store.complete(result['url'], result if result['success'] else None)
+                        results.append(self._record(result))
+                    self.timing.finish(timer, tier=result.get('tier'), ok=result['success'])
 
                     if result['success']:
                         if show_progress:
@@ -125,23 +267,57 @@ class BatchCrawler:
                         'success': False,
                         'error': str(e)
                     })
+                    if self.store is not None:
+                        self.store.complete(url, None)
+                    self.timing.finish(timer, ok=False)
                     if show_progress:
                         print(f"[{completed}/{total}] ✗ {url[:50]} - Error: {e}")
 
+            # 浏览器只能在各自的工作线程里关闭
+            self.pool.shutdown(executor)
+
         self.results = [r for r in results if r['success']]
-        self.failed = [r for r in results if not r['success']]
+        self.failed = [r for r in results if not r['success'] and not r.get('skipped')]
+        self.skipped = [r for r in results if r.get('skipped')]
+        if self.skipped:
+            print(f"时间预算: {len(self.skipped)} 个 URL 未开始")
+        if self.blobs is not None:
+            self.blobs.finish_run(self.blob_run)
 
         return results
 
+    def _detach(self, entry: Dict) -> Dict:
+        """断点续爬读回的条目也登记到本次 run（旧状态文件中的正文顺带存入正文存储）"""
+        if self.blobs is not None and entry.get('result'):
+            self.blobs.detach(self.blob_run, entry['url'], entry['result'])
+        return entry
+
+    def _record(self, entry: Dict) -> Dict:
+        """成功的条目写入 JSONL，只把摘要留在内存中"""
+        if self.sink is None or not entry['success']:
+            return entry
+        self.sink.write(entry)
+        return {k: v for k, v in entry.items() if k != 'result'}
+
+    def iter_results(self) -> Iterator[Dict]:
+        """成功的条目（流式输出时从 JSONL 读回）"""
+        if self.sink is None:
+            return iter(self.results)
+        self.sink.flush()
+        return iter_jsonl(self.sink.path)
+
     def save_results(self, prefix: str = "crawl") -> Dict:
         """保存结果"""
         if not self.output_dir:
             return {}
 
-        # 保存成功的结果
-        success_file = self.output_dir / f"{prefix}-success.json"
-        with open(success_file, 'w') as f:
-            json.dump(self.results, f, indent=2, ensure_ascii=False)
+        # 保存成功的结果（流式输出时已经在 JSONL 中）
+        if self.sink is not None:
+            success_file = self.sink.path
+        else:
+            success_file = self.output_dir / f"{prefix}-success.json"
+            with open(success_file, 'w') as f:
+                json.dump(self.results, f, indent=2, ensure_ascii=False, default=sorted)
 
         # 保存失败的结果
         failed_file = self.output_dir / f"{prefix}-failed.json"
@@ -153,13 +329,23 @@ class BatchCrawler:
         with open(md_file, 'w') as f:
             f.write(f"# 爬取结果\n\n")
             f.write(f"**成功**: {len(self.results)}\n")
-            f.write(f"**失败**: {len(self.failed)}\n\n")
-            f.write("---\n\n")
-
-            for i, result in enumerate(self.results, 1):
+            f.write(f"**失败**: {len(self.failed)}\n")
+            if self.skipped:
+                f.write(f"**超出时间预算未爬取**: {len(self.skipped)}\n")
+            duplicates = [r for r in self.results if r.get('duplicate_of')]
+            if duplicates:
+                f.write(f"**近重复（已折叠）**: {len(duplicates)}\n")
+            f.write("\n---\n\n")
+
+            i = 0
+            for result in self.iter_results():
+                if result.get('duplicate_of'):
+                    continue
+                i += 1
                 f.write(f"## {i}. {result.get('title', 'Untitled')}\n\n")
                 f.write(f"**URL**: {result['url']}\n\n")
-                content = result.get('result', {}).get('content', '')
+                page = result.get('result', {})
+                content = self.blobs.text(page) if self.blobs is not None else page.get('content', '')
                 # 限制长度
                 if len(content) > 2000:
                     content = content[:2000] + "\n\n... (truncated)"
@@ -179,17 +365,30 @@ class BatchCrawler:
 
     def get_summary(self) -> Dict:
         """获取摘要"""
-        total = len(self.results) + len(self.failed)
+        total = len(self.results) + len(self.failed) + len(self.skipped)
         success_rate = len(self.results) / total * 100 if total > 0 else 0
 
-        avg_time = sum(r['elapsed'] for r in self.results) / len(self.results) if self.results else 0
+        avg_time = sum(r.get('elapsed', 0) for r in self.results) / len(self.results) if self.results else 0
 
         return {
             'total': total,
             'success': len(self.results),
             'failed': len(self.failed),
+            'skipped': len(self.skipped),
             'success_rate': f"{success_rate:.1f}%",
-            'avg_time': f"{avg_time:.2f}s"
+            'avg_time': f"{avg_time:.2f}s",
+            'browser_launches': self.pool.launches,
+            'tabs': self.pages.get_stats() if self.pages else None,
+            'tiers': dict(Counter(r.get('tier', 'browser') for r in self.results)),
+            'resources': self.resource_stats.to_dict(),
+            'politeness': self.scheduler.get_stats() if self.scheduler else None,
+            'duplicates': self.dedup.duplicates if self.dedup else 0,
+            'failures': dict(Counter(r.get('outcome', 'error') for r in self.failed)),
+            'breaker': self.breaker.get_stats() if self.breaker else None,
+            'budget': self.budget.get_stats() if self.budget else None,
+            'sessions': self.sessions.get_stats() if self.sessions else None,
+            'blobs': self.blobs.get_stats() if self.blobs else None,
+            'timing': self.timing.report()['phases']
         }
 
 
@@ -253,8 +452,49 @@ def main():
     parser.add_argument('-u', '--url', help='单个 URL（可多次使用）', action='append')
     parser.add_argument('-o', '--output', help='输出目录')
     parser.add_argument('-c', '--concurrency', type=int, default=3, help='并发数')
-    parser.add_argument('-w', '--wait', type=int, default=5, help='等待秒数')
-    parser.add_argument('-r', '--retries', type=int, default=3, help='重试次数')
+    parser.add_argument('-w', '--wait', type=int, default=5, help='最长等待秒数（页面就绪后提前返回）')
+    parser.add_argument('-r', '--retries', type=int, default=3,
+                        help='每个 URL 最多尝试次数，实际重试按失败类型决定')
+    parser.add_argument('--breaker', type=int, default=DEFAULT_BREAKER_THRESHOLD,
+                        help='同一主机连续 N 次超时/连接错误/5xx 后熔断，0 关闭')
+    parser.add_argument('--breaker-cooldown', type=float, default=DEFAULT_BREAKER_COOLDOWN,
+                        help='熔断后多少秒再放行一个探测请求')
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help='总时长上限：到点前不再开始新 URL，已完成的结果照常保存')
+    parser.add_argument('--page-budget', type=float, default=DEFAULT_PAGE_BUDGET, metavar='SECONDS',
+                        help='单页预算，导航、等待就绪和提取合计')
+    parser.add_argument('--host-budget', type=float, metavar='SECONDS',
+                        help='每个主机累计页面耗时上限')
+    parser.add_argument('--pages-per-browser', type=int, default=DEFAULT_PAGES_PER_BROWSER,
+                        help='每个浏览器服务多少页面后回收')
+    parser.add_argument('--reuse-tabs', action='store_true',
+                        help='每个线程按源复用 context 和标签页（about:blank 复位），不再每个 URL 新建 context')
+    parser.add_argument('--sessions', nargs='?', const=str(DEFAULT_SESSION_DIR), metavar='DIR',
+                        help=f'注入 browser-session.py 录制的登录会话 (目录默认: {DEFAULT_SESSION_DIR})')
+    parser.add_argument('--session-ttl', type=float, metavar='SECONDS',
+                        help='会话最长使用时间，超过后视为过期并刷新（默认只看 Cookie 过期时间）')
+    parser.add_argument('--static-first', action='store_true',
+                        help='先静态抓取，必要时再用浏览器')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help='资源拦截配置')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'每个主机每秒请求数，0 不限速 (默认: {DEFAULT_RATE:g})')
+    parser.add_argument('--host-concurrency', type=int,
+                        help='每个主机同时在途的请求数 (默认: 与 -c 相同)')
+    parser.add_argument('--ignore-robots', action='store_true',
+                        help='不读取 robots.txt 的 Crawl-delay')
+    parser.add_argument('--no-dedup', action='store_true', help='关闭近重复页面检测')
+    parser.add_argument('--timing', metavar='EVENTS', help='分阶段耗时事件文件 (JSONL)')
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help='结束后把各阶段 p50/p95/p99 写成 Prometheus textfile')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                        help='JSONL 输出的压缩方式（zstd 需要 pip install zstandard）')
+    parser.add_argument('--blob-store', metavar='DIR',
+                        help='正文存储目录：正文按内容哈希压缩保存（算法同 --compress，默认 gzip），输出只记录哈希')
+    parser.add_argument('--state', help='状态文件 (SQLite)，默认为 <output>/batch.state.db')
+    parser.add_argument('--resume', action='store_true', help='从状态文件断点续爬')
+    parser.add_argument('--cache', help='页面缓存文件路径 (SQLite)')
+    parser.add_argument('--cache-ttl', type=int, default=DEFAULT_TTL, help='缓存新鲜期秒数')
 
     args = parser.parse_args()
 
@@ -271,14 +511,69 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    state = args.state
+    if state is None and args.output:
+        state = str(Path(args.output) / 'batch.state.db')
+    if args.resume and state is None:
+        print("错误: --resume 需要 --state 或 --output 来定位状态文件")
+        sys.exit(1)
+    store = CrawlStore(state) if state else None
+
+    # 有输出目录时成功的条目逐条写入 <output>/batch.jsonl
+    sink = None
+    if args.output:
+        try:
+            sink = JSONLSink(jsonl_path(Path(args.output) / 'batch', args.compress))
+        except RuntimeError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+
+    try:
+        blobs = BlobStore(args.blob_store, args.compress) if args.blob_store else None
+    except RuntimeError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
     crawler = BatchCrawler(
         concurrency=args.concurrency,
         wait_time=args.wait,
         max_retries=args.retries,
-        output_dir=args.output
+        output_dir=args.output,
+        pages_per_browser=args.pages_per_browser,
+        cache=PageCache(args.cache, ttl=args.cache_ttl) if args.cache else None,
+        static_first=args.static_first,
+        resource_profile=args.profile,
+        store=store,
+        resume=args.resume,
+        scheduler=PolitenessScheduler(rate=args.rate,
+                                      host_concurrency=args.host_concurrency or args.concurrency,
+                                      respect_robots=not args.ignore_robots),
+        dedup=not args.no_dedup,
+        sink=sink,
+        timing=TimingRecorder(args.timing),
+        breaker=CircuitBreaker(args.breaker, args.breaker_cooldown) if args.breaker > 0 else None,
+        budget=Budget(deadline=args.deadline, page=args.page_budget, host=args.host_budget),
+        reuse_tabs=args.reuse_tabs,
+        sessions=SessionStore(args.sessions, ttl=args.session_ttl) if args.sessions else None,
+        blobs=blobs
     )
 
-    results = crawler.crawl(urls)
+    try:
+        results = crawler.crawl(urls)
+    except KeyboardInterrupt:
+        print("\n已中断")
+        if store is not None:
+            print(f"使用 --resume 从断点继续: {state}")
+        sys.exit(130)
+    except ValueError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    finally:
+        if sink is not None:
+            sink.close()
+        if store is not None:
+            store.close()
+        crawler.timing.close()
 
     summary = crawler.get_summary()
 
@@ -286,6 +581,30 @@ def main():
     print(f"爬取完成!")
     print(f"成功: {summary['success']}/{summary['total']} ({summary['success_rate']})")
     print(f"平均耗时: {summary['avg_time']}")
+    print(f"浏览器启动: {summary['browser_launches']} 次")
+    if crawler.pages is not None:
+        print(f"标签页: {crawler.pages.summary()}")
+    print("获取方式: " + ", ".join(f"{tier} {count}" for tier, count in summary['tiers'].items()))
+    print(f"资源拦截 ({args.profile}): {crawler.resource_stats.summary()}")
+    print(f"礼貌调度: {crawler.scheduler.summary()}")
+    if summary['duplicates']:
+        print(f"近重复: {summary['duplicates']} 个")
+    if summary['failures']:
+        print(f"失败原因: {summarize_outcomes(Counter(summary['failures']))}")
+    if summary['breaker'] and summary['breaker']['opened']:
+        print(f"熔断: {crawler.breaker.summary()}")
+    print(f"时间预算: {crawler.budget.summary()}")
+    if crawler.sessions is not None:
+        print(f"登录会话: {crawler.sessions.summary()}")
+    if blobs is not None:
+        print(f"正文存储: {blobs.summary()}（run {crawler.blob_run}: {blobs.directory}）")
+    if summary['skipped'] and store is not None:
+        print(f"  {summary['skipped']} 个 URL 未开始，使用 --resume 继续: {state}")
+    print("分阶段耗时:")
+    print(crawler.timing.summary())
+    if args.prometheus:
+        crawler.timing.write_prometheus(args.prometheus, job='batch')
+        print(f"Prometheus 指标: {args.prometheus}")
     print(f"{'='*50}")
 
     if args.output:
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+内容寻址的正文存储
+页面正文按内容哈希压缩保存一次，JSONL / JSON / 状态文件只记录哈希（blob 字段），
+Markdown 和报告生成时再从这里读出；同一正文跨运行、跨输出格式只存一份
+
+- blobs/<前两位>/<sha256>.gz|.zst：单个页面正文，gzip 或 zstd（需 pip install zstandard）压缩
+- index.db：运行（run）和 (run, URL) → blob 的索引，可以列出任一次运行的全部页面
+- 写入前按哈希查重，未变化的页面不再占用空间；增量模式下未重新获取的页面直接沿用上一次的 blob
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from jsonl_sink import COMPRESSION_SUFFIXES
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# ============ 配置 ============
+
+DEFAULT_COMPRESSION = 'gzip'
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10  # 正文写一次读多次，压缩级别取高一些
+
+
+class BlobStore:
+    """内容寻址的正文存储 + (run, URL) 索引（线程安全）"""
+
+    def __init__(self, directory: str, compression: str = None):
+        self.directory = Path(directory)
+        self.compression = compression or DEFAULT_COMPRESSION
+        if self.compression == 'zstd' and zstandard is None:
+            raise RuntimeError("zstd 压缩需要安装 zstandard: pip install zstandard")
+        (self.directory / 'blobs').mkdir(parents=True, exist_ok=True)
+
+        # 站点爬取经 asyncio.to_thread、批量爬取的工作线程都会写入，统一加锁
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / 'index.db'), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                compression TEXT,
+                size INTEGER,
+                stored INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                run INTEGER,
+                url TEXT,
+                blob TEXT,
+                title TEXT,
+                PRIMARY KEY (run, url)
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_url ON entries(url, run);
+        """)
+        self._conn.commit()
+        self.stats = {'written': 0, 'reused': 0, 'carried': 0, 'bytes': 0, 'stored_bytes': 0}
+
+    # ---------- blob ----------
+
+    def _path(self, digest: str, compression: str) -> Path:
+        return self.directory / 'blobs' / digest[:2] / f"{digest}{COMPRESSION_SUFFIXES[compression]}"
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+    def put(self, content: str) -> Optional[str]:
+        """保存正文，返回哈希；空正文不保存，返回 None"""
+        if not content:
+            return None
+        data = content.encode('utf-8')
+        # 按原文计算，与增量清单的空白归一化哈希不同：排版变化也要保存
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.stats['bytes'] += len(data)
+            if self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+                self.stats['reused'] += 1
+                return digest
+
+        # 压缩和写文件不持锁；同一正文并发写入时内容相同，后写的覆盖也无妨
+        compressed = self._compress(data)
+        path = self._path(digest, self.compression)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(compressed)
+        os.replace(tmp, path)
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, compression, size, stored) VALUES (?, ?, ?, ?)",
+                (digest, self.compression, len(data), len(compressed)))
+            self._conn.commit()
+            if cursor.rowcount:
+                self.stats['written'] += 1
+                self.stats['stored_bytes'] += len(compressed)
+            else:
+                self.stats['reused'] += 1
+        return digest
+
+    def get(self, digest: str) -> str:
+        """按哈希读出正文"""
+        with self._lock:
+            row = self._conn.execute("SELECT compression FROM blobs WHERE hash = ?",
+                                     (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        data = self._path(digest, row[0]).read_bytes()
+        if row[0] == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("读取 zstd 压缩的正文需要安装 zstandard: pip install zstandard")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = gzip.decompress(data)
+        return data.decode('utf-8')
+
+    def text(self, record: Dict) -> str:
+        """结果中的正文：已内联的直接返回，否则按 blob 字段读出"""
+        if 'content' in record:
+            return record['content']
+        return self.get(record['blob']) if record.get('blob') else ''
+
+    # ---------- 运行与索引 ----------
+
+    def begin_run(self, label: str) -> int:
+        with self._lock:
+            cursor = self._conn.execute("INSERT INTO runs (label, started_at) VALUES (?, ?)",
+                                        (label, time.time()))
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def finish_run(self, run: int):
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run))
+            self._conn.commit()
+
+    def _index(self, run: int, url: str, digest: Optional[str], title: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO entries (run, url, blob, title) VALUES (?, ?, ?, ?)",
+                               (run, url, digest, title))
+            self._conn.commit()
+
+    def add(self, run: int, url: str, content: str, title: str = '') -> Optional[str]:
+        """保存正文并登记到本次运行"""
+        digest = self.put(content)
+        self._index(run, url, digest, title)
+        return digest
+
+    def detach(self, run: int, url: str, result: Dict) -> Optional[str]:
+        """
+        把结果的正文存入 blob，原地以 blob 字段代替 content
+        已经是 blob 引用的结果（断点续爬读回的）只登记到本次运行
+        """
+        if 'content' in result:
+            content = result.pop('content')
+            result.setdefault('content_length', len(content))
+            result['blob'] = self.put(content)
+        self._index(run, url, result.get('blob'), result.get('title', ''))
+        return result.get('blob')
+
+    def carry_forward(self, run: int, url: str) -> Optional[str]:
+        """未重新获取的页面沿用该 URL 最近一次的 blob，登记到本次运行"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob, title FROM entries WHERE url = ? AND run < ? ORDER BY run DESC LIMIT 1",
+                (url, run)).fetchone()
+            if row is None:
+                return None
+            self.stats['carried'] += 1
+        self._index(run, url, row[0], row[1])
+        return row[0]
+
+    def runs(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT r.id, r.label, r.started_at, r.finished_at, COUNT(e.url)
+                FROM runs r LEFT JOIN entries e ON e.run = r.id
+                GROUP BY r.id ORDER BY r.id
+            """).fetchall()
+        return [{'run': row[0], 'label': row[1], 'started_at': row[2],
+                 'finished_at': row[3], 'pages': row[4]} for row in rows]
+
+    def iter_run(self, run: int) -> Iterator[Dict]:
+        """某次运行的页面：url、title、blob"""
+        with self._lock:
+            rows = self._conn.execute("SELECT url, title, blob FROM entries WHERE run = ? ORDER BY url",
+                                      (run,)).fetchall()
+        for url, title, digest in rows:
+            yield {'url': url, 'title': title, 'blob': digest}
+
+    # ---------- 统计 ----------
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            blobs, size, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored), 0) FROM blobs").fetchone()
+            return dict(self.stats, total_blobs=blobs, total_bytes=size, total_stored_bytes=stored)
+
+    def summary(self) -> str:
+        stats = self.get_stats()
+        ratio = stats['total_bytes'] / stats['total_stored_bytes'] if stats['total_stored_bytes'] else 0
+        parts = [f"新写入 {stats['written']} 个, 复用 {stats['reused']} 个"]
+        if stats['carried']:
+            parts.append(f"沿用上次 {stats['carried']} 个")
+        parts.append(f"共 {stats['total_blobs']} 个 blob, 正文 {stats['total_bytes'] / 1024 / 1024:.1f} MB "
+                     f"→ 磁盘 {stats['total_stored_bytes'] / 1024 / 1024:.1f} MB ({ratio:.1f}x)")
+        return ", ".join(parts)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
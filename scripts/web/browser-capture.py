@@ -9,6 +9,7 @@
 - 页面异常捕获
 - 错误截图
 - HAR 导出
+- 登录会话注入（--sessions）
 """
 
 import argparse
@@ -20,6 +21,10 @@ from datetime import datetime
 from typing import List, Dict, Optional
 from playwright.sync_api import sync_playwright, Page, Browser, ConsoleMessage, Request, Response
 
+from readiness import wait_for_ready
+from resource_profiles import PROFILES, ResourceStats, apply_resource_profile, should_block
+from sessions import SessionStore, DEFAULT_SESSION_DIR
+
 
 class BrowserCapture:
     """浏览器错误捕获器"""
@@ -27,10 +32,16 @@ class BrowserCapture:
     def __init__(self,
                  wait_time: int = 5,
                  screenshot_on_error: bool = True,
-                 har_path: str = None):
+                 har_path: str = None,
+                 resource_profile: str = 'full',
+                 sessions: SessionStore = None):
         self.wait_time = wait_time
         self.screenshot_on_error = screenshot_on_error
         self.har_path = har_path
+        # 默认不拦截：被拦截的请求会以 requestfailed 形式出现，干扰错误捕获
+        self.resource_profile = resource_profile
+        self.resource_stats = ResourceStats()
+        self.sessions = sessions  # 登录会话，需要登录的页面才能复现登录后的错误
 
         self.console_messages: List[Dict] = []
         self.network_errors: List[Dict] = []
@@ -53,6 +64,8 @@ class BrowserCapture:
 
     def on_request_failed(self, request: Request):
         """请求失败处理"""
+        if should_block(self.resource_profile, request.resource_type, request.url):
+            return  # 资源配置主动拦截的请求
         self.has_error = True
         failure = request.failure
         entry = {
@@ -102,7 +115,9 @@ class BrowserCapture:
         with sync_playwright() as p:
             # 启动浏览器
             browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
+            context = browser.new_context(
+                **(self.sessions.context_options(url) if self.sessions else {}))
+            apply_resource_profile(context, self.resource_profile, self.resource_stats)
             page = context.new_page()
 
             # 设置事件监听
@@ -123,8 +138,9 @@ class BrowserCapture:
 
                 # 等待动态内容加载
                 if self.wait_time > 0:
-                    print(f"等待 {self.wait_time} 秒...")
-                    page.wait_for_timeout(self.wait_time * 1000)
+                    print(f"等待页面就绪（最多 {self.wait_time} 秒）...")
+                    state = wait_for_ready(page, self.wait_time)
+                    print(f"页面{'已就绪' if state['ready'] else '等待超时'}: {state['elapsed_ms']}ms")
 
                 # 如果有错误且需要截图
                 if self.has_error and screenshot_path:
@@ -154,6 +170,7 @@ class BrowserCapture:
             'console_messages': self.console_messages,
             'network_errors': self.network_errors,
             'page_errors': self.page_errors,
+            'resource_stats': self.resource_stats.to_dict(),
             'summary': {
                 'console_count': len(self.console_messages),
                 'network_error_count': len(self.network_errors),
@@ -199,7 +216,7 @@ def main():
     parser = argparse.ArgumentParser(description='浏览器错误捕获工具')
     parser.add_argument('url', help='要访问的 URL')
     parser.add_argument('-w', '--wait', type=int, default=5,
-                        help='等待页面渲染的秒数 (默认: 5)')
+                        help='等待页面渲染的最长秒数，页面就绪后提前返回 (默认: 5)')
     parser.add_argument('-o', '--output', help='输出文件路径')
     parser.add_argument('-s', '--screenshot', help='错误时截图保存路径')
     parser.add_argument('--har', help='导出 HAR 文件')
@@ -207,6 +224,10 @@ def main():
                         help='只捕获 console 消息')
     parser.add_argument('-j', '--json', action='store_true',
                         help='JSON 格式输出')
+    parser.add_argument('--profile', choices=list(PROFILES), default='full',
+                        help='资源拦截配置 (默认: full，不拦截)')
+    parser.add_argument('--sessions', nargs='?', const=str(DEFAULT_SESSION_DIR), metavar='DIR',
+                        help=f'注入 browser-session.py 录制的登录会话 (目录默认: {DEFAULT_SESSION_DIR})')
 
     args = parser.parse_args()
 
@@ -218,7 +239,9 @@ def main():
     capture = BrowserCapture(
         wait_time=args.wait,
         screenshot_on_error=bool(args.screenshot),
-        har_path=args.har
+        har_path=args.har,
+        resource_profile=args.profile,
+        sessions=SessionStore(args.sessions) if args.sessions else None
     )
 
     results = capture.capture(args.url, args.screenshot)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+登录会话管理
+录制一次登录，之后 fetch-url.py / batch-crawler.py / dom-inspector.py / browser-capture.py
+加 --sessions 即自动注入该主机的 Cookie 和 localStorage
+
+用法：
+    # 打开有界面的浏览器，手动登录（或点掉 Cookie 同意弹窗）后回车保存
+    python browser-session.py record https://internal.example.com/login
+    # 登录后跳转到匹配的地址时自动保存
+    python browser-session.py record https://internal.example.com/login --until-url "*/dashboard*"
+    # 过期时自动执行的刷新命令（把新的 storage_state 写到 $SESSION_FILE）
+    python browser-session.py record https://internal.example.com/login --refresh-cmd "python login.py"
+    # 导入 playwright codegen --save-storage 等方式得到的状态文件
+    python browser-session.py import internal.example.com state.json
+    python browser-session.py list
+    python browser-session.py remove internal.example.com
+
+以刷新命令的身份运行时（环境变量 SESSION_FILE 已设置），record 把状态写到该文件而不是会话目录。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from urllib.parse import urlparse
+from playwright.sync_api import sync_playwright
+
+from sessions import SessionStore, DEFAULT_SESSION_DIR
+
+
+# ============ 配置 ============
+
+RECORD_TIMEOUT = 600  # --until-url 时最长等待秒数
+POLL_INTERVAL = 0.5
+
+
+def record(url: str, store: SessionStore, host: str = None, until_url: str = None,
+           refresh_cmd: str = None, timeout: float = RECORD_TIMEOUT):
+    """打开有界面的浏览器，登录完成后保存 storage_state"""
+    host = host or urlparse(url).netloc
+    target = os.environ.get('SESSION_FILE')
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=False)
+        context = browser.new_context()
+        page = context.new_page()
+        page.goto(url, wait_until='domcontentloaded')
+
+        if until_url:
+            print(f"请在浏览器中登录，跳转到 {until_url} 后自动保存...")
+            deadline = time.monotonic() + timeout
+            while not fnmatch(page.url, until_url):
+                if time.monotonic() > deadline:
+                    browser.close()
+                    print(f"错误: {timeout:.0f} 秒内未跳转到 {until_url}")
+                    sys.exit(1)
+                page.wait_for_timeout(POLL_INTERVAL * 1000)
+        else:
+            input("请在浏览器中登录（或关闭 Cookie 弹窗），完成后回到这里按回车保存...")
+
+        state = context.storage_state()
+        browser.close()
+
+    if target:
+        Path(target).write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+        print(f"会话状态已写入: {target}")
+    else:
+        store.save(host, state, login_url=url, refresh_cmd=refresh_cmd)
+        print(f"已保存 {host} 的会话: {len(state['cookies'])} 个 Cookie, "
+              f"{len(state['origins'])} 个源的 localStorage → {store.path_for(host)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录会话管理（storage_state 按主机保存）')
+    parser.add_argument('--dir', default=str(DEFAULT_SESSION_DIR),
+                        help=f'会话目录 (默认: {DEFAULT_SESSION_DIR})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rec = commands.add_parser('record', help='打开浏览器手动登录并保存会话')
+    rec.add_argument('url', help='登录页 URL')
+    rec.add_argument('--host', help='保存到哪个主机名下（默认取 URL 的主机）')
+    rec.add_argument('--until-url', metavar='PATTERN',
+                     help='页面跳转到匹配的地址（glob）时自动保存，不等回车')
+    rec.add_argument('--refresh-cmd', metavar='CMD',
+                     help='会话过期时执行的命令，需把新的 storage_state 写到 $SESSION_FILE')
+    rec.add_argument('--timeout', type=float, default=RECORD_TIMEOUT,
+                     help=f'--until-url 的最长等待秒数 (默认: {RECORD_TIMEOUT})')
+
+    imp = commands.add_parser('import', help='导入已有的 storage_state 文件')
+    imp.add_argument('host', help='主机名，如 docs.example.com')
+    imp.add_argument('file', help='storage_state JSON 文件')
+    imp.add_argument('--refresh-cmd', metavar='CMD', help='同 record')
+
+    commands.add_parser('list', help='列出已保存的会话')
+
+    rm = commands.add_parser('remove', help='删除会话')
+    rm.add_argument('host')
+
+    args = parser.parse_args()
+    store = SessionStore(args.dir)
+
+    if args.command == 'record':
+        record(args.url, store, args.host, args.until_url, args.refresh_cmd, args.timeout)
+    elif args.command == 'import':
+        state = json.loads(Path(args.file).read_text(encoding='utf-8'))
+        store.save(args.host, state, refresh_cmd=args.refresh_cmd)
+        print(f"已导入 {args.host} 的会话: {len(state.get('cookies', []))} 个 Cookie")
+    elif args.command == 'list':
+        sessions = store.list()
+        if not sessions:
+            print(f"没有已保存的会话 ({store.directory})")
+        for session in sessions:
+            saved = datetime.fromtimestamp(session['saved_at']).strftime('%Y-%m-%d %H:%M')
+            print(f"{session['host']}: {session['cookies']} 个 Cookie, {session['origins']} 个源, "
+                  f"保存于 {saved}" + ("（已过期）" if session['expired'] else "")
+                  + (f", 刷新命令: {session['refresh_cmd']}" if session['refresh_cmd'] else ""))
+    elif args.command == 'remove':
+        if store.remove(args.host):
+            print(f"已删除 {args.host} 的会话")
+        else:
+            print(f"没有 {args.host} 的会话")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+浏览器池
+长期复用 Chromium 实例，避免每个 URL、每次重试都重新启动浏览器
+
+- BrowserPool: 同步版，供 ThreadPoolExecutor 工作线程 / 单页爬取使用
+  （Playwright 同步 API 不能跨线程，每个工作线程绑定一个浏览器槽位）
+- AsyncBrowserPool: 异步版，固定数量的浏览器供 SiteCrawler 的 worker 借用
+
+两者都会在浏览器服务满 K 个页面或崩溃（断开连接）后回收重建。
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, List, Optional
+from playwright.sync_api import sync_playwright
+
+
+# ============ 配置 ============
+
+DEFAULT_PAGES_PER_BROWSER = 100  # 每个浏览器服务多少页面后回收
+SHUTDOWN_TIMEOUT = 30  # 关闭工作线程浏览器时的等待秒数
+
+
+class _Slot:
+    """浏览器槽位"""
+
+    def __init__(self, browser, playwright=None):
+        self.browser = browser
+        self.playwright = playwright  # 同步版每个槽位独占一个 playwright 实例
+        self.pages = 0  # 已分配的页面数
+        self.active = 0  # 正在使用的任务数（异步版）
+        self.retired = False
+
+    def is_alive(self) -> bool:
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+
+# ============ 同步浏览器池 ============
+
+class BrowserPool:
+    """同步浏览器池：每个线程一个长期存活的浏览器"""
+
+    def __init__(self,
+                 size: int = 1,
+                 max_pages_per_browser: int = DEFAULT_PAGES_PER_BROWSER,
+                 headless: bool = True):
+        self.size = size  # 应等于使用该池的工作线程数
+        self.max_pages_per_browser = max_pages_per_browser
+        self.headless = headless
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots: List[_Slot] = []
+
+        self.launches = 0
+        self.recycles = 0
+
+    def _launch(self) -> _Slot:
+        playwright = sync_playwright().start()
+        browser = playwright.chromium.launch(headless=self.headless)
+        slot = _Slot(browser, playwright)
+        with self._lock:
+            self._slots.append(slot)
+            self.launches += 1
+        return slot
+
+    def _close_slot(self, slot: _Slot):
+        with self._lock:
+            if slot in self._slots:
+                self._slots.remove(slot)
+        try:
+            slot.browser.close()
+        except Exception:
+            pass
+        try:
+            slot.playwright.stop()
+        except Exception:
+            pass
+
+    def _recycle(self, slot: _Slot):
+        self._close_slot(slot)
+        self._local.slot = None
+        with self._lock:
+            self.recycles += 1
+
+    @contextmanager
+    def browser(self):
+        """借出当前线程的浏览器；满 K 页或崩溃后自动重建"""
+        slot: Optional[_Slot] = getattr(self._local, 'slot', None)
+
+        if slot is not None and (slot.pages >= self.max_pages_per_browser or not slot.is_alive()):
+            self._recycle(slot)
+            slot = None
+
+        if slot is None:
+            slot = self._launch()
+            self._local.slot = slot
+
+        slot.pages += 1
+        try:
+            yield slot.browser
+        except Exception:
+            # 浏览器已崩溃则直接丢弃这个实例
+            if not slot.is_alive():
+                self._recycle(slot)
+            raise
+
+    def close(self):
+        """关闭当前线程持有的浏览器"""
+        slot = getattr(self._local, 'slot', None)
+        if slot is not None:
+            self._close_slot(slot)
+            self._local.slot = None
+
+    def shutdown(self, executor=None):
+        """
+        关闭所有浏览器
+        同步 API 只能在创建它的线程里关闭，因此向 executor 的每个工作线程
+        各投递一个关闭任务（用 Barrier 保证每个线程恰好拿到一个）。
+        executor 的 max_workers 需与 size 一致。
+        """
+        if executor is not None and self._slots:
+            barrier = threading.Barrier(self.size)
+
+            def _close_on_worker():
+                self.close()
+                try:
+                    barrier.wait(timeout=SHUTDOWN_TIMEOUT)
+                except threading.BrokenBarrierError:
+                    pass
+
+            futures = [executor.submit(_close_on_worker) for _ in range(self.size)]
+            for future in futures:
+                future.result()
+
+        self.close()
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        return {
+            'browser_launches': self.launches,
+            'browser_recycles': self.recycles,
+            'alive': len(self._slots),
+        }
+
+
+# ============ 异步浏览器池 ============
+
+class AsyncBrowserPool:
+    """异步浏览器池：固定数量的浏览器，按负载分配给 worker"""
+
+    def __init__(self,
+                 playwright,
+                 size: int = 1,
+                 max_pages_per_browser: int = DEFAULT_PAGES_PER_BROWSER,
+                 headless: bool = True):
+        self.playwright = playwright  # async_playwright() 的实例
+        self.size = max(1, size)
+        self.max_pages_per_browser = max_pages_per_browser
+        self.headless = headless
+
+        self._slots: List[_Slot] = []
+        self._draining: List[_Slot] = []  # 已退役但仍有页面在用
+        self._lock = asyncio.Lock()
+
+        self.launches = 0
+        self.recycles = 0
+
+    async def _launch(self) -> _Slot:
+        browser = await self.playwright.chromium.launch(headless=self.headless)
+        self.launches += 1
+        return _Slot(browser)
+
+    async def _close_slot(self, slot: _Slot):
+        try:
+            await slot.browser.close()
+        except Exception:
+            pass
+
+    async def start(self):
+        """预先启动全部浏览器"""
+        async with self._lock:
+            while len(self._slots) < self.size:
+                self._slots.append(await self._launch())
+
+    async def _checkout(self) -> _Slot:
+        async with self._lock:
+            for i, slot in enumerate(self._slots):
+                if slot.retired or not slot.is_alive():
+                    # 用新实例替换；旧实例等在途页面结束后再关闭
+                    self.recycles += 1
+                    if slot.active == 0:
+                        await self._close_slot(slot)
+                    else:
+                        self._draining.append(slot)
+                    self._slots[i] = await self._launch()
+
+            while len(self._slots) < self.size:
+                self._slots.append(await self._launch())
+
+            slot = min(self._slots, key=lambda s: s.active)
+            slot.active += 1
+            slot.pages += 1
+            if slot.pages >= self.max_pages_per_browser:
+                slot.retired = True
+            return slot
+
+    async def _checkin(self, slot: _Slot, broken: bool):
+        async with self._lock:
+            slot.active -= 1
+            if broken:
+                slot.retired = True
+            if slot in self._draining and slot.active == 0:
+                self._draining.remove(slot)
+                await self._close_slot(slot)
+
+    @asynccontextmanager
+    async def browser(self):
+        """借出一个浏览器（可被多个 worker 同时共享）"""
+        slot = await self._checkout()
+        broken = False
+        try:
+            yield slot.browser
+        except Exception:
+            broken = not slot.is_alive()
+            raise
+        finally:
+            await self._checkin(slot, broken)
+
+    async def close(self):
+        """关闭所有浏览器"""
+        async with self._lock:
+            for slot in self._slots + self._draining:
+                await self._close_slot(slot)
+            self._slots = []
+            self._draining = []
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        return {
+            'browser_launches': self.launches,
+            'browser_recycles': self.recycles,
+            'alive': len(self._slots) + len(self._draining),
+        }
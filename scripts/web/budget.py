@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+爬取时间预算
+定时任务有固定的时间窗口，超时比少爬几页更糟：到点前停止派发新页面，把已完成的结果落盘
+
+- 全局截止时间：从开始计时，预留 reserve 秒给收尾（写 JSONL/Markdown/站点地图），
+  剩余时间用完后不再开始新页面，在途页面的单页超时也不会越过截止时间
+- 单页预算：导航、等待就绪、提取合计不超过 page 秒（取代固定的 30 秒 goto 超时）
+- 单主机预算：某个主机累计耗时超过 host 秒后，该主机剩下的页面不再爬取
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+from typing import Dict, Optional
+
+from retry_policy import FetchError, TIMEOUT
+
+
+# ============ 配置 ============
+
+DEFAULT_PAGE_BUDGET = 30.0  # 单页预算（秒）
+MIN_PAGE_BUDGET = 1.0  # 剩余时间不足这么多时不再开始新页面/新尝试
+RESERVE_RATIO = 0.05  # 截止前预留给收尾的比例
+MAX_RESERVE = 30.0  # 预留时间上限（秒）
+
+# 跳过原因
+DEADLINE = 'deadline'
+HOST_BUDGET = 'host_budget'
+
+
+class PageDeadline:
+    """一次页面尝试的截止时间（导航 + 就绪 + 提取）"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.ends_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.ends_at - time.monotonic())
+
+    def timeout_ms(self) -> float:
+        """Playwright 的 timeout 参数；0 表示不限，这里至少给 1 毫秒"""
+        return max(1.0, self.remaining() * 1000)
+
+    def check(self, stage: str):
+        """剩余时间用完时抛出超时"""
+        if self.remaining() <= 0:
+            raise FetchError(TIMEOUT, f"超出单页预算 {self.seconds:.0f} 秒 ({stage})")
+
+
+class Budget:
+    """
+    全局、单页、单主机时间预算（线程和协程都可使用）
+    deadline / host 为 None 表示不限
+    """
+
+    def __init__(self, deadline: float = None, page: float = DEFAULT_PAGE_BUDGET,
+                 host: float = None, reserve: float = None):
+        self.deadline = deadline
+        self.page = page
+        self.host = host
+        if reserve is None:
+            reserve = min(MAX_RESERVE, deadline * RESERVE_RATIO) if deadline else 0.0
+        self.reserve = reserve
+        self.started = time.monotonic()  # 从创建时开始计时（定时任务的时间窗口包括启动和播种）
+        self._lock = threading.Lock()
+        self._host_spent: Dict[str, float] = {}
+        self._skipped: Dict[str, set] = {DEADLINE: set(), HOST_BUDGET: set()}  # 同一 URL 可能多次出队
+        self.stats = {'deadline_hit': False}
+
+    def remaining(self) -> Optional[float]:
+        """距离停止派发还剩多少秒；不限时返回 None"""
+        if self.deadline is None:
+            return None
+        return self.deadline - self.reserve - (time.monotonic() - self.started)
+
+    def expired(self) -> bool:
+        """是否已到停止派发新页面的时间"""
+        remaining = self.remaining()
+        if remaining is None or remaining >= MIN_PAGE_BUDGET:
+            return False
+        with self._lock:
+            if not self.stats['deadline_hit']:
+                self.stats['deadline_hit'] = True
+                print(f"⏱ 接近截止时间（{self.deadline:.0f} 秒），不再开始新页面")
+        return True
+
+    def host_remaining(self, url: str) -> Optional[float]:
+        if self.host is None:
+            return None
+        with self._lock:
+            return self.host - self._host_spent.get(urlparse(url).netloc, 0.0)
+
+    def _host_exhausted(self, spent: float) -> bool:
+        return self.host is not None and self.host - spent < MIN_PAGE_BUDGET
+
+    def allow(self, url: str) -> Optional[str]:
+        """能否开始爬取该 URL；不能时登记并返回原因（DEADLINE / HOST_BUDGET）"""
+        host_remaining = self.host_remaining(url)
+        if self.expired():
+            reason = DEADLINE
+        elif host_remaining is not None and host_remaining < MIN_PAGE_BUDGET:
+            reason = HOST_BUDGET
+        else:
+            return None
+        with self._lock:
+            self._skipped[reason].add(url)
+        return reason
+
+    def page_deadline(self, url: str) -> PageDeadline:
+        """单页截止时间：不超过单页预算、主机剩余预算和全局剩余时间"""
+        limits = [self.page, self.remaining(), self.host_remaining(url)]
+        return PageDeadline(max(0.0, min(limit for limit in limits if limit is not None)))
+
+    def can_retry(self, url: str, delay: float) -> bool:
+        """等待 delay 秒后是否还有时间再试一次"""
+        limits = [self.remaining(), self.host_remaining(url)]
+        return all(limit is None or limit - delay >= MIN_PAGE_BUDGET for limit in limits)
+
+    def charge(self, url: str, seconds: float):
+        """把一个页面的耗时记到主机预算上"""
+        if self.host is None:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            before = self._host_spent.get(host, 0.0)
+            self._host_spent[host] = before + seconds
+        if self._host_exhausted(before + seconds) and not self._host_exhausted(before):
+            print(f"⏱ {host} 用完主机预算 {self.host:.0f} 秒，剩余页面跳过")
+
+    def stopped_early(self) -> bool:
+        """是否因预算有页面没有爬（此时不能据结果判定页面已删除）"""
+        with self._lock:
+            return self.stats['deadline_hit'] or bool(self._skipped[HOST_BUDGET])
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats,
+                        elapsed=round(time.monotonic() - self.started, 1),
+                        hosts_exhausted=sum(1 for spent in self._host_spent.values()
+                                            if self._host_exhausted(spent)),
+                        **{reason: len(urls) for reason, urls in self._skipped.items()})
+
+    def summary(self) -> str:
+        stats = self.get_stats()
+        parts = [f"用时 {stats['elapsed']} 秒"]
+        if self.deadline is not None:
+            parts.append(f"截止 {self.deadline:.0f} 秒" + ("（已到点）" if stats['deadline_hit'] else ""))
+        if stats[DEADLINE]:
+            parts.append(f"因截止跳过 {stats[DEADLINE]} 个")
+        if self.host is not None:
+            parts.append(f"主机预算用完 {stats['hosts_exhausted']} 个, 跳过 {stats[HOST_BUDGET]} 个页面")
+        return ", ".join(parts)
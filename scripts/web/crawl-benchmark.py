@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+爬虫基准测试
+生成可配置的合成文档站，用本地 HTTP 服务器提供，不需要外网，
+分别用 SiteCrawler、BatchCrawler、crawl_single 爬取并报告吞吐和资源占用
+
+合成站点：
+- N 个页面，按 fan-out 组成树（每页正文链接到下一层的子页面）
+- 一部分页面是 JS 渲染的外壳（空挂载点 + 脚本写入正文），其余为服务端渲染
+- 每页若干代码块、表格，以及指向其他页面的大导航栏
+- /robots.txt 和 /sitemap.xml
+
+服务器可注入延迟（固定 + 抖动）和错误率（按比例返回 5xx）
+
+每种模式在独立的子进程里运行，报告：
+- 页面数、失败数、pages/sec
+- CPU 秒数（爬虫进程 + 已退出的子进程，即浏览器和分片工作进程）
+- 峰值 RSS（爬虫进程；子进程取其中最大的一个）
+- 浏览器启动次数、各获取方式的页面数、各阶段 p50/p95
+
+用法：
+    python crawl-benchmark.py --pages 200 --static-first
+    python crawl-benchmark.py --pages 100 --js-ratio 0.3 --latency 50 --error-rate 0.02 -o bench.json
+    python crawl-benchmark.py --serve --pages 500   # 只启动站点，手动用其他脚本爬
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# ============ 配置 ============
+
+SCRIPT_DIR = Path(__file__).parent
+MODES = ('site', 'batch', 'single')
+DEFAULT_PAGES = 100
+DEFAULT_FANOUT = 5
+DEFAULT_SINGLE_URLS = 10  # crawl_single 每个 URL 一个进程内调用，只取前几个页面
+LASTMOD = '2024-01-01'
+
+WORDS = ('crawler browser render static extract content section request response '
+         'cache header token stream index query config option install usage example '
+         'module function return value error retry timeout session context page link').split()
+
+CODE_SAMPLE = '''def fetch(url, timeout=30):
+    response = client.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()'''
+
+
+# ============ 合成站点 ============
+
+class SyntheticSite:
+    """确定性的合成文档站（同样的参数和 seed 生成同样的页面）"""
+
+    def __init__(self,
+                 pages: int = DEFAULT_PAGES,
+                 fanout: int = DEFAULT_FANOUT,
+                 js_ratio: float = 0.0,
+                 code_blocks: int = 2,
+                 tables: int = 1,
+                 nav_links: int = 50,
+                 paragraphs: int = 6,
+                 seed: int = 0):
+        self.pages = max(1, pages)
+        self.fanout = max(1, fanout)
+        self.code_blocks = code_blocks
+        self.tables = tables
+        self.nav_links = nav_links
+        self.paragraphs = paragraphs
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self.js_pages = {i for i in range(1, self.pages) if rng.random() < js_ratio}
+
+    def path(self, index: int) -> str:
+        return '/docs/' if index == 0 else f'/docs/page-{index}'
+
+    def paths(self) -> List[str]:
+        return [self.path(i) for i in range(self.pages)]
+
+    def index_of(self, path: str) -> Optional[int]:
+        if path in ('/docs', '/docs/'):
+            return 0
+        if path.startswith('/docs/page-'):
+            try:
+                index = int(path[len('/docs/page-'):].rstrip('/'))
+            except ValueError:
+                return None
+            if 0 < index < self.pages:
+                return index
+        return None
+
+    def children(self, index: int) -> List[int]:
+        first = index * self.fanout + 1
+        return [i for i in range(first, first + self.fanout) if i < self.pages]
+
+    def depth(self) -> int:
+        """沿正文链接从首页到达所有页面所需的深度"""
+        depth, last = 0, 0
+        while last < self.pages - 1:
+            last = last * self.fanout + self.fanout
+            depth += 1
+        return depth
+
+    def _text(self, rng: random.Random, words: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def _main(self, index: int) -> str:
+        rng = random.Random(self.seed * 1000003 + index)
+        parts = [f'<h1>Page {index}</h1>']
+        for p in range(self.paragraphs):
+            if p % 2 == 0:
+                parts.append(f'<h2>Section {p // 2 + 1}</h2>')
+            parts.append(f'<p>{self._text(rng, 40)}</p>')
+        for _ in range(self.code_blocks):
+            parts.append(f'<pre><code class="language-python">{escape(CODE_SAMPLE)}</code></pre>')
+        for _ in range(self.tables):
+            rows = ''.join(
+                f'<tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(1, 999)}</td>'
+                f'<td>{self._text(rng, 6)}</td></tr>' for _ in range(5))
+            parts.append(f'<table><tr><th>Name</th><th>Value</th><th>Notes</th></tr>{rows}</table>')
+        children = self.children(index)
+        if children:
+            items = ''.join(f'<li><a href="{self.path(i)}">Page {i}</a></li>' for i in children)
+            parts.append(f'<h2>Next</h2><ul>{items}</ul>')
+        return '\n'.join(parts)
+
+    def _nav(self, index: int) -> str:
+        count = min(self.nav_links, self.pages)
+        start = index % self.pages
+        links = ''.join(
+            f'<li><a href="{self.path((start + k) % self.pages)}">Page {(start + k) % self.pages}</a></li>'
+            for k in range(count))
+        return f'<nav class="sidebar"><ul>{links}</ul></nav>'
+
+    def render(self, path: str) -> Optional[Tuple[str, str]]:
+        """路径 → (content_type, body)，不存在时返回 None"""
+        if path == '/robots.txt':
+            return 'text/plain', 'User-agent: *\nAllow: /\nSitemap: {origin}/sitemap.xml\n'
+        if path == '/sitemap.xml':
+            urls = ''.join(f'<url><loc>{{origin}}{p}</loc><lastmod>{LASTMOD}</lastmod></url>'
+                           for p in self.paths())
+            return ('application/xml',
+                    '<?xml version="1.0" encoding="UTF-8"?>'
+                    f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>')
+
+        index = self.index_of(path)
+        if index is None:
+            return None
+
+        main = self._main(index)
+        if index in self.js_pages:
+            # JS 外壳：静态层会识别出空挂载点并升级到浏览器
+            body = (f'<div id="root"></div>'
+                    f'<noscript>You need to enable JavaScript to run this app.</noscript>'
+                    f'<script>document.getElementById("root").innerHTML = '
+                    f'"<main>" + {json.dumps(main)} + "</main>";</script>')
+        else:
+            body = f'<main>{main}</main>'
+        html = (f'<!DOCTYPE html><html><head><title>Page {index} - Synthetic Docs</title></head>'
+                f'<body><header><a href="/docs/">Synthetic Docs</a></header>'
+                f'{self._nav(index)}{body}<footer>Synthetic footer</footer></body></html>')
+        return 'text/html; charset=utf-8', html
+
+
+# ============ 本地服务器 ============
+
+class SiteServer:
+    """在 127.0.0.1 的随机端口上提供合成站点，可注入延迟和错误"""
+
+    def __init__(self,
+                 site: SyntheticSite,
+                 latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_status: int = 500,
+                 seed: int = 0):
+        self.site = site
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'bytes': 0}
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def origin(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str) -> str:
+        return self.origin + path
+
+    def _draw(self) -> Tuple[float, bool]:
+        with self._lock:
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+            failed = self._rng.random() < self.error_rate
+        return delay / 1000, failed
+
+    def _count(self, size: int, failed: bool):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['bytes'] += size
+            if failed:
+                self.stats['errors'] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay, failed = server._draw()
+                if delay > 0:
+                    time.sleep(delay)
+
+                path = self.path.split('?', 1)[0].split('#', 1)[0]
+                rendered = server.site.render(path)
+                # robots.txt / sitemap.xml 不注入错误，只影响页面
+                if failed and path.startswith('/docs'):
+                    status, content_type, body = server.error_status, 'text/plain', 'injected error'
+                elif rendered is None:
+                    status, content_type, body = 404, 'text/plain', 'not found'
+                    failed = False
+                else:
+                    status, (content_type, body) = 200, rendered
+                    failed = False
+                    body = body.replace('{origin}', server.origin)
+
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                server._count(len(data), failed)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# ============ 运行各模式 ============
+
+def _load_script(name: str, filename: str):
+    """按模块名加载带连字符的脚本"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, SCRIPT_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _usage() -> Dict:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        'cpu_self': own.ru_utime + own.ru_stime,
+        'cpu_children': children.ru_utime + children.ru_stime,
+        # Linux 上 ru_maxrss 单位为 KB
+        'rss_self_mb': own.ru_maxrss / 1024,
+        'rss_children_mb': children.ru_maxrss / 1024,
+    }
+
+
+def _phases(report: Dict) -> Dict:
+    return {phase: {'p50_ms': stats['p50_ms'], 'p95_ms': stats['p95_ms']}
+            for phase, stats in report['phases'].items()}
+
+
+def _run_site(config: Dict, urls: List[str]) -> Dict:
+    fetch_url = _load_script('fetch_url', 'fetch-url.py')
+    from politeness import PolitenessScheduler
+    from timing import TimingRecorder
+
+    timing = TimingRecorder()
+    sharding = {'workers': config['workers']} if config['workers'] > 1 else {}
+    crawler = (fetch_url.ShardedCrawler if sharding else fetch_url.SiteCrawler)(
+        base_url=urls[0],
+        max_depth=config['depth'],
+        max_pages=len(urls),
+        concurrency=config['concurrency'],
+        wait_time=config['wait'],
+        browsers=config['browsers'],
+        static_first=config['static_first'],
+        resource_profile=config['profile'],
+        # 多进程时主机并发按进程数均分，这里放大使每个进程都能跑满 -c
+        scheduler=PolitenessScheduler(rate=config['rate'],
+                                      host_concurrency=config['concurrency'] * config['workers']),
+        use_sitemap=config['sitemap'],
+        timing=timing,
+        tabs=config['tabs'],
+        **sharding
+    )
+    crawler.crawl()
+    return {
+        'pages': crawler.pages_done,
+        'failed': len(crawler.visited) - crawler.pages_done,
+        'browser_launches': crawler.browser_stats.get('browser_launches', 0),
+        'tiers': dict(crawler.tier_stats),
+        'phases': _phases(timing.report()),
+    }
+
+
+def _run_batch(config: Dict, urls: List[str]) -> Dict:
+    batch_crawler = _load_script('batch_crawler', 'batch-crawler.py')
+    from politeness import PolitenessScheduler
+
+    crawler = batch_crawler.BatchCrawler(
+        concurrency=config['concurrency'],
+        wait_time=config['wait'],
+        max_retries=config['retries'],
+        static_first=config['static_first'],
+        resource_profile=config['profile'],
+        scheduler=PolitenessScheduler(rate=config['rate'],
+                                      host_concurrency=config['concurrency']),
+        reuse_tabs=config['tabs'] > 0,
+    )
+    crawler.crawl(urls, show_progress=False)
+    summary = crawler.get_summary()
+    return {
+        'pages': summary['success'],
+        'failed': summary['failed'],
+        'browser_launches': summary['browser_launches'],
+        'tiers': summary['tiers'],
+        'phases': _phases(crawler.timing.report()),
+    }
+
+
+def _run_single(config: Dict, urls: List[str]) -> Dict:
+    fetch_url = _load_script('fetch_url', 'fetch-url.py')
+    from browser_pool import BrowserPool
+
+    # 与命令行逐个调用一致：每个 URL 一个新的浏览器池
+    pages, failed, launches = 0, 0, 0
+    for url in urls[:config['single_urls']]:
+        pool = BrowserPool(size=1)
+        try:
+            fetch_url.crawl_single(url, os.devnull, config['wait'],
+                                   static_first=config['static_first'],
+                                   resource_profile=config['profile'], pool=pool)
+            pages += 1
+        except SystemExit:
+            failed += 1
+        finally:
+            pool.close()
+            launches += pool.launches
+    return {'pages': pages, 'failed': failed, 'browser_launches': launches, 'tiers': {}}
+
+
+RUNNERS = {'site': _run_site, 'batch': _run_batch, 'single': _run_single}
+
+
+def run_mode(mode: str, config: Dict, urls: List[str]) -> Dict:
+    """在子进程中执行：运行一种模式并测量耗时、CPU 和峰值 RSS"""
+    sys.path.insert(0, str(SCRIPT_DIR))
+    before = _usage()
+    start = time.perf_counter()
+    error = None
+
+    with open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(sys.stdout if config['verbose'] else devnull):
+        try:
+            stats = RUNNERS[mode](config, urls)
+        except Exception as e:
+            stats = {'pages': 0, 'failed': 0, 'browser_launches': 0, 'tiers': {}}
+            # Playwright 的错误信息很长，只保留第一行
+            error = f"{type(e).__name__}: {(str(e).splitlines() or [''])[0]}"
+
+    wall = time.perf_counter() - start
+    after = _usage()
+    cpu_self = after['cpu_self'] - before['cpu_self']
+    cpu_children = after['cpu_children'] - before['cpu_children']
+
+    stats.update({
+        'mode': mode,
+        'wall_seconds': round(wall, 3),
+        'pages_per_sec': round(stats['pages'] / wall, 2) if wall > 0 else 0.0,
+        'cpu_seconds': round(cpu_self + cpu_children, 3),
+        'cpu_self_seconds': round(cpu_self, 3),
+        'cpu_children_seconds': round(cpu_children, 3),
+        'cpu_percent': round((cpu_self + cpu_children) / wall * 100, 1) if wall > 0 else 0.0,
+        'peak_rss_mb': round(after['rss_self_mb'], 1),
+        'peak_child_rss_mb': round(after['rss_children_mb'], 1),
+    })
+    if error:
+        stats['error'] = error
+    return stats
+
+
+# ============ 报告 ============
+
+def summarize(runs: List[Dict]) -> Dict:
+    """同一模式多次运行取中位数"""
+    ok = [r for r in runs if 'error' not in r] or runs
+    keys = ('pages_per_sec', 'wall_seconds', 'cpu_seconds', 'peak_rss_mb',
+            'peak_child_rss_mb', 'browser_launches')
+    return {key: round(statistics.median(r[key] for r in ok), 2) for key in keys}
+
+
+def print_report(results: Dict[str, Dict]):
+    header = (f"{'模式':<8}{'页面':>6}{'失败':>6}{'pages/s':>10}{'耗时(s)':>10}"
+              f"{'CPU(s)':>9}{'CPU%':>7}{'RSS(MB)':>9}{'子进程RSS':>10}{'浏览器':>7}")
+    print(header)
+    print('-' * len(header))
+    for mode, result in results.items():
+        last = result['runs'][-1]
+        median = result['median']
+        print(f"{mode:<8}{last['pages']:>6}{last['failed']:>6}{median['pages_per_sec']:>10.2f}"
+              f"{median['wall_seconds']:>10.2f}{median['cpu_seconds']:>9.2f}"
+              f"{last['cpu_percent']:>7.0f}{median['peak_rss_mb']:>9.0f}"
+              f"{median['peak_child_rss_mb']:>10.0f}{median['browser_launches']:>7.0f}")
+        for run in result['runs']:
+            if 'error' in run:
+                print(f"  ! {run['error']}")
+        if last.get('tiers'):
+            print("  获取方式: " + ", ".join(f"{tier} {count}" for tier, count in last['tiers'].items()))
+
+
+# ============ 主函数 ============
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫基准测试（本地合成文档站）')
+
+    site = parser.add_argument_group('合成站点')
+    site.add_argument('--pages', type=int, default=DEFAULT_PAGES,
+                      help=f'页面数 (默认: {DEFAULT_PAGES})')
+    site.add_argument('--fanout', type=int, default=DEFAULT_FANOUT,
+                      help=f'每页正文链接的子页面数 (默认: {DEFAULT_FANOUT})')
+    site.add_argument('--js-ratio', type=float, default=0.0,
+                      help='JS 渲染页面的比例，0~1 (默认: 0)')
+    site.add_argument('--code-blocks', type=int, default=2, help='每页代码块数 (默认: 2)')
+    site.add_argument('--tables', type=int, default=1, help='每页表格数 (默认: 1)')
+    site.add_argument('--nav-links', type=int, default=50, help='每页导航栏链接数 (默认: 50)')
+    site.add_argument('--seed', type=int, default=0, help='随机种子 (默认: 0)')
+
+    server = parser.add_argument_group('服务器')
+    server.add_argument('--latency', type=float, default=0.0, help='每个请求的固定延迟毫秒数')
+    server.add_argument('--jitter', type=float, default=0.0, help='额外的随机延迟上限（毫秒）')
+    server.add_argument('--error-rate', type=float, default=0.0,
+                        help='页面请求返回错误的比例，0~1 (默认: 0)')
+    server.add_argument('--error-status', type=int, default=500,
+                        help='注入错误时的状态码 (默认: 500)')
+    server.add_argument('--serve', action='store_true',
+                        help='只启动站点并打印地址，Ctrl-C 退出')
+
+    crawl = parser.add_argument_group('爬取')
+    crawl.add_argument('--modes', default=','.join(MODES),
+                       help=f'要运行的模式，逗号分隔 (默认: {",".join(MODES)})')
+    crawl.add_argument('-c', '--concurrency', type=int, default=4, help='并发数 (默认: 4)')
+    crawl.add_argument('--browsers', type=int, default=1, help='站点爬取的浏览器数 (默认: 1)')
+    crawl.add_argument('--workers', type=int, default=1,
+                       help='站点爬取的工作进程数，>1 时用 ShardedCrawler (默认: 1)')
+    crawl.add_argument('--tabs', type=int, default=0,
+                       help='标签页池：每个 context 保留的预热标签页数，批量爬取时 >0 即复用标签页 (默认: 0)')
+    crawl.add_argument('-w', '--wait', type=int, default=5, help='最长渲染等待秒数 (默认: 5)')
+    crawl.add_argument('-r', '--retries', type=int, default=3, help='批量爬取重试次数 (默认: 3)')
+    crawl.add_argument('--static-first', action='store_true', help='先走静态层')
+    crawl.add_argument('--profile', default='text-only', help='资源拦截配置 (默认: text-only)')
+    crawl.add_argument('--rate', type=float, default=0.0,
+                       help='每个主机每秒请求数，0 不限速 (默认: 0)')
+    crawl.add_argument('--sitemap', action='store_true', help='站点爬取先从 sitemap 预填 frontier')
+    crawl.add_argument('--single-urls', type=int, default=DEFAULT_SINGLE_URLS,
+                       help=f'crawl_single 模式爬取的 URL 数 (默认: {DEFAULT_SINGLE_URLS})')
+    crawl.add_argument('--repeat', type=int, default=1, help='每种模式重复次数，报告取中位数')
+    crawl.add_argument('-v', '--verbose', action='store_true', help='显示爬虫自身的输出')
+    crawl.add_argument('-o', '--output', help='JSON 报告路径')
+
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"未知模式: {', '.join(unknown)}（可选: {', '.join(MODES)}）")
+
+    synthetic = SyntheticSite(pages=args.pages, fanout=args.fanout, js_ratio=args.js_ratio,
+                              code_blocks=args.code_blocks, tables=args.tables,
+                              nav_links=args.nav_links, seed=args.seed)
+    httpd = SiteServer(synthetic, latency_ms=args.latency, jitter_ms=args.jitter,
+                       error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    httpd.start()
+    urls = [httpd.url(path) for path in synthetic.paths()]
+
+    print(f"合成站点: {httpd.origin}/docs/  ({synthetic.pages} 页, fan-out {synthetic.fanout}, "
+          f"JS 渲染 {len(synthetic.js_pages)} 页, 深度 {synthetic.depth()})")
+    print(f"延迟: {args.latency:.0f}ms + 0~{args.jitter:.0f}ms, 错误率: {args.error_rate:.1%}\n")
+
+    if args.serve:
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            httpd.stop()
+        return
+
+    config = {
+        'depth': synthetic.depth(),
+        'concurrency': args.concurrency,
+        'browsers': args.browsers,
+        'workers': args.workers,
+        'tabs': args.tabs,
+        'wait': args.wait,
+        'retries': args.retries,
+        'static_first': args.static_first,
+        'profile': args.profile,
+        'rate': args.rate,
+        'sitemap': args.sitemap,
+        'single_urls': args.single_urls,
+        'verbose': args.verbose,
+    }
+
+    # 每次运行一个新的子进程：峰值 RSS 和子进程 CPU 不会互相污染
+    results: Dict[str, Dict] = {}
+    try:
+        for mode in modes:
+            runs = []
+            for i in range(max(1, args.repeat)):
+                print(f"运行 {mode} ({i + 1}/{max(1, args.repeat)})...")
+                before = httpd.snapshot()
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    run = executor.submit(run_mode, mode, config, urls).result()
+                after = httpd.snapshot()
+                run['server'] = {key: after[key] - before[key] for key in after}
+                runs.append(run)
+            results[mode] = {'runs': runs, 'median': summarize(runs)}
+    finally:
+        httpd.stop()
+
+    print()
+    print_report(results)
+
+    if args.output:
+        report = {
+            'site': {
+                'pages': synthetic.pages,
+                'fanout': synthetic.fanout,
+                'js_pages': len(synthetic.js_pages),
+                'code_blocks': synthetic.code_blocks,
+                'tables': synthetic.tables,
+                'nav_links': synthetic.nav_links,
+                'seed': synthetic.seed,
+            },
+            'server': {
+                'latency_ms': args.latency,
+                'jitter_ms': args.jitter,
+                'error_rate': args.error_rate,
+                'error_status': args.error_status,
+            },
+            'config': config,
+            'results': results,
+        }
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n报告已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+爬取状态存储
+把 frontier（待爬 URL）和已完成的结果持久化到 SQLite（WAL 模式），
+每完成一个页面提交一次，崩溃、Ctrl-C 或浏览器卡死后可用 --resume 从断点继续
+
+- 已完成（done）的页面恢复时直接读出，不再重新爬取
+- 失败（failed）的页面恢复时重新排队
+- 状态文件记录本次爬取的配置（入口 URL 等），配置不一致时拒绝恢复
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# ============ 配置 ============
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _encode(data: Dict) -> str:
+    # links 等字段是 set，按排序后的列表存储
+    return json.dumps(data, ensure_ascii=False,
+                      default=lambda o: sorted(o) if isinstance(o, (set, frozenset)) else str(o))
+
+
+def _decode(text: str) -> Dict:
+    data = json.loads(text)
+    # 还原 links 为 set（站点爬取的结果本身，或批量爬取条目中的 result）
+    for item in (data, data.get('result')):
+        if isinstance(item, dict) and isinstance(item.get('links'), list):
+            item['links'] = set(item['links'])
+    return data
+
+
+class CrawlStore:
+    """基于 SQLite 的 frontier + 结果存储"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 批量爬取的工作线程会并发写入，统一加锁
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                depth INTEGER,
+                state TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier(state);
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                data TEXT
+            );
+        """)
+        self._conn.commit()
+
+    def begin(self, config: Dict, resume: bool = False) -> Dict[str, int]:
+        """
+        开始一次爬取
+        resume=False 清空旧状态；resume=True 校验配置并把失败页面重新排队
+        返回各状态的 URL 数
+        """
+        config = {k: str(v) for k, v in config.items()}
+        with self._lock:
+            saved = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+            if resume and saved:
+                mismatched = [k for k, v in config.items() if k in saved and saved[k] != v]
+                if mismatched:
+                    raise ValueError(
+                        f"状态文件 {self.path} 属于另一次爬取（{', '.join(mismatched)} 不一致），"
+                        f"去掉 --resume 重新开始或换一个状态文件")
+                self._conn.execute(
+                    "UPDATE frontier SET state = ? WHERE state = ?", (PENDING, FAILED))
+            else:
+                self._conn.execute("DELETE FROM frontier")
+                self._conn.execute("DELETE FROM results")
+                self._conn.execute("DELETE FROM meta")
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", config.items())
+            self._conn.commit()
+
+        return self.counts()
+
+    def add(self, items: Iterable[Tuple[str, int]]):
+        """URL 入队（已存在的忽略）"""
+        with self._lock:
+            self._add(items)
+            self._conn.commit()
+
+    def _add(self, items: Iterable[Tuple[str, int]]):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO frontier (url, depth, state) VALUES (?, ?, ?)",
+            ((url, depth, PENDING) for url, depth in items))
+
+    def complete(self, url: str, result: Optional[Dict],
+                 new_items: Iterable[Tuple[str, int]] = ()):
+        """
+        记录一个页面的结果，并把新发现的链接入队
+        三者在同一事务中提交，崩溃时不会出现"结果已存、链接丢失"的中间状态
+        """
+        with self._lock:
+            if result is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (url, data) VALUES (?, ?)",
+                    (url, _encode(result)))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO frontier (url, depth, state) VALUES "
+                "(?, COALESCE((SELECT depth FROM frontier WHERE url = ?), 0), ?)",
+                (url, url, DONE if result is not None else FAILED))
+            self._add(new_items)
+            self._conn.commit()
+
+    def pending(self) -> List[Tuple[str, int]]:
+        """待爬 URL，按入队顺序"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, depth FROM frontier WHERE state = ? ORDER BY rowid", (PENDING,)
+            ).fetchall()
+
+    def finished(self) -> Set[str]:
+        """已完成的 URL"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM frontier WHERE state = ?", (DONE,)).fetchall()
+        return {row[0] for row in rows}
+
+    def results(self) -> List[Dict]:
+        """已保存的结果，按完成顺序"""
+        return list(self.iter_results())
+
+    def iter_results(self, batch_size: int = 200) -> Iterator[Dict]:
+        """逐批读取已保存的结果，不一次性载入内存"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, data FROM results WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last, batch_size)).fetchall()
+            if not rows:
+                return
+            for _, data in rows:
+                yield _decode(data)
+            last = rows[-1][0]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall()
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        """合并 WAL 并关闭"""
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                self._conn.close()
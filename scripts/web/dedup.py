@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+近重复页面检测
+文档站常在版本路径、语言前缀、末尾斜杠变体下提供同一份内容，
+按正文的 SimHash 指纹识别，重复页面不再展开链接、不重复写入报告
+
+- 分词：英文/数字按词，中日韩按字；取 SHINGLE_SIZE 个词的滑动窗口
+- 64 位 SimHash，海明距离 <= max_distance 视为近重复
+- 指纹分成 max_distance + 1 段建索引：距离不超过 max_distance 的两个指纹至少有一段完全相同（抽屉原理），
+  只需比较同段候选
+"""
+
+import re
+import threading
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ============ 配置 ============
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 4
+DEFAULT_MAX_DISTANCE = 3
+MIN_CONTENT_LENGTH = 200  # 正文太短的页面不参与判重（内容少时指纹不可靠）
+
+TOKEN_RE = re.compile(r'[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]|[^\W\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]+')
+
+
+def _tokens(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def simhash(text: str) -> int:
+    """正文的 64 位 SimHash"""
+    tokens = _tokens(text)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [' '.join(tokens)]
+    else:
+        shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+    # 按字节统计取值次数，最后再展开成位：与逐位累加等价，但与 shingle 数量相关的开销只有 8 次计数
+    byte_counts = [dict() for _ in range(SIMHASH_BITS // 8)]
+    for shingle in shingles:
+        digest = blake2b(shingle.encode('utf-8'), digest_size=SIMHASH_BITS // 8).digest()
+        for pos, value in enumerate(digest):
+            counts = byte_counts[pos]
+            counts[value] = counts.get(value, 0) + 1
+
+    total = len(shingles)
+    fingerprint = 0
+    for pos, counts in enumerate(byte_counts):
+        for bit in range(8):
+            ones = sum(n for value, n in counts.items() if value >> bit & 1)
+            if ones * 2 > total:
+                fingerprint |= 1 << (pos * 8 + bit)
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class DuplicateIndex:
+    """SimHash 分段索引，按到达顺序把第一个页面作为规范页"""
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE,
+                 min_length: int = MIN_CONTENT_LENGTH):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+        self._band_mask = (1 << self.band_bits) - 1
+        self._index: List[Dict[int, List[Tuple[int, str]]]] = [dict() for _ in range(self.bands)]
+        self._lock = threading.Lock()  # 批量爬取的工作线程会并发调用
+        self.pages = 0
+        self.duplicates = 0
+
+    def _band_keys(self, fingerprint: int):
+        for band in range(self.bands):
+            yield band, (fingerprint >> (band * self.band_bits)) & self._band_mask
+
+    def check(self, url: str, text: str, fingerprint: int = None) -> Optional[str]:
+        """
+        判重并登记
+        近重复返回规范页 URL；否则把该页登记为规范页并返回 None
+        fingerprint: 已在别处（如分片工作进程）算好的 simhash(text)
+        """
+        if len(text) < self.min_length:
+            return None
+
+        if fingerprint is None:
+            fingerprint = simhash(text)
+        with self._lock:
+            self.pages += 1
+            for band, key in self._band_keys(fingerprint):
+                for other, other_url in self._index[band].get(key, ()):
+                    if other_url != url and hamming(fingerprint, other) <= self.max_distance:
+                        self.duplicates += 1
+                        return other_url
+
+            for band, key in self._band_keys(fingerprint):
+                self._index[band].setdefault(key, []).append((fingerprint, url))
+        return None
+
+    def stats(self) -> Dict:
+        return {'pages': self.pages, 'duplicates': self.duplicates}
+
+
+def collapse_duplicates(results: List[Dict]) -> Tuple[List[Dict], Dict[str, List[str]]]:
+    """
+    折叠重复页面
+    返回 (规范页列表, 规范页 URL -> 重复页 URL 列表)
+    """
+    canonical = [r for r in results if not r.get('duplicate_of')]
+    return canonical, duplicate_groups(results)
+
+
+def duplicate_groups(results: Iterable[Dict]) -> Dict[str, List[str]]:
+    """规范页 URL -> 重复页 URL 列表（可对流式读取的结果使用，只保留 URL）"""
+    groups: Dict[str, List[str]] = {}
+    for r in results:
+        if r.get('duplicate_of'):
+            groups.setdefault(r['duplicate_of'], []).append(r['url'])
+    return groups
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+文档全文检索
+在 SQLite FTS5 索引中按章节查询爬取结果和本地文档，返回 BM25 排序的位置和摘要片段，
+需要细节时再按位置（文件:行号 / URL#锚点）读取对应章节
+
+用法：
+    # 建立/更新索引（默认 docs/frameworks 和 docs/claude-code；之后不带参数即按上次的路径增量更新）
+    python docs-search.py index
+    python docs-search.py index docs/frameworks crawl/vue.jsonl --blob-store crawl/blobs
+    # 查询（--refresh 先增量更新，文件未变时只需几毫秒）
+    python docs-search.py query "PreToolUse matcher"
+    python docs-search.py query "dialog focus*" --source "*radix-vue*" -n 5
+    python docs-search.py query "hooks NEAR/5 matcher" --raw --full
+    python docs-search.py stats
+"""
+
+import argparse
+import json
+import sys
+
+from blob_store import BlobStore
+from docs_index import DocsIndex, DEFAULT_INDEX_PATH, DEFAULT_LIMIT, DEFAULT_SOURCES
+
+
+def print_results(results, full: bool = False):
+    if not results:
+        print("没有匹配的章节")
+        return
+    for i, result in enumerate(results, 1):
+        heading = result['heading'] if result['heading'] != result['title'] else ''
+        print(f"{i}. {result['title']}" + (f" › {heading}" if heading else "") + f"  ({result['score']})")
+        print(f"   {result['location']}")
+        if full:
+            print()
+            print(result['body'])
+            print()
+        else:
+            print(f"   {result['snippet']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文档全文检索（SQLite FTS5，章节粒度）')
+    parser.add_argument('--db', default=str(DEFAULT_INDEX_PATH),
+                        help=f'索引文件 (默认: {DEFAULT_INDEX_PATH})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index = commands.add_parser('index', help='建立或增量更新索引')
+    index.add_argument('paths', nargs='*',
+                       help=f'Markdown 目录/文件、爬取结果 JSONL；不给出时用上次的路径 '
+                            f'(第一次为 {", ".join(DEFAULT_SOURCES)})')
+    index.add_argument('--blob-store', metavar='DIR',
+                       help='爬取时的 --blob-store 目录（JSONL 中只有正文哈希时需要）')
+    index.add_argument('--rebuild', action='store_true', help='清空后重建')
+
+    query = commands.add_parser('query', help='查询')
+    query.add_argument('text', help='查询词，空格分隔的词都要出现；词尾 * 为前缀匹配')
+    query.add_argument('-n', '--limit', type=int, default=DEFAULT_LIMIT,
+                       help=f'返回条数 (默认: {DEFAULT_LIMIT})')
+    query.add_argument('--source', metavar='GLOB', help='只查来源（文件路径或 URL）匹配的文档')
+    query.add_argument('--raw', action='store_true', help='查询词按 FTS5 语法原样使用（OR、NEAR、列过滤等）')
+    query.add_argument('--full', action='store_true', help='输出章节全文而不是摘要片段')
+    query.add_argument('--refresh', action='store_true', help='查询前按登记的路径增量更新')
+    query.add_argument('--blob-store', metavar='DIR', help='同 index，--refresh 时使用')
+    query.add_argument('-j', '--json', action='store_true', help='JSON 格式输出')
+
+    commands.add_parser('stats', help='索引统计')
+
+    args = parser.parse_args()
+    docs = DocsIndex(args.db)
+    blobs = BlobStore(args.blob_store) if getattr(args, 'blob_store', None) else None
+
+    if args.command == 'index':
+        if args.rebuild:
+            docs.rebuild()
+        docs.update(args.paths, blobs)
+        print(f"索引: {docs.summary()}")
+        stats = docs.get_stats()
+        print(f"共 {sum(stats['documents'].values())} 个文档, {stats['sections']} 个章节, "
+              f"{stats['size_bytes'] / 1024 / 1024:.1f} MB → {docs.path}")
+    elif args.command == 'query':
+        if args.refresh:
+            docs.update(blobs=blobs)
+        try:
+            results = docs.search(args.text, args.limit, args.source, args.raw, args.full)
+        except ValueError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        if args.json:
+            print(json.dumps(results, indent=2, ensure_ascii=False))
+        else:
+            print_results(results, args.full)
+    elif args.command == 'stats':
+        stats = docs.get_stats()
+        print(f"索引: {docs.path} ({stats['size_bytes'] / 1024 / 1024:.1f} MB)")
+        print("文档: " + (", ".join(f"{kind} {count}" for kind, count in stats['documents'].items()) or "无"))
+        print(f"章节: {stats['sections']}")
+        print("路径:")
+        for root in docs.roots():
+            print(f"  {root}")
+    docs.close()
+
+
+if __name__ == '__main__':
+    main()
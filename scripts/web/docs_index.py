@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+文档全文索引
+把爬取结果（JSONL）和本地 Markdown 文档（docs/frameworks、docs/claude-code）按章节
+写入 SQLite FTS5 索引，查询时按 BM25 排序并返回摘要片段，不必 grep 或整篇读入
+
+- 章节粒度：按 1~3 级标题切分（代码块中的 # 不算标题），每个章节记录标题路径、锚点和起始行号
+- 排序：bm25，文档标题、章节标题、正文分别加权
+- 中日韩文字：逐字之间插入零宽空格后交给 unicode61 分词（单字为词元，查询按短语匹配），
+  存储的原文去掉零宽空格即可还原
+- 增量更新：文件 mtime 和大小未变不读取；变了再比较内容哈希，只重建变化的文档；
+  已删除的文件、JSONL 中不再出现的页面从索引移除
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from blob_store import BlobStore
+from incremental import content_hash
+from jsonl_sink import iter_jsonl
+
+
+# ============ 配置 ============
+
+DEFAULT_INDEX_PATH = Path.home() / '.cache' / 'web-crawler' / 'docs-index.db'
+DEFAULT_SOURCES = ['docs/frameworks', 'docs/claude-code']  # 相对当前目录
+SECTION_LEVEL = 3  # 切分章节的最深标题级别，更深的标题留在正文中
+DEFAULT_LIMIT = 10
+SNIPPET_TOKENS = 24  # 摘要片段的词元数
+TITLE_WEIGHT = 4.0  # bm25 列权重：文档标题、章节标题、正文
+HEADING_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+MARKDOWN = 'markdown'
+CRAWL = 'crawl'
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+CJK_BOUNDARY_RE = re.compile(rf'(?<=[{CJK}])(?=\S)|(?<=\S)(?=[{CJK}])')
+SEPARATOR = '\u200b'  # 零宽空格：unicode61 视为分隔符，显示时去掉
+SLUG_STRIP_RE = re.compile(rf'[^\w\s{CJK}-]')
+
+
+def segment(text: str) -> str:
+    """中日韩文字逐字分隔（其余文字不变）"""
+    return CJK_BOUNDARY_RE.sub(SEPARATOR, text)
+
+
+def unsegment(text: str) -> str:
+    return text.replace(SEPARATOR, '')
+
+
+def slugify(heading: str) -> str:
+    """GitHub 风格锚点：小写、去掉标点、空格换成 -"""
+    return re.sub(r'\s', '-', SLUG_STRIP_RE.sub('', heading.strip().lower()))
+
+
+def build_query(text: str) -> str:
+    """
+    把查询文本转成 FTS5 表达式：每个词作为短语（词之间为 AND），词尾 * 表示前缀匹配
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith('*') and len(term) > 1
+        term = term.rstrip('*').replace('"', '')
+        if term:
+            terms.append(f'"{segment(term)}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+# ============ 章节切分 ============
+
+def _build_sections(lines: List[str], bounds: List[tuple], title: str,
+                    with_lines: bool) -> List[Dict]:
+    """按 (行号, 级别, 标题) 边界把行切成章节，标题路径为各级祖先标题（不含文档标题本身）"""
+    sections = []
+    stack: List[tuple] = []  # (级别, 标题)
+    starts = [(0, 0, '')] + bounds
+    for i, (start, level, heading) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(lines)
+        if level:
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, heading))
+            body_start = start + 1
+        else:
+            body_start = start
+        body = '\n'.join(lines[body_start:end]).strip()
+        if not body and not level:
+            continue  # 第一个标题之前没有内容
+        sections.append({
+            'heading': ' > '.join(h for l, h in stack if not (l == 1 and h == title)) or title,
+            'anchor': slugify(heading) if level else '',
+            'line': start + 1 if with_lines else None,
+            'body': body,
+        })
+    return sections
+
+
+def split_markdown(text: str, title: str = '') -> tuple:
+    """Markdown → (文档标题, 章节列表)；标题取第一个一级标题，没有时用 title"""
+    lines = text.split('\n')
+    offset = 0
+    if lines and lines[0].strip() == '---':
+        # YAML frontmatter
+        for i in range(1, len(lines)):
+            if lines[i].strip() == '---':
+                offset = i + 1
+                break
+
+    bounds = []
+    in_fence = False
+    for i in range(offset, len(lines)):
+        if FENCE_RE.match(lines[i]):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else HEADING_RE.match(lines[i])
+        if match:
+            level = len(match.group(1))
+            heading = match.group(2).strip()
+            if level == 1 and not any(b[1] == 1 for b in bounds):
+                title = heading
+            if level <= SECTION_LEVEL:
+                bounds.append((i, level, heading))
+
+    # frontmatter 之前的行不参与切分
+    for i in range(offset):
+        lines[i] = ''
+    return title, _build_sections(lines, bounds, title, with_lines=True)
+
+
+def split_page(content: str, headings: Iterable[Dict], title: str = '') -> List[Dict]:
+    """
+    爬取结果 → 章节列表
+    正文是提取后的纯文本，标题文字作为单独一行出现：按 headings 依次在正文中定位
+    """
+    if any(HEADING_RE.match(line) for line in content.split('\n')):
+        return split_markdown(content, title)[1]
+
+    lines = content.split('\n')
+    bounds = []
+    position = 0
+    for heading in headings or []:
+        level, text = heading.get('level', 1), (heading.get('text') or '').strip()
+        if not text or level > SECTION_LEVEL:
+            continue
+        for i in range(position, len(lines)):
+            if lines[i].strip() == text:
+                bounds.append((i, level, text))
+                position = i + 1
+                break
+    return _build_sections(lines, bounds, title, with_lines=False)
+
+
+# ============ 索引 ============
+
+class DocsIndex:
+    """基于 SQLite FTS5 的章节级文档索引"""
+
+    def __init__(self, path: str = None):
+        self.path = Path(path) if path else DEFAULT_INDEX_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                kind TEXT,
+                mtime REAL,
+                size INTEGER,
+                hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                source TEXT UNIQUE,
+                kind TEXT,
+                file TEXT,
+                title TEXT,
+                hash TEXT,
+                indexed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_file ON documents(file);
+            CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+                title, heading, body,
+                doc UNINDEXED, anchor UNINDEXED, line UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS roots (
+                path TEXT PRIMARY KEY
+            );
+        """)
+        self._conn.commit()
+        self.stats = {'files_skipped': 0, 'documents_indexed': 0, 'documents_unchanged': 0,
+                      'documents_removed': 0, 'sections_indexed': 0}
+
+    # ---------- 写入 ----------
+
+    def _file_unchanged(self, path: Path, kind: str) -> Optional[tuple]:
+        """文件 mtime/大小与上次相同时返回 None，否则返回 (mtime, size, 内容字节)"""
+        stat = path.stat()
+        row = self._conn.execute("SELECT mtime, size, hash FROM files WHERE path = ?",
+                                 (str(path),)).fetchone()
+        if row and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            return None
+        data = path.read_bytes()
+        digest = blake2b(data, digest_size=16).hexdigest()
+        self._conn.execute("INSERT OR REPLACE INTO files (path, kind, mtime, size, hash) VALUES (?, ?, ?, ?, ?)",
+                           (str(path), kind, stat.st_mtime, stat.st_size, digest))
+        if row and row[2] == digest:
+            return None  # 只是 touch 过
+        return stat.st_mtime, stat.st_size, data
+
+    def _put_document(self, source: str, kind: str, file: str, title: str,
+                      digest: str, sections: List[Dict]) -> bool:
+        """写入（或替换）一个文档的所有章节；内容哈希未变时只更新来源文件，返回是否重建"""
+        row = self._conn.execute("SELECT id, hash FROM documents WHERE source = ?", (source,)).fetchone()
+        if row and row[1] == digest:
+            self._conn.execute("UPDATE documents SET file = ? WHERE id = ?", (file, row[0]))
+            self.stats['documents_unchanged'] += 1
+            return False
+        if row:
+            doc = row[0]
+            self._conn.execute("DELETE FROM sections WHERE doc = ?", (doc,))
+            self._conn.execute("UPDATE documents SET kind = ?, file = ?, title = ?, hash = ?, indexed_at = ? "
+                               "WHERE id = ?", (kind, file, title, digest, time.time(), doc))
+        else:
+            doc = self._conn.execute(
+                "INSERT INTO documents (source, kind, file, title, hash, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (source, kind, file, title, digest, time.time())).lastrowid
+
+        self._conn.executemany(
+            "INSERT INTO sections (title, heading, body, doc, anchor, line) VALUES (?, ?, ?, ?, ?, ?)",
+            [(segment(title), segment(s['heading']), segment(s['body']), doc, s['anchor'], s['line'])
+             for s in sections])
+        self.stats['documents_indexed'] += 1
+        self.stats['sections_indexed'] += len(sections)
+        return True
+
+    def _remove_documents(self, where: str, params: tuple):
+        docs = [row[0] for row in self._conn.execute(f"SELECT id FROM documents WHERE {where}", params)]
+        for doc in docs:
+            self._conn.execute("DELETE FROM sections WHERE doc = ?", (doc,))
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (doc,))
+        self.stats['documents_removed'] += len(docs)
+
+    def index_markdown(self, path: Path) -> bool:
+        """索引一个 Markdown 文件（每个文件一个文档）"""
+        path = Path(path).resolve()
+        with self._lock:
+            changed = self._file_unchanged(path, MARKDOWN)
+            if changed is None:
+                self.stats['files_skipped'] += 1
+                self._conn.commit()
+                return False
+            text = changed[2].decode('utf-8', errors='replace')
+            title, sections = split_markdown(text, path.stem)
+            self._put_document(str(path), MARKDOWN, str(path), title, content_hash(text), sections)
+            self._conn.commit()
+            return True
+
+    def index_jsonl(self, path: Path, blobs: BlobStore = None) -> bool:
+        """
+        索引爬取结果 JSONL（每个页面一个文档，以 URL 为键）
+        正文在正文存储中（--blob-store 爬取）时需要传入 blobs
+        """
+        path = Path(path).resolve()
+        with self._lock:
+            if self._file_unchanged(path, CRAWL) is None:
+                self.stats['files_skipped'] += 1
+                self._conn.commit()
+                return False
+
+            seen = set()
+            for record in iter_jsonl(path):
+                if record.get('duplicate_of'):
+                    continue
+                page = record.get('result', record)  # 批量爬取的条目把页面放在 result 中
+                if 'content' in page:
+                    content = page['content']
+                elif page.get('blob') and blobs is not None:
+                    content = blobs.text(page)
+                else:
+                    continue
+                if not content:
+                    continue
+                url = record['url']
+                title = page.get('title') or url
+                seen.add(url)
+                self._put_document(url, CRAWL, str(path), title, content_hash(content),
+                                   split_page(content, page.get('headings'), title))
+
+            # 这个文件上次有、这次没有的页面（另一个文件重新爬到的已改记到那个文件下）
+            stale = [row[0] for row in self._conn.execute(
+                "SELECT source FROM documents WHERE file = ?", (str(path),)) if row[0] not in seen]
+            for source in stale:
+                self._remove_documents("source = ?", (source,))
+            self._conn.commit()
+            return True
+
+    def prune(self):
+        """移除已删除文件的文档"""
+        with self._lock:
+            for (path,) in self._conn.execute("SELECT path FROM files").fetchall():
+                if not Path(path).exists():
+                    self._remove_documents("file = ?", (path,))
+                    self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def update(self, paths: Iterable[str] = None, blobs: BlobStore = None) -> Dict:
+        """
+        增量更新：目录下的 *.md 和显式给出的 .md / .jsonl(.gz/.zst) 文件
+        paths 为空时使用上次登记的路径（第一次为 DEFAULT_SOURCES）
+        """
+        paths = [str(Path(p).resolve()) for p in paths] if paths else self.roots()
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO roots (path) VALUES (?)", [(p,) for p in paths])
+            self._conn.commit()
+
+        for root in map(Path, paths):
+            if root.is_dir():
+                for path in sorted(root.rglob('*.md')):
+                    self.index_markdown(path)
+            elif '.jsonl' in root.name and root.exists():
+                self.index_jsonl(root, blobs)
+            elif root.exists():
+                self.index_markdown(root)
+        self.prune()
+        return dict(self.stats)
+
+    def roots(self) -> List[str]:
+        """登记过的索引路径（文件或目录）"""
+        with self._lock:
+            roots = [row[0] for row in self._conn.execute("SELECT path FROM roots ORDER BY path")]
+        return roots or [str(Path(p).resolve()) for p in DEFAULT_SOURCES]
+
+    def rebuild(self):
+        """清空索引（登记的路径保留）"""
+        with self._lock:
+            self._conn.executescript("DELETE FROM sections; DELETE FROM documents; DELETE FROM files;")
+            self._conn.commit()
+
+    # ---------- 查询 ----------
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT, source: str = None,
+               raw: bool = False, full: bool = False) -> List[Dict]:
+        """
+        按 bm25 排序查询章节
+        source: 只查来源匹配该 glob 的文档（文件路径或 URL）
+        raw: query 是 FTS5 表达式，不做转换
+        full: 结果带上章节全文
+        """
+        expression = query if raw else build_query(query)
+        if not expression:
+            return []
+        sql = (f"SELECT d.source, d.kind, d.title, s.heading, s.anchor, s.line, "
+               f"snippet(sections, -1, '**', '**', ' … ', {SNIPPET_TOKENS}), "
+               f"bm25(sections, {TITLE_WEIGHT}, {HEADING_WEIGHT}, {BODY_WEIGHT}) AS score, s.body "
+               f"FROM sections s JOIN documents d ON d.id = s.doc "
+               f"WHERE sections MATCH ?")
+        params: list = [expression]
+        if source:
+            sql += " AND d.source GLOB ?"
+            params.append(source)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"查询语法错误: {e}")
+
+        results = []
+        for doc_source, kind, title, heading, anchor, line, snippet, score, body in rows:
+            location = doc_source + (f"#{anchor}" if anchor else '')
+            if kind == MARKDOWN and line:
+                location = f"{doc_source}:{line}"
+            result = {
+                'source': doc_source,
+                'kind': kind,
+                'title': title,
+                'heading': unsegment(heading),
+                'location': location,
+                'line': line,
+                'snippet': ' '.join(unsegment(snippet).split()),
+                'score': round(-score, 3),  # bm25 越小越相关，取反后越大越相关
+            }
+            if full:
+                result['body'] = unsegment(body)
+            results.append(result)
+        return results
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall())
+            sections = self._conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+        return {
+            'documents': counts,
+            'sections': sections,
+            'size_bytes': sum(p.stat().st_size for p in (self.path, self.path.with_name(self.path.name + '-wal'))
+                              if p.exists()),
+        }
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"重建 {stats['documents_indexed']} 个文档（{stats['sections_indexed']} 个章节）, "
+                f"内容未变 {stats['documents_unchanged']} 个, 文件未变跳过 {stats['files_skipped']} 个, "
+                f"移除 {stats['documents_removed']} 个")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -9,6 +9,8 @@ DOM 样式检查器
     python dom-inspector.py <url> --selector ".button" --styles
     python dom-inspector.py <url> --selector "#header" --css-vars
     python dom-inspector.py <url> --selector ".card" --all --screenshot output.png
+    # 需要登录的页面：先用 browser-session.py record 录制会话
+    python dom-inspector.py <url> --selector ".nav" --styles --sessions
 """
 
 import argparse
@@ -17,6 +19,10 @@ import sys
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
+from readiness import wait_for_ready
+from resource_profiles import PROFILES, ResourceStats, apply_resource_profile
+from sessions import SessionStore, DEFAULT_SESSION_DIR
+
 
 def get_computed_styles(page, selector: str) -> dict:
     """获取元素的 computed style"""
@@ -212,7 +218,11 @@ def main():
     parser.add_argument('--all', '-a', action='store_true', help='获取所有信息')
     parser.add_argument('--screenshot', '-sh', help='截图输出路径')
     parser.add_argument('--output', '-o', help='JSON 输出文件')
-    parser.add_argument('--wait', '-w', type=int, default=3, help='等待秒数')
+    parser.add_argument('--profile', choices=list(PROFILES), default='full',
+                        help='资源拦截配置，样式检查需要保留 CSS (默认: full)')
+    parser.add_argument('--wait', '-w', type=int, default=3, help='最长等待秒数（页面就绪后提前返回）')
+    parser.add_argument('--sessions', nargs='?', const=str(DEFAULT_SESSION_DIR), metavar='DIR',
+                        help=f'注入 browser-session.py 录制的登录会话 (目录默认: {DEFAULT_SESSION_DIR})')
 
     args = parser.parse_args()
 
@@ -224,9 +234,13 @@ def main():
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+        sessions = SessionStore(args.sessions) if args.sessions else None
+        context = browser.new_context(**(sessions.context_options(args.url) if sessions else {}))
+        page = context.new_page()
+        resource_stats = ResourceStats()
+        apply_resource_profile(page, args.profile, resource_stats)
         page.goto(args.url, wait_until='networkidle', timeout=30000)
-        page.wait_for_timeout(args.wait * 1000)
+        wait_for_ready(page, args.wait)
 
         # 检查元素是否存在
         exists = page.evaluate(f"""
@@ -255,6 +269,7 @@ def main():
         if args.screenshot:
             result['data']['screenshot'] = capture_screenshot(page, args.selector, args.screenshot)
 
+        result['resource_stats'] = resource_stats.to_dict()
         browser.close()
 
     # 输出
@@ -7,27 +7,72 @@
 - 单页爬取
 - 整站爬取（链接发现）
 - 深度控制
-- 并发爬取
-- 错误重试
+- 并发爬取（asyncio + playwright.async_api，同一浏览器内多页并行）
+- 错误重试：按失败类型（404、5xx、超时、DNS……）决定是否重试，指数退避加抖动；主机连续失败时熔断
+- 磁盘缓存（ETag/Last-Modified 条件重验）
+- 静态优先：先 HTTP GET 解析，正文不足或是 JS 外壳时才启动浏览器
+- 资源拦截配置（text-only / render / full）
+- 站点爬取状态落盘，中断后 --resume 断点续爬
+- 按主机限速/限并发，遵守 robots.txt Crawl-delay，429/503 自动退避
+- 从 robots.txt / sitemap.xml 预先填充 frontier（--sitemap / --sitemap-only）
+- 优先级 frontier：按路径模板、入链、深度和 --boost 模式评分，预算先给高价值页面
+- 紧凑的已访问集合（64 位指纹 + 可选 Bloom），链接入队后即释放，适合百万级 URL
+- SimHash 近重复检测：版本/语言镜像页只保留一份
+- 流式 JSONL 输出：每个页面完成即追加落盘（可 gzip/zstd），内存占用与站点规模无关
+- 增量重爬：清单记录正文哈希/lastmod/校验器，只重新提取新增或变化的页面，输出变更列表
+- 分阶段计时：每页各阶段耗时写成 JSONL 事件，按阶段/主机汇总 p50/p95/p99，可导出 Prometheus
+- 多进程分片：frontier 按 URL/主机哈希分给多个工作进程（各自的浏览器），本进程统一去重和写入
+- 标签页池（--tabs）：同源页面共用长期 context 和预热标签页，about:blank 复位后复用，不再每个 URL 新建 context
+- 登录会话（--sessions）：按主机注入录制好的 storage_state，静态层带同样的 Cookie，过期时刷新
+- 正文存储（--blob-store）：正文按内容哈希压缩保存一次，JSONL 只记哈希，Markdown 从存储读出
+- 时间预算：全局截止时间（到点前停止派发、落盘已完成结果）、单页预算、单主机预算
 """
 
 import argparse
 import sys
 import asyncio
+import threading
 from pathlib import Path
-from urllib.parse import urljoin, urlparse, urlunparse
-from collections import deque
-from typing import Set, List, Dict, Optional
+from urllib.parse import urlparse, urlunparse
+from collections import Counter
+from typing import Set, List, Dict, Optional, Callable, Iterable, Iterator
+from contextlib import nullcontext
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from playwright.async_api import async_playwright
 import time
 
+from browser_pool import BrowserPool, AsyncBrowserPool, DEFAULT_PAGES_PER_BROWSER
+from page_pool import PagePool, AsyncPagePool
+from sessions import SessionStore, DEFAULT_SESSION_DIR
+from blob_store import BlobStore
+from page_cache import PageCache, DEFAULT_TTL, is_not_modified
+from incremental import Manifest, UNCHANGED
+from crawl_store import CrawlStore
+from sitemap_seeder import seed_urls
+from frontier import PriorityFrontier, URLScorer, matches_any
+from url_seen import URLSeen
+from dedup import DuplicateIndex, MIN_CONTENT_LENGTH, collapse_duplicates, duplicate_groups, simhash
+from jsonl_sink import JSONLSink, iter_jsonl, jsonl_path
+from sharding import SHARD_KEYS, ShardedFrontier, ShardPool, split_limits
+from timing import (PageTimer, TimingRecorder, span, timed_enter, timed_enter_async)
+from politeness import PolitenessScheduler, DEFAULT_RATE, parse_retry_after
+from retry_policy import (FetchError, RetryPolicy, CircuitBreaker, OK, NOT_FOUND, EMPTY,
+                          NAVIGATION, TIMEOUT, CIRCUIT_OPEN, DEFAULT_BREAKER_THRESHOLD,
+                          DEFAULT_BREAKER_COOLDOWN, outcome_for_status, summarize_outcomes)
+from budget import Budget, PageDeadline, DEFAULT_PAGE_BUDGET
+from static_fetch import fetch_static, STATIC_TIMEOUT
+from readiness import CONTENT_SELECTORS, wait_for_ready, wait_for_ready_async
+from resource_profiles import (PROFILES, DEFAULT_PROFILE, ResourceStats,
+                               apply_resource_profile, apply_resource_profile_async)
+
 
 # ============ 配置 ============
 
 DEFAULT_CONCURRENCY = 3  # 默认并发数
 DEFAULT_DEPTH = 2  # 默认爬取深度
-DEFAULT_RETRY = 3  # 默认重试次数
-DEFAULT_WAIT = 5  # 默认等待秒数
+DEFAULT_RETRY = 3  # 默认最多尝试次数（实际重试按失败类型决定）
+DEFAULT_WAIT = 5  # 默认最长等待秒数（页面就绪后提前返回）
+RESCORE_EVERY = 25  # 每完成多少页面对 frontier 整体重新评分
 
 
 # ============ 工具函数 ============
@@ -87,129 +132,337 @@ def is_same_domain(url: str, base_url: str) -> bool:
         return False
 
 
+# 排除常见文件类型
+EXCLUDED_EXTENSIONS = ('.pdf', '.zip', '.tar', '.gz', '.rar',
+                       '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+                       '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico',
+                       '.mp3', '.mp4', '.avi', '.mov', '.woff', '.woff2', '.ttf')
+
+
 def is_valid_path(url: str) -> bool:
     """检查 URL 路径是否有效（排除文件下载链接等）"""
     try:
-        parsed = urlparse(url)
-        path = parsed.path.lower()
-
-        # 排除常见文件类型
-        excluded_extensions = ('.pdf', '.zip', '.tar', '.gz', '.rar',
-                             '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-                             '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico',
-                             '.mp3', '.mp4', '.avi', '.mov', '.woff', '.woff2', '.ttf')
-
-        return not any(path.endswith(ext) for ext in excluded_extensions)
+        return not urlparse(url).path.lower().endswith(EXCLUDED_EXTENSIONS)
     except:
         return False
 
 
-# ============ 核心功能 ============
+def filter_links(anchors: List[Dict], base_url: str) -> Dict[str, Dict]:
+    """
+    批量过滤链接：先按原始 href 去重，再归一化、同域、扩展名过滤
+    anchors: [{href(绝对地址), text, region}]
+    返回 {归一化 URL: {text, region, count}}，region 只要出现在正文就记为 body
+    """
+    base_netloc = urlparse(base_url).netloc
+    base_suffix = '.' + base_netloc
 
-def extract_main_content(page) -> str:
-    """提取页面主要内容"""
-    selectors = [
-        'main', 'article', '.content', '.main-content', '#content',
-        '.docs-content', '.documentation', '.prose', 'body'
-    ]
+    grouped: Dict[str, List[Dict]] = {}
+    for anchor in anchors:
+        grouped.setdefault(anchor['href'], []).append(anchor)
 
-    content = None
-    for selector in selectors:
+    links: Dict[str, Dict] = {}
+    for href, group in grouped.items():
         try:
-            element = page.locator(selector).first
-            if element.count() > 0:
-                content = element.inner_text()
-                if len(content) > 500:
-                    break
-        except:
+            parsed = urlparse(href)
+        except ValueError:
+            continue
+        if parsed.scheme not in ('http', 'https'):
+            continue
+        netloc = parsed.netloc
+        if netloc != base_netloc and not netloc.endswith(base_suffix):
+            continue
+        if parsed.path.lower().endswith(EXCLUDED_EXTENSIONS):
             continue
 
-    if not content:
-        content = page.locator('body').inner_text()
+        normalized = urlunparse((parsed.scheme, netloc, parsed.path, '', '', ''))
+        meta = links.get(normalized)
+        if meta is None:
+            meta = links[normalized] = {'text': '', 'region': 'nav', 'count': 0}
+        for anchor in group:
+            meta['count'] += 1
+            if not meta['text'] and anchor.get('text'):
+                meta['text'] = anchor['text']
+            if anchor.get('region') == 'body':
+                meta['region'] = 'body'
 
-    return clean_text(content)
+    return links
 
 
-def extract_links(page, base_url: str) -> Set[str]:
-    """从页面提取所有相关链接"""
-    links = set()
+# ============ 核心功能 ============
 
-    try:
-        # 获取所有 a 标签的 href
-        anchor_elements = page.locator('a[href]')
+# 一次 evaluate 完成正文定位和提取：
+# 候选容器 = 语义选择器命中的元素 + 段落/代码块的父级和祖父级（readability 思路），
+# 按文本长度 × (1 - 链接密度) 打分，语义容器加分，导航/侧栏类名减分
+PAGE_PAYLOAD_JS = """
+({selectors, minChars}) => {
+    const NEGATIVE = /nav|sidebar|menu|footer|header|toc|breadcrumb|comment|banner|cookie/i;
+    const candidates = new Map();
+    const add = (el, bonus) => {
+        if (!el || el === document.documentElement) return;
+        candidates.set(el, Math.max(candidates.get(el) || 0, bonus));
+    };
+
+    selectors.forEach((selector, i) => {
+        document.querySelectorAll(selector).forEach(el => add(el, 1 + (selectors.length - i) / selectors.length));
+    });
+    document.querySelectorAll('p, pre, li, td').forEach(el => {
+        add(el.parentElement, 0);
+        if (el.parentElement) add(el.parentElement.parentElement, 0);
+    });
+
+    let best = null;
+    let bestScore = 0;
+    for (const [el, bonus] of candidates) {
+        const textLength = (el.textContent || '').length;
+        if (textLength < minChars / 2) continue;
+        let linkLength = 0;
+        el.querySelectorAll('a').forEach(a => { linkLength += (a.textContent || '').length; });
+        const linkDensity = linkLength / Math.max(textLength, 1);
+        let score = textLength * (1 - linkDensity) * (1 + bonus);
+        const className = typeof el.className === 'string' ? el.className : '';
+        if (NEGATIVE.test(className + ' ' + el.id)) score *= 0.3;
+        if (el.closest('nav, aside, footer')) score *= 0.3;
+        if (score > bestScore) { best = el; bestScore = score; }
+    }
+    const root = best || document.body;
+    if (!root) return {title: document.title, text: '', headings: [], code_blocks: []};
+
+    const headingRoot = root.querySelector('h1, h2, h3') ? root : document;
+    const headings = Array.from(headingRoot.querySelectorAll('h1, h2, h3, h4, h5, h6'))
+        .map(h => ({level: Number(h.tagName[1]), text: (h.textContent || '').trim()}))
+        .filter(h => h.text);
+
+    const codeBlocks = Array.from(root.querySelectorAll('pre')).map(pre => {
+        const code = pre.querySelector('code') || pre;
+        const classes = (code.className || '') + ' ' + (pre.className || '');
+        const match = classes.match(/(?:language|lang)-([\\w+#-]+)/);
+        return {
+            language: (match && match[1]) || pre.getAttribute('data-language') || code.getAttribute('data-language') || 'text',
+            code: code.innerText || code.textContent || ''
+        };
+    }).filter(block => block.code.trim());
+
+    return {
+        title: document.title,
+        text: root.innerText || root.textContent || '',
+        headings,
+        code_blocks: codeBlocks
+    };
+}
+"""
 
-        for i in range(anchor_elements.count()):
-            try:
-                href = anchor_elements.nth(i).get_attribute('href')
-                if not href:
-                    continue
+def _payload_args() -> Dict:
+    return {'selectors': CONTENT_SELECTORS, 'minChars': 500}
 
-                # 跳过锚点链接
-                if href.startswith('#'):
-                    continue
 
-                # 处理相对路径
-                full_url = urljoin(base_url, href)
-                normalized = normalize_url(full_url)
+def _clean_payload(payload: Dict) -> Dict:
+    payload['text'] = clean_text(payload.get('text') or '')
+    return payload
 
-                if normalized and is_same_domain(normalized, base_url) and is_valid_path(normalized):
-                    links.add(normalized)
-            except:
-                continue
+
+def extract_page_payload(page) -> Dict:
+    """一次往返提取正文、标题、标题层级和代码块"""
+    return _clean_payload(page.evaluate(PAGE_PAYLOAD_JS, _payload_args()))
+
+
+def extract_main_content(page) -> str:
+    """提取页面主要内容"""
+    return extract_page_payload(page)['text']
+
+
+# 一次 evaluate 取回所有链接：浏览器已解析成绝对地址，并标注所在区域
+LINKS_JS = """
+anchors => anchors
+    .filter(a => !(a.getAttribute('href') || '').startsWith('#'))
+    .map(a => ({
+        href: a.href,
+        text: (a.textContent || '').trim().slice(0, 200),
+        region: a.closest('nav, header, footer, aside, [role="navigation"]') ? 'nav' : 'body'
+    }))
+"""
+
+
+def extract_link_records(page, base_url: str) -> Dict[str, Dict]:
+    """提取页面链接及元数据（锚文本、导航区/正文区），一次浏览器往返"""
+    try:
+        anchors = page.eval_on_selector_all('a[href]', LINKS_JS)
     except Exception as e:
         print(f"提取链接时出错: {e}")
+        return {}
+    return filter_links(anchors, base_url)
 
-    return links
 
+def extract_links(page, base_url: str) -> Set[str]:
+    """从页面提取所有相关链接"""
+    return set(extract_link_records(page, base_url))
+
+
+async def extract_page_payload_async(page) -> Dict:
+    """一次往返提取正文、标题、标题层级和代码块（异步版）"""
+    return _clean_payload(await page.evaluate(PAGE_PAYLOAD_JS, _payload_args()))
+
+
+async def extract_main_content_async(page) -> str:
+    """提取页面主要内容（异步版）"""
+    return (await extract_page_payload_async(page))['text']
+
+
+async def extract_link_records_async(page, base_url: str) -> Dict[str, Dict]:
+    """提取页面链接及元数据（异步版）"""
+    try:
+        anchors = await page.eval_on_selector_all('a[href]', LINKS_JS)
+    except Exception as e:
+        print(f"提取链接时出错: {e}")
+        return {}
+    return filter_links(anchors, base_url)
+
+
+async def extract_links_async(page, base_url: str) -> Set[str]:
+    """从页面提取所有相关链接（异步版）"""
+    return set(await extract_link_records_async(page, base_url))
+
+
+def _validators(headers: Dict) -> Dict:
+    """从响应头提取缓存校验器"""
+    return {
+        'etag': headers.get('etag'),
+        'last_modified': headers.get('last-modified'),
+    }
+
+
+def fetch_static_tier(url: str, on_response: Callable[[int, Dict], None] = None,
+                      deadline: PageDeadline = None,
+                      sessions: SessionStore = None) -> Optional[Dict]:
+    """
+    静态层：HTTP GET + HTML 解析；需要浏览器渲染时返回 None
+    页面不存在（404/410）时抛出 FetchError，浏览器打开也是一样的结果，不必再升级
+    deadline: 单页截止时间，HTTP 超时不超过它
+    sessions: 登录会话，请求带上该主机的 Cookie
+    """
+    statuses = []
+
+    def record(status: int, headers: Dict):
+        statuses.append(status)
+        if on_response is not None:
+            on_response(status, headers)
+
+    timeout = STATIC_TIMEOUT if deadline is None else max(0.1, min(STATIC_TIMEOUT, deadline.remaining()))
+    headers = sessions.headers(url) if sessions is not None else None
+    page = fetch_static(url, timeout=timeout, on_response=record, headers=headers)
+    if page is None:
+        if statuses and outcome_for_status(statuses[-1]) == NOT_FOUND:
+            raise FetchError(NOT_FOUND, f"HTTP {statuses[-1]}", statuses[-1])
+        return None
 
-def fetch_single_url(url: str, wait_time: int = 5, browser=None) -> Optional[Dict]:
-    """获取单个 URL 的内容"""
+    link_meta = filter_links(page['anchors'], url)
+    links = set(link_meta)
+
+    content = clean_text(page['content'])
+    print(f"✓ 静态获取: {page['title']} ({len(content)} 字符, {len(links)} 个链接)")
+
+    return {
+        'url': url,
+        'title': page['title'],
+        'content': content,
+        'links': links,
+        'status': page['status'],
+        'link_meta': link_meta,
+        'headings': page['headings'],
+        'code_blocks': page['code_blocks'],
+        'validators': _validators(page['headers']),
+        'tier': 'static'
+    }
+
+
+def fetch_single_url(url: str, wait_time: int = 5, browser=None,
+                     resource_profile: str = DEFAULT_PROFILE,
+                     resource_stats: ResourceStats = None,
+                     on_response: Callable[[int, Dict], None] = None,
+                     timer: PageTimer = None,
+                     raise_errors: bool = False,
+                     deadline: PageDeadline = None,
+                     sessions: SessionStore = None) -> Optional[Dict]:
+    """
+    获取单个 URL 的内容
+    on_response(status, headers) 在导航得到响应后回调
+    timer 记录 acquire/goto/ready/content/links 各阶段耗时
+    deadline 为导航、就绪、提取合计的截止时间（默认 DEFAULT_PAGE_BUDGET 秒）
+    sessions 给出时注入该主机的登录会话
+    失败时返回 None；raise_errors=True 时抛出带结果分类的 FetchError
+    """
 
     if browser is None:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
+            with span(timer, 'acquire'):
+                browser = p.chromium.launch(headless=True)
+            try:
+                return fetch_single_url(url, wait_time, browser, resource_profile,
+                                        resource_stats, on_response, timer, raise_errors,
+                                        deadline, sessions)
+            finally:
+                browser.close()
+
+    with span(timer, 'acquire'):
+        context = browser.new_context(**(sessions.context_options(url) if sessions is not None else {}))
+    try:
+        with span(timer, 'acquire'):
+            apply_resource_profile(context, resource_profile, resource_stats)
             page = context.new_page()
-            result = _fetch_page(page, url, wait_time)
-            browser.close()
-            return result
-    else:
-        context = browser.new_context()
-        page = context.new_page()
-        result = _fetch_page(page, url, wait_time)
+        return _fetch_page(page, url, wait_time, on_response, timer, deadline)
+    except FetchError as e:
+        if raise_errors:
+            raise
+        print(f"错误: {e} - {url}")
+        return None
+    finally:
+        if sessions is not None:
+            sessions.update(url, context)
         context.close()
-        return result
 
 
-def _fetch_page(page: Page, url: str, wait_time: int) -> Optional[Dict]:
-    """内部方法：爬取单个页面"""
+def _fetch_page(page: Page, url: str, wait_time: int,
+                on_response: Callable[[int, Dict], None] = None,
+                timer: PageTimer = None,
+                deadline: PageDeadline = None) -> Dict:
+    """内部方法：爬取单个页面，失败抛出 FetchError"""
+    if deadline is None:
+        deadline = PageDeadline(DEFAULT_PAGE_BUDGET)
     try:
         print(f"正在访问: {url}")
 
-        response = page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        with span(timer, 'goto'):
+            response = page.goto(url, wait_until='domcontentloaded', timeout=deadline.timeout_ms())
 
         if response is None:
-            print(f"错误: 无法获取页面 {url}")
-            return None
+            raise FetchError(NAVIGATION, "无法获取页面")
 
-        if response.status >= 400:
-            print(f"错误: HTTP {response.status} - {url}")
-            return None
+        if on_response is not None:
+            on_response(response.status, response.headers)
 
-        # 等待动态内容加载
-        if wait_time > 0:
-            page.wait_for_timeout(wait_time * 1000)
-
-        title = page.title()
-        content = extract_main_content(page)
+        if response.status >= 400:
+            raise FetchError(outcome_for_status(response.status), f"HTTP {response.status}",
+                             response.status, parse_retry_after(response.headers.get('retry-after')))
+
+        # 等待动态内容加载（就绪即返回，wait_time 和单页剩余时间为上限）
+        ready_wait = min(wait_time, deadline.remaining())
+        if ready_wait > 0:
+            with span(timer, 'ready'):
+                wait_for_ready(page, ready_wait)
+
+        deadline.check('content')
+        page.set_default_timeout(deadline.timeout_ms())
+        with span(timer, 'content'):
+            payload = extract_page_payload(page)
+        title = payload['title']
+        content = payload['text']
 
         if not content or len(content) < 100:
-            print(f"警告: 页面内容可能为空 - {url}")
-            return None
+            raise FetchError(EMPTY, "页面内容可能为空")
 
         # 提取页面链接
-        base_url = url
-        links = extract_links(page, base_url)
+        with span(timer, 'links'):
+            link_meta = extract_link_records(page, url)
+        links = set(link_meta)
 
         print(f"✓ 成功获取: {title} ({len(content)} 字符, {len(links)} 个链接)")
 
@@ -218,35 +471,259 @@ def _fetch_page(page: Page, url: str, wait_time: int) -> Optional[Dict]:
             'title': title,
             'content': content,
             'links': links,
-            'status': response.status
+            'link_meta': link_meta,
+            'headings': payload['headings'],
+            'code_blocks': payload['code_blocks'],
+            'status': response.status,
+            'validators': _validators(response.headers),
+            'tier': 'browser'
         }
 
     except Exception as e:
+        raise FetchError.from_exception(e)
+
+
+async def fetch_single_url_async(url: str, wait_time: int = 5, browser=None,
+                                 resource_profile: str = DEFAULT_PROFILE,
+                                 resource_stats: ResourceStats = None,
+                                 on_response: Callable[[int, Dict], None] = None,
+                                 timer: PageTimer = None,
+                                 raise_errors: bool = False,
+                                 deadline: PageDeadline = None,
+                                 sessions: SessionStore = None) -> Optional[Dict]:
+    """获取单个 URL 的内容（异步版，browser 为 async_api 的 Browser）"""
+
+    if browser is None:
+        async with async_playwright() as p:
+            with span(timer, 'acquire'):
+                browser = await p.chromium.launch(headless=True)
+            try:
+                return await fetch_single_url_async(url, wait_time, browser, resource_profile,
+                                                    resource_stats, on_response, timer,
+                                                    raise_errors, deadline, sessions)
+            finally:
+                await browser.close()
+
+    with span(timer, 'acquire'):
+        context = await browser.new_context(
+            **(sessions.context_options(url) if sessions is not None else {}))
+    try:
+        with span(timer, 'acquire'):
+            await apply_resource_profile_async(context, resource_profile, resource_stats)
+            page = await context.new_page()
+        return await _fetch_page_async(page, url, wait_time, on_response, timer, deadline)
+    except FetchError as e:
+        if raise_errors:
+            raise
         print(f"错误: {e} - {url}")
         return None
+    finally:
+        if sessions is not None:
+            await sessions.update_async(url, context)
+        await context.close()
+
+
+async def _fetch_page_async(page, url: str, wait_time: int,
+                            on_response: Callable[[int, Dict], None] = None,
+                            timer: PageTimer = None,
+                            deadline: PageDeadline = None) -> Dict:
+    """
+    内部方法：在给定的标签页中爬取单个页面（异步版），失败抛出 FetchError
+    超过 deadline 时连同正在进行的提取一起取消
+    """
+    if deadline is None:
+        deadline = PageDeadline(DEFAULT_PAGE_BUDGET)
+    try:
+        return await asyncio.wait_for(_load_page_async(page, url, wait_time, on_response,
+                                                       timer, deadline),
+                                      deadline.remaining())
+    except asyncio.TimeoutError:
+        raise FetchError(TIMEOUT, f"超出单页预算 {deadline.seconds:.0f} 秒")
+
+
+async def _load_page_async(page, url: str, wait_time: int,
+                           on_response: Callable[[int, Dict], None],
+                           timer: Optional[PageTimer],
+                           deadline: PageDeadline) -> Dict:
+    try:
+        print(f"正在访问: {url}")
+
+        with span(timer, 'goto'):
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=deadline.timeout_ms())
+
+        if response is None:
+            raise FetchError(NAVIGATION, "无法获取页面")
+
+        if on_response is not None:
+            on_response(response.status, response.headers)
+
+        if response.status >= 400:
+            raise FetchError(outcome_for_status(response.status), f"HTTP {response.status}",
+                             response.status, parse_retry_after(response.headers.get('retry-after')))
+
+        # 等待动态内容加载（只挂起当前协程，其他页面照常推进）
+        ready_wait = min(wait_time, deadline.remaining())
+        if ready_wait > 0:
+            with span(timer, 'ready'):
+                await wait_for_ready_async(page, ready_wait)
+
+        deadline.check('content')
+
+        with span(timer, 'content'):
+            payload = await extract_page_payload_async(page)
+        title = payload['title']
+        content = payload['text']
+
+        if not content or len(content) < 100:
+            raise FetchError(EMPTY, "页面内容可能为空")
+
+        with span(timer, 'links'):
+            link_meta = await extract_link_records_async(page, url)
+        links = set(link_meta)
+
+        print(f"✓ 成功获取: {title} ({len(content)} 字符, {len(links)} 个链接)")
+
+        return {
+            'url': url,
+            'title': title,
+            'content': content,
+            'links': links,
+            'link_meta': link_meta,
+            'headings': payload['headings'],
+            'code_blocks': payload['code_blocks'],
+            'status': response.status,
+            'validators': _validators(response.headers),
+            'tier': 'browser'
+        }
+
+    except Exception as e:
+        raise FetchError.from_exception(e)
+
+
+def retry_fetch(url: str, wait_time: int = 5, max_retries: int = DEFAULT_RETRY,
+                pool: BrowserPool = None, cache: PageCache = None,
+                static_first: bool = False,
+                resource_profile: str = DEFAULT_PROFILE,
+                resource_stats: ResourceStats = None,
+                scheduler: PolitenessScheduler = None,
+                timer: PageTimer = None,
+                policy: RetryPolicy = None,
+                breaker: CircuitBreaker = None,
+                budget: Budget = None,
+                pages: PagePool = None,
+                sessions: SessionStore = None,
+                raise_errors: bool = False) -> Optional[Dict]:
+    """
+    带重试的爬取
+    - cache: 先查缓存
+    - static_first: 先走静态层，不行再用浏览器
+    - pool: 浏览器尝试复用池中的实例
+    - pages: 标签页池（复用 context 和标签页，资源拦截在池的 setup 中安装）；给出时代替 pool
+    - sessions: 登录会话，注入浏览器 context、静态层带 Cookie（标签页池自己持有会话）
+    - resource_profile: 浏览器请求拦截配置
+    - scheduler: 每次网络请求前按主机排队，响应状态回报给调度器
+    - timer: 分阶段计时（重试时同一阶段累加）
+    - policy: 按失败类型决定是否重试、退避多久（默认最多 max_retries 次尝试）
+    - breaker: 按主机熔断，熔断中的主机不再请求
+    - budget: 每次尝试的单页截止时间；剩余时间不够再试一次时不再重试
+    - raise_errors: 最终失败时抛出 FetchError（含失败类型）而不是返回 None
+    """
+    if policy is None:
+        policy = RetryPolicy(max_retries)
+
+    report = None
+    if scheduler is not None:
+        report = lambda status, headers: scheduler.report(url, status, headers)
+
+    def slot():
+        return timed_enter(timer, 'politeness',
+                           scheduler.slot(url) if scheduler is not None else nullcontext())
+
+    def store(result: Dict):
+        if cache is not None:
+            with span(timer, 'write'):
+                cache.store(result)
+
+    def fail(error: FetchError) -> None:
+        print(f"✗ 放弃 ({error.outcome}): {error} - {url}")
+        if raise_errors:
+            raise error
+        return None
+
+    def page_deadline() -> PageDeadline:
+        return budget.page_deadline(url) if budget is not None else PageDeadline(DEFAULT_PAGE_BUDGET)
+
+    if cache is not None:
+        with span(timer, 'cache'):
+            cached = cache.lookup(url)
+        if cached:
+            print(f"✓ 缓存命中: {cached['title']} - {url}")
+            return cached
 
+    if breaker is not None and not breaker.allow(url):
+        return fail(FetchError(CIRCUIT_OPEN, "主机熔断中"))
 
-def retry_fetch(url: str, wait_time: int = 5, max_retries: int = DEFAULT_RETRY) -> Optional[Dict]:
-    """带重试的爬取"""
-    for attempt in range(max_retries):
+    if static_first:
         try:
-            result = fetch_single_url(url, wait_time)
-            if result:
-                return result
+            with slot(), span(timer, 'static'):
+                result = fetch_static_tier(url, report, page_deadline(), sessions)
+        except FetchError as e:
+            if breaker is not None:
+                breaker.record(url, e.outcome)
+            return fail(e)
+        if result:
+            if breaker is not None:
+                breaker.record(url, OK)
+            store(result)
+            return result
 
-            if attempt < max_retries - 1:
-                print(f"重试 {attempt + 1}/{max_retries}...")
-                time.sleep(2 ** attempt)  # 指数退避
+    attempt = 0
+    while True:
+        try:
+            with slot():
+                if pages is not None:
+                    with timed_enter(timer, 'acquire', pages.page(url)) as page:
+                        result = _fetch_page(page, url, wait_time, report, timer, page_deadline())
+                elif pool is not None:
+                    with timed_enter(timer, 'acquire', pool.browser()) as browser:
+                        result = fetch_single_url(url, wait_time, browser, resource_profile,
+                                                  resource_stats, report, timer, raise_errors=True,
+                                                  deadline=page_deadline(), sessions=sessions)
+                else:
+                    result = fetch_single_url(url, wait_time, None, resource_profile,
+                                              resource_stats, report, timer, raise_errors=True,
+                                              deadline=page_deadline(), sessions=sessions)
+            if breaker is not None:
+                breaker.record(url, OK)
+            store(result)
+            return result
         except Exception as e:
-            print(f"爬取失败: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+            error = FetchError.from_exception(e)
 
-    return None
+        if breaker is not None:
+            breaker.record(url, error.outcome)
+        if not policy.should_retry(error.outcome, attempt) or \
+                (breaker is not None and breaker.is_open(url)):
+            return fail(error)
+
+        delay = policy.delay(error.outcome, attempt, error.retry_after)
+        if budget is not None and not budget.can_retry(url, delay):
+            return fail(error)
+        print(f"重试 {attempt + 1} ({error.outcome}: {error})，{delay:.1f} 秒后...")
+        time.sleep(delay)
+        attempt += 1
 
 
 # ============ 站点爬取器 ============
 
+def _release_links(result: Dict):
+    """释放结果中的链接集合，只保留数量"""
+    if 'links' in result:
+        result['links_count'] = len(result['links'])
+        del result['links']
+    result.pop('link_meta', None)
+
+
 class SiteCrawler:
     """站点爬取器"""
 
@@ -255,16 +732,83 @@ class SiteCrawler:
                  max_depth: int = DEFAULT_DEPTH,
                  max_pages: int = 50,
                  concurrency: int = DEFAULT_CONCURRENCY,
-                 wait_time: int = DEFAULT_WAIT):
+                 wait_time: int = DEFAULT_WAIT,
+                 browsers: int = 1,
+                 pages_per_browser: int = DEFAULT_PAGES_PER_BROWSER,
+                 cache: PageCache = None,
+                 static_first: bool = False,
+                 resource_profile: str = DEFAULT_PROFILE,
+                 store: CrawlStore = None,
+                 resume: bool = False,
+                 scheduler: PolitenessScheduler = None,
+                 use_sitemap: bool = False,
+                 sitemap_only: bool = False,
+                 include: List[str] = None,
+                 boost: List[str] = None,
+                 prioritize: bool = True,
+                 bloom_capacity: int = None,
+                 bloom_only: bool = False,
+                 dedup: bool = True,
+                 skip_duplicate_links: bool = False,
+                 sink: JSONLSink = None,
+                 manifest: Manifest = None,
+                 timing: TimingRecorder = None,
+                 policy: RetryPolicy = None,
+                 breaker: CircuitBreaker = None,
+                 budget: Budget = None,
+                 tabs: int = 0,
+                 sessions: SessionStore = None,
+                 blobs: BlobStore = None):
         self.base_url = base_url
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.concurrency = concurrency
         self.wait_time = wait_time
-
-        self.visited: Set[str] = set()
+        self.browsers = browsers  # 浏览器实例数，concurrency 个页面分摊在这些浏览器上
+        self.pages_per_browser = pages_per_browser
+        self.browser_stats: Dict = {}
+        # 每个 context 保留的预热标签页数；0 则每个 URL 新建 context
+        self.tabs = tabs
+        self.page_pool: Optional[AsyncPagePool] = None
+        self.tab_stats: Dict = {}
+        self.sessions = sessions  # 登录会话，None 则所有 context 都是空白的
+        self.cache = cache
+        self.static_first = static_first
+        self.resource_profile = resource_profile
+        self.resource_stats = ResourceStats()
+        self.tier_stats: Counter = Counter()  # 各层（cache/static/browser）服务的页面数
+        self.store = store  # 持久化 frontier 和结果，None 则只在内存中
+        self.resume = resume
+        self.scheduler = scheduler  # 按主机限速/限并发，None 则只受 concurrency 限制
+        # sitemap 播种；sitemap_only 时只爬 sitemap 中的页面，不再沿链接发现
+        self.use_sitemap = use_sitemap or sitemap_only
+        self.sitemap_only = sitemap_only
+        self.lastmod: Dict[str, str] = {}  # sitemap 给出的 lastmod，页面结束时删除
+        self.include = include or []  # 只爬匹配这些 glob 模式的 URL（入口除外）
+        # 近重复检测；skip_duplicate_links 时重复页面的链接不再展开
+        self.dedup = DuplicateIndex() if dedup else None
+        self.skip_duplicate_links = skip_duplicate_links
+
+        # 只存 64 位指纹；bloom_only 时只用 Bloom 过滤器（有界误判率）
+        self.visited = URLSeen(bloom_capacity=bloom_capacity, exact=not bloom_only)
+        # 有 sink 时结果逐页写入 JSONL，不在内存中积累
+        self.sink = sink
+        # 正文存储：结果（JSONL、状态文件、内存）中只留 blob 哈希，每次爬取登记为一个 run
+        self.blobs = blobs
+        self.blob_run = blobs.begin_run(base_url) if blobs is not None else None
+        # 增量模式：清单中未变化的页面不再获取，只输出新增和修改的页面
+        self.manifest = manifest
+        self.timing = timing  # 分阶段计时，None 则不计时
+        # 按失败类型重试；breaker 为 None 时不熔断
+        self.policy = policy if policy is not None else RetryPolicy(DEFAULT_RETRY)
+        self.breaker = breaker
+        self.failures: Counter = Counter()  # 失败类型 -> 页面数
+        # 时间预算：到截止时间不再派发新页面，主机预算用完的页面跳过（仍留在状态存储的待爬队列中）
+        self.budget = budget
         self.results: List[Dict] = []
-        self.pending: deque = deque()  # (url, depth)
+        self.pages_done = 0
+        # (url, depth)；prioritize=False 时先进先出
+        self.pending = PriorityFrontier(URLScorer(boost) if prioritize else None)
 
     def should_crawl(self, url: str, depth: int) -> bool:
         """判断是否应该爬取该 URL"""
@@ -276,6 +820,8 @@ class SiteCrawler:
             return False
         if not is_same_domain(url, self.base_url):
             return False
+        if self.include and url != self.base_url and not matches_any(url, self.include):
+            return False
         return True
 
     def crawl(self) -> List[Dict]:
@@ -288,78 +834,657 @@ class SiteCrawler:
         print(f"并发数: {self.concurrency}")
         print(f"{'='*50}\n")
 
+        return asyncio.run(self.crawl_async())
+
+    async def crawl_async(self) -> List[Dict]:
+        """异步爬取：共享 frontier，concurrency 个 worker 在同一浏览器中并行"""
         # 初始化队列
-        self.pending.append((self.base_url, 0))
+        resumed = self._init_frontier()
+        if self.use_sitemap and not resumed:
+            await self._seed_from_sitemap()
+        self._in_flight = 0
+        self._frontier_cond = asyncio.Condition()
+
+        async with async_playwright() as p:
+            pool = AsyncBrowserPool(p, size=self.browsers,
+                                    max_pages_per_browser=self.pages_per_browser)
+            if not self.static_first:
+                # 静态优先时按需启动：静态层能服务整站时一个浏览器都不开
+                await pool.start()
+            self.page_pool = self._open_page_pool(pool)
+            try:
+                workers = [
+                    asyncio.create_task(self._worker(pool))
+                    for _ in range(max(1, self.concurrency))
+                ]
+                await asyncio.gather(*workers)
+            finally:
+                await self._close_page_pool()
+                await pool.close()
+                self.browser_stats = pool.get_stats()
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
+        return self.results
 
-            while self.pending and len(self.visited) < self.max_pages:
-                # 批处理：每次处理一批
-                batch = []
-                while self.pending and len(batch) < self.concurrency:
-                    batch.append(self.pending.popleft())
+    def _open_page_pool(self, pool: AsyncBrowserPool) -> Optional[AsyncPagePool]:
+        """标签页池：资源拦截在创建 context 时安装一次"""
+        if not self.tabs:
+            return None
+        return AsyncPagePool(pool, self.tabs, setup=lambda context: apply_resource_profile_async(
+            context, self.resource_profile, self.resource_stats), sessions=self.sessions)
+
+    async def _close_page_pool(self):
+        if self.page_pool is not None:
+            await self.page_pool.close()
+            self.tab_stats = self.page_pool.get_stats()
+
+    def _init_frontier(self) -> bool:
+        """初始化 frontier；有状态存储时从中恢复已完成的结果和待爬队列，返回是否为恢复"""
+        if self.store is None:
+            self.pending.append((self.base_url, 0))
+            return False
 
-                if not batch:
-                    break
+        counts = self.store.begin({
+            'base_url': self.base_url,
+            'max_depth': self.max_depth,
+        }, resume=self.resume)
+
+        if self.resume and counts['done']:
+            # 状态存储是权威数据：已完成的结果重新写入 JSONL（覆盖上次可能截断的输出）
+            for result in self.store.iter_results():
+                _release_links(result)
+                if self.blobs is not None:
+                    self.blobs.detach(self.blob_run, result['url'], result)
+                self._emit(result)
+                if self.manifest is not None:
+                    self.manifest.touch(result['url'])
+                self.pages_done += 1
+            self.visited.update(self.store.finished())
+            self.pending.extend(self.store.pending())
+            print(f"从断点恢复: 已完成 {len(self.visited)}, 待处理 {len(self.pending)}")
+            return True
 
-                print(f"\n[批次] 处理 {len(batch)} 个页面...")
+        self.pending.append((self.base_url, 0))
+        self.store.add([(self.base_url, 0)])
+        return False
 
-                # 并发爬取
-                for url, depth in batch:
-                    if not self.should_crawl(url, depth):
-                        continue
+    def _in_scope(self, url: str) -> bool:
+        return is_same_domain(url, self.base_url) and is_valid_path(url)
 
-                    self.visited.add(url)
+    async def _seed_from_sitemap(self):
+        """读取 sitemap，把站内 URL 作为深度 0 的种子放进 frontier"""
+        entries = await asyncio.to_thread(seed_urls, self.base_url, self.max_pages, self._in_scope)
 
-                    # 串行爬取（避免被封）
-                    result = fetch_single_url(url, self.wait_time, browser)
+        seeds = []
+        for entry in entries:
+            url = normalize_url(entry['url'])
+            if not url or url == self.base_url:
+                continue
+            seeds.append((url, 0))
+            if entry['lastmod']:
+                self.lastmod[url] = entry['lastmod']
+
+        self.pending.extend(seeds)
+        if self.store is not None:
+            self.store.add(seeds)
+        print(f"sitemap 播种: {len(seeds)} 个 URL" + ("（只爬 sitemap 页面）" if self.sitemap_only else ""))
+
+    async def _next_task(self):
+        """从 frontier 取下一个任务；frontier 为空且无在途页面时返回 None"""
+        async with self._frontier_cond:
+            while True:
+                while self.pending and not self._out_of_time():
+                    url, depth = self.pending.popleft()
+                    if self.should_crawl(url, depth) and self._within_budget(url):
+                        # 出队即占位，保证 visited/max_pages 在并发下仍然准确
+                        self.visited.add(url)
+                        self._in_flight += 1
+                        return url, depth
+
+                if self._in_flight == 0 or len(self.visited) >= self.max_pages or self._out_of_time():
+                    self._frontier_cond.notify_all()
+                    return None
+
+                # 等待在途页面发现新链接
+                await self._frontier_cond.wait()
+
+    def _out_of_time(self) -> bool:
+        return self.budget is not None and self.budget.expired()
+
+    def _within_budget(self, url: str) -> bool:
+        """主机预算还有剩余（出队时检查；跳过的页面不计入已访问）"""
+        return self.budget is None or self.budget.allow(url) is None
+
+    def _page_deadline(self, url: str) -> PageDeadline:
+        if self.budget is None:
+            return PageDeadline(DEFAULT_PAGE_BUDGET)
+        return self.budget.page_deadline(url)
+
+    def _slot(self, url: str):
+        """礼貌调度的名额（未启用时为空上下文）"""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot_async(url)
+
+    async def _check_manifest(self, url: str) -> Optional[Dict]:
+        """增量模式：sitemap lastmod 未更新或条件请求 304 时返回占位结果（出链取自清单）"""
+        def revalidate(url: str, etag: str, last_modified: str) -> bool:
+            # 只有条件请求占用礼貌调度名额（在 Manifest.check 的线程里，用同步名额）
+            with self.scheduler.slot(url) if self.scheduler is not None else nullcontext():
+                return is_not_modified(url, etag, last_modified)
+
+        entry = await asyncio.to_thread(self.manifest.check, url, self.lastmod.get(url), revalidate)
+        if entry is None:
+            return None
+        self.tier_stats['unchanged'] += 1
+        return {
+            'url': url,
+            'title': entry['title'],
+            'content': '',
+            'links': entry['links'],
+            'tier': 'manifest',
+            'change': UNCHANGED,
+        }
 
-                    if result:
-                        self.results.append(result)
+    async def _fetch(self, pool: AsyncBrowserPool, url: str,
+                     timer: PageTimer = None) -> Optional[Dict]:
+        """依次尝试增量清单、缓存、静态层、浏览器（阻塞的 HTTP 请求放到线程池）"""
+        if self.manifest is not None:
+            with span(timer, 'cache'):
+                unchanged = await self._check_manifest(url)
+            if unchanged:
+                return unchanged
+
+        if self.cache is not None:
+            with span(timer, 'cache'):
+                cached = await asyncio.to_thread(self.cache.lookup, url)
+            if cached:
+                print(f"✓ 缓存命中: {cached['title']} - {url}")
+                self.tier_stats['cache'] += 1
+                return cached
+
+        if self.breaker is not None and not self.breaker.allow(url):
+            self.failures[CIRCUIT_OPEN] += 1
+            return None
 
-                        # 添加新发现的链接到队列
-                        if depth < self.max_depth:
-                            for link in result.get('links', []):
-                                if self.should_crawl(link, depth + 1):
-                                    self.pending.append((link, depth + 1))
+        started = time.monotonic()
+        try:
+            result = await self._fetch_network(pool, url, timer)
+        except FetchError as e:
+            print(f"✗ 放弃 ({e.outcome}): {e} - {url}")
+            self.failures[e.outcome] += 1
+            return None
+        finally:
+            if self.budget is not None:
+                self.budget.charge(url, time.monotonic() - started)
+
+        self.tier_stats[result['tier']] += 1
+        if self.cache is not None:
+            with span(timer, 'write'):
+                await asyncio.to_thread(self.cache.store, result)
+        return result
 
-                print(f"[进度] 已爬取: {len(self.visited)}, 待处理: {len(self.pending)}")
+    async def _fetch_network(self, pool: AsyncBrowserPool, url: str,
+                             timer: PageTimer = None) -> Dict:
+        """静态层，不行再用浏览器并按重试策略重试；最终失败抛出 FetchError"""
+        report = None
+        if self.scheduler is not None:
+            report = lambda status, headers: self.scheduler.report(url, status, headers)
 
-            browser.close()
+        if self.static_first:
+            try:
+                async with timed_enter_async(timer, 'politeness', self._slot(url)):
+                    with span(timer, 'static'):
+                        result = await asyncio.to_thread(fetch_static_tier, url, report,
+                                                         self._page_deadline(url), self.sessions)
+            except FetchError as e:
+                self._record_outcome(url, e.outcome)
+                raise
+            if result:
+                self._record_outcome(url, OK)
+                return result
 
-        return self.results
+        attempt = 0
+        while True:
+            try:
+                if self.page_pool is not None:
+                    async with timed_enter_async(timer, 'politeness', self._slot(url)), \
+                            timed_enter_async(timer, 'acquire', self.page_pool.page(url)) as page:
+                        result = await _fetch_page_async(page, url, self.wait_time, report, timer,
+                                                         self._page_deadline(url))
+                else:
+                    async with timed_enter_async(timer, 'politeness', self._slot(url)), \
+                            timed_enter_async(timer, 'acquire', pool.browser()) as browser:
+                        result = await fetch_single_url_async(url, self.wait_time, browser,
+                                                              self.resource_profile, self.resource_stats,
+                                                              report, timer, raise_errors=True,
+                                                              deadline=self._page_deadline(url),
+                                                              sessions=self.sessions)
+                self._record_outcome(url, OK)
+                return result
+            except Exception as e:
+                error = FetchError.from_exception(e)
+
+            self._record_outcome(url, error.outcome)
+            if not self.policy.should_retry(error.outcome, attempt) or \
+                    (self.breaker is not None and self.breaker.is_open(url)):
+                raise error
+
+            delay = self.policy.delay(error.outcome, attempt, error.retry_after)
+            if self.budget is not None and not self.budget.can_retry(url, delay):
+                raise error
+            print(f"重试 {attempt + 1} ({error.outcome}: {error})，{delay:.1f} 秒后: {url}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _record_outcome(self, url: str, outcome: str):
+        if self.breaker is not None:
+            self.breaker.record(url, outcome)
+
+    async def _worker(self, pool: AsyncBrowserPool):
+        """worker：循环取任务、爬取、把新链接放回 frontier"""
+        while True:
+            task = await self._next_task()
+            if task is None:
+                return
+
+            url, depth = task
+            result = None
+            timer = self.timing.start(url) if self.timing is not None else None
+            try:
+                result = await self._fetch(pool, url, timer)
+                await self._post_process(url, result)
+            finally:
+                await self._complete(url, depth, result, timer)
+
+    async def _post_process(self, url: str, result: Optional[Dict], fingerprint: int = None):
+        """增量登记和近重复检测（fingerprint 为已算好的 SimHash）"""
+        if result and self.manifest is not None and 'change' not in result:
+            # 按正文哈希判断新增/修改（在近重复清空正文之前）
+            result['change'] = await asyncio.to_thread(
+                self.manifest.record, url, result['content'], result.get('title', ''),
+                result.get('validators'), self.lastmod.get(url), result.get('links', ()))
+        if result and self.dedup is not None:
+            # SimHash 计算放到线程里，不阻塞其他页面
+            duplicate_of = await asyncio.to_thread(self.dedup.check, url, result['content'],
+                                                   fingerprint)
+            if duplicate_of:
+                print(f"≈ 近重复: {url} → {duplicate_of}")
+                result['duplicate_of'] = duplicate_of
+                result['content'] = ''  # 内容与规范页相同，不再保存
+        if result and self.blobs is not None:
+            if result.get('change') == UNCHANGED:
+                # 未重新获取的页面沿用上一次的 blob，本次运行的索引依然完整
+                await asyncio.to_thread(self.blobs.carry_forward, self.blob_run, url)
+            elif 'content' in result:
+                await asyncio.to_thread(self.blobs.detach, self.blob_run, url, result)
+
+    async def _complete(self, url: str, depth: int, result: Optional[Dict],
+                        timer: Optional[PageTimer]):
+        """页面结束：新链接入 frontier，落盘、输出，唤醒等待中的 worker"""
+        async with self._frontier_cond:
+            self._in_flight -= 1
+
+            new_items = []
+            lastmod = self.lastmod.pop(url, None)
+            if result:
+                if lastmod:
+                    result['lastmod'] = lastmod
+                self.pages_done += 1
+
+                # 添加新发现的链接到队列（带上链接位置参与评分）
+                expand = not (self.skip_duplicate_links and result.get('duplicate_of'))
+                if depth < self.max_depth and not self.sitemap_only and expand:
+                    link_meta = result.get('link_meta') or {}
+                    for link in result.get('links', []):
+                        if self.should_crawl(link, depth + 1):
+                            new_items.append((link, depth + 1))
+                            region = link_meta.get(link, {}).get('region')
+                            self.pending.push(link, depth + 1, region)
+
+                # 模板热度随爬取变化，周期性整体重新评分
+                if self.pages_done % RESCORE_EVERY == 0:
+                    self.pending.rescore_all()
+
+            if not result and self.manifest is not None:
+                # 获取失败不能说明页面已删除，保留清单条目
+                self.manifest.touch(url)
+
+            with span(timer, 'write'):
+                if self.store is not None:
+                    # 每个页面一次提交：结果、状态和新链接同一事务落盘
+                    self.store.complete(url, result, new_items)
+
+                if result:
+                    # 链接已经进了 frontier（和状态存储），不再随结果常驻内存
+                    _release_links(result)
+                    self._emit(result)
+
+            if timer is not None:
+                self.timing.finish(timer, tier=result.get('tier') if result else None,
+                                   ok=bool(result))
+
+            print(f"[进度] 已爬取: {len(self.visited)}, 在途: {self._in_flight}, 待处理: {len(self.pending)}")
+            self._frontier_cond.notify_all()
+
+    def _emit(self, result: Dict):
+        """完成的结果：写入 JSONL，或留在内存中（增量模式下未变化的页面不输出）"""
+        if result.get('change') == UNCHANGED:
+            return
+        if self.sink is not None:
+            self.sink.write(result)
+        else:
+            self.results.append(result)
+
+    def iter_results(self) -> Iterator[Dict]:
+        """按完成顺序遍历结果（流式输出时从 JSONL 读回）"""
+        if self.sink is None:
+            return iter(self.results)
+        self.sink.flush()
+        return iter_jsonl(self.sink.path)
+
+    def memory_stats(self) -> Dict:
+        """内存占用估算，用于规划大规模爬取"""
+        return {
+            'visited': self.visited.stats(),
+            'frontier_urls': len(self.pending),
+            'scored_urls': self.pending.scorer.tracked() if self.pending.scorer is not None else 0,
+            'lastmod_urls': len(self.lastmod),
+            'results': len(self.results),
+            'streamed': self.sink.count if self.sink is not None else 0,
+            'content_bytes': sum(len(r.get('content', '')) for r in self.results),
+        }
 
     def get_sitemap(self) -> Dict:
-        """生成简单的站点结构"""
+        """生成简单的站点结构（近重复页面折叠到规范页下）"""
+        # 两遍遍历：先收集重复关系（只有 URL），再逐条生成条目
+        duplicates = duplicate_groups(self.iter_results())
         sitemap = {
             'base_url': self.base_url,
-            'total_pages': len(self.results),
+            'total_pages': 0,
+            'duplicates_collapsed': sum(len(urls) for urls in duplicates.values()),
             'pages': []
         }
 
-        for result in self.results:
-            sitemap['pages'].append({
+        for result in self.iter_results():
+            if result.get('duplicate_of'):
+                continue
+            entry = {
                 'url': result['url'],
                 'title': result['title'],
-                'links_count': len(result.get('links', []))
-            })
-
+                'links_count': result.get('links_count', len(result.get('links', []))),
+                'tier': result.get('tier'),
+                'lastmod': result.get('lastmod')
+            }
+            if result['url'] in duplicates:
+                entry['duplicates'] = duplicates[result['url']]
+            sitemap['pages'].append(entry)
+
+        sitemap['total_pages'] = len(sitemap['pages'])
         return sitemap
 
 
+# ============ 多进程分片 ============
+
+class ShardedCrawler(SiteCrawler):
+    """
+    多进程站点爬取
+    frontier 按 URL/主机哈希分片，每个分片一个工作进程（各自的事件循环和浏览器池，
+    每个进程 concurrency 个页面并行）；本进程只做调度、去重、增量登记和写入
+    """
+
+    def __init__(self, *args, workers: int = 2, shard_by: str = 'url', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workers = max(1, workers)
+        if (shard_by == 'url' and self.scheduler is not None
+                and self.scheduler.host_concurrency < self.workers):
+            # 每个进程至少要有 1 个名额，按 URL 分片会让总并发超过上限，改为按主机分片
+            print(f"警告: 每主机并发 {self.scheduler.host_concurrency} 小于工作进程数 {self.workers}，"
+                  f"改为按主机分片")
+            shard_by = 'host'
+        self.shard_by = shard_by
+        self.pending = ShardedFrontier(self.workers, shard_by, self.pending.scorer)
+        self.shard_stats: Dict[int, Dict] = {}
+
+    def _worker_options(self) -> Dict:
+        """工作进程的配置（只含可序列化的值，缓存等在工作进程里重新打开）"""
+        scheduler = None
+        if self.scheduler is not None:
+            # 每个分片一份限制，下标即分片号
+            scheduler = [{
+                'rate': rate,
+                'burst': self.scheduler.burst,
+                'host_concurrency': host_concurrency,
+                'respect_robots': self.scheduler.respect_robots,
+                'user_agent': self.scheduler.user_agent,
+            } for rate, host_concurrency in split_limits(self.scheduler.rate,
+                                                         self.scheduler.host_concurrency,
+                                                         self.workers, self.shard_by)]
+        return {
+            'base_url': self.base_url,
+            'concurrency': self.concurrency,
+            'wait_time': self.wait_time,
+            'browsers': self.browsers,
+            'pages_per_browser': self.pages_per_browser,
+            'tabs': self.tabs,
+            'sessions': (str(self.sessions.directory), self.sessions.ttl) if self.sessions else None,
+            'static_first': self.static_first,
+            'resource_profile': self.resource_profile,
+            'cache': str(self.cache.path) if self.cache is not None else None,
+            'cache_ttl': self.cache.ttl if self.cache is not None else DEFAULT_TTL,
+            'scheduler': scheduler,
+            'dedup': self.dedup is not None,
+            'max_attempts': self.policy.max_attempts,
+            'breaker': (self.breaker.threshold, self.breaker.cooldown) if self.breaker else None,
+            # 工作进程按剩余时间重新计时；主机预算由本进程在派发时检查
+            'budget': {'deadline': self.budget.remaining(), 'page': self.budget.page,
+                       'reserve': 0.0} if self.budget is not None else None,
+        }
+
+    async def crawl_async(self) -> List[Dict]:
+        resumed = self._init_frontier()
+        if self.use_sitemap and not resumed:
+            await self._seed_from_sitemap()
+        self._in_flight = 0
+        self._frontier_cond = asyncio.Condition()
+
+        shards = ShardPool(self.workers, __file__, '_shard_worker', self._worker_options())
+        shards.start()
+        try:
+            lanes = [
+                asyncio.create_task(self._lane(shards, shard))
+                for shard in range(self.workers)
+                for _ in range(max(1, self.concurrency))
+            ]
+            await asyncio.gather(*lanes)
+        finally:
+            await shards.close()
+            self._merge_stats(shards.stats)
+
+        return self.results
+
+    async def _next_task(self, shard: int = 0):
+        """从本分片的 frontier 取任务；全部分片都空且无在途页面时返回 None"""
+        async with self._frontier_cond:
+            while True:
+                while self.pending.size(shard) and not self._out_of_time():
+                    url, depth = self.pending.popleft(shard)
+                    if self.should_crawl(url, depth) and self._within_budget(url):
+                        self.visited.add(url)
+                        self._in_flight += 1
+                        return url, depth
+
+                # 其他分片的在途页面还可能为本分片发现新链接
+                if (self._in_flight == 0 and not self.pending) or len(self.visited) >= self.max_pages \
+                        or self._out_of_time():
+                    self._frontier_cond.notify_all()
+                    return None
+
+                await self._frontier_cond.wait()
+
+    async def _lane(self, shards: ShardPool, shard: int):
+        """一个在途名额：取本分片的任务交给工作进程，结果回来后统一处理"""
+        while True:
+            task = await self._next_task(shard)
+            if task is None:
+                return
+
+            url, depth = task
+            result = None
+            fingerprint = None
+            timer = self.timing.start(url) if self.timing is not None else None
+            try:
+                if self.manifest is not None:
+                    with span(timer, 'cache'):
+                        result = await self._check_manifest(url)
+                if result is None:
+                    started = time.monotonic()
+                    result, remote_timer, fingerprint = await shards.submit(shard, url, timer)
+                    if self.budget is not None:
+                        self.budget.charge(url, time.monotonic() - started)
+                    if timer is not None and remote_timer is not None:
+                        # 工作进程里记录的各阶段耗时
+                        timer.spans = remote_timer.spans
+                await self._post_process(url, result, fingerprint)
+            finally:
+                await self._complete(url, depth, result, timer)
+
+    def _merge_stats(self, stats: Dict[int, Dict]):
+        """汇总各工作进程的获取方式、资源拦截和浏览器统计"""
+        self.shard_stats = dict(sorted(stats.items()))
+        browser = {'browser_launches': 0, 'browser_recycles': 0, 'alive': 0}
+        tabs: Counter = Counter()
+        for shard_stats in stats.values():
+            tabs.update(shard_stats['tabs'] or {})
+            self.tier_stats.update(shard_stats['tiers'])
+            self.failures.update(shard_stats['failures'])
+            self.resource_stats.merge(shard_stats['resources'])
+            for key in browser:
+                browser[key] += shard_stats['browser'].get(key, 0)
+        self.browser_stats = browser
+        self.tab_stats = dict(tabs)
+
+
+def _shard_worker(shard: int, options: Dict, tasks, results):
+    """分片工作进程（由 ShardPool 启动）"""
+    asyncio.run(_shard_worker_async(shard, options, tasks, results))
+
+
+async def _shard_worker_async(shard: int, options: Dict, tasks, results):
+    """获取页面、提取正文和链接、计算 SimHash，结果发回协调进程"""
+    cache = PageCache(options['cache'], ttl=options['cache_ttl']) if options['cache'] else None
+    scheduler = PolitenessScheduler(**options['scheduler'][shard]) if options['scheduler'] else None
+    breaker = CircuitBreaker(*options['breaker']) if options['breaker'] else None
+    budget = Budget(**options['budget']) if options['budget'] else None
+    sessions = SessionStore(*options['sessions']) if options['sessions'] else None
+    fetcher = SiteCrawler(options['base_url'],
+                          wait_time=options['wait_time'],
+                          cache=cache,
+                          static_first=options['static_first'],
+                          resource_profile=options['resource_profile'],
+                          scheduler=scheduler,
+                          dedup=False,
+                          policy=RetryPolicy(options['max_attempts']),
+                          breaker=breaker,
+                          budget=budget,
+                          tabs=options['tabs'],
+                          sessions=sessions)
+    concurrency = max(1, options['concurrency'])
+    pages = 0
+
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+
+    def read_tasks():
+        # 阻塞读取任务队列，转交给事件循环；收到 None 时让每个 lane 都退出
+        while True:
+            task = tasks.get()
+            if task is None:
+                for _ in range(concurrency):
+                    loop.call_soon_threadsafe(inbox.put_nowait, None)
+                return
+            loop.call_soon_threadsafe(inbox.put_nowait, task)
+
+    threading.Thread(target=read_tasks, daemon=True).start()
+
+    async def lane(pool: AsyncBrowserPool):
+        nonlocal pages
+        while True:
+            task = await inbox.get()
+            if task is None:
+                return
+            task_id, url, timer = task
+            try:
+                result = await fetcher._fetch(pool, url, timer)
+            except Exception as e:
+                print(f"爬取失败: {e} - {url}")
+                result = None
+
+            fingerprint = None
+            if result:
+                pages += 1
+                if options['dedup'] and len(result['content']) >= MIN_CONTENT_LENGTH:
+                    fingerprint = simhash(result['content'])
+            results.put(('result', task_id, result, timer, fingerprint))
+
+    async with async_playwright() as p:
+        pool = AsyncBrowserPool(p, size=options['browsers'],
+                                max_pages_per_browser=options['pages_per_browser'])
+        fetcher.page_pool = fetcher._open_page_pool(pool)
+        try:
+            if not options['static_first']:
+                await pool.start()
+            await asyncio.gather(*(lane(pool) for _ in range(concurrency)))
+        finally:
+            await fetcher._close_page_pool()
+            await pool.close()
+            if cache is not None:
+                cache.close()
+            results.put(('stats', shard, {
+                'pages': pages,
+                'tiers': dict(fetcher.tier_stats),
+                'failures': dict(fetcher.failures),
+                'breaker': breaker.get_stats() if breaker is not None else None,
+                'resources': fetcher.resource_stats.to_dict(),
+                'browser': pool.get_stats(),
+                'tabs': fetcher.tab_stats,
+                'politeness': scheduler.get_stats() if scheduler is not None else None,
+            }))
+
+
 # ============ 主函数 ============
 
-def crawl_single(url: str, output: str = None, wait: int = DEFAULT_WAIT):
-    """单页爬取模式"""
+def crawl_single(url: str, output: str = None, wait: int = DEFAULT_WAIT,
+                 cache: PageCache = None, static_first: bool = False,
+                 resource_profile: str = DEFAULT_PROFILE,
+                 scheduler: PolitenessScheduler = None,
+                 pool: BrowserPool = None,
+                 policy: RetryPolicy = None,
+                 breaker: CircuitBreaker = None,
+                 budget: Budget = None,
+                 sessions: SessionStore = None):
+    """单页爬取模式（pool 由调用方传入时不在这里关闭）"""
     print(f"模式: 单页爬取")
     print(f"目标: {url}\n")
 
-    result = retry_fetch(url, wait)
+    # 重试时复用同一个浏览器
+    own_pool = pool is None
+    if own_pool:
+        pool = BrowserPool(size=1)
+    resource_stats = ResourceStats()
+    try:
+        result = retry_fetch(url, wait, pool=pool, cache=cache, static_first=static_first,
+                             resource_profile=resource_profile, resource_stats=resource_stats,
+                             scheduler=scheduler, policy=policy, breaker=breaker,
+                             budget=budget, sessions=sessions)
+    finally:
+        if own_pool:
+            pool.close()
+    print(f"资源拦截 ({resource_profile}): {resource_stats.summary()}")
 
     if result:
         content = f"# {result['title']}\n\n"
         content += f"**来源**: {result['url']}\n\n"
+        content += f"**获取方式**: {result.get('tier', 'browser')}\n\n"
         content += "---\n\n"
         content += result['content']
 
@@ -377,56 +1502,259 @@ def crawl_single(url: str, output: str = None, wait: int = DEFAULT_WAIT):
         sys.exit(1)
 
 
+def write_site_markdown(output_path: Path, entry_url: str,
+                        records: Callable[[], Iterable[Dict]],
+                        total_pages: int, collapsed: int = 0,
+                        blobs: BlobStore = None):
+    """
+    逐条写出合并内容（近重复页面只列在规范页下），不在内存中拼接整份文档
+    blobs 给出时正文从正文存储读出（结果中只有 blob 哈希）
+    """
+    duplicates = duplicate_groups(records())
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(f"# 站点爬取结果\n\n")
+        f.write(f"**入口**: {entry_url}\n")
+        f.write(f"**页面数**: {total_pages}\n")
+        if collapsed:
+            f.write(f"**已折叠的近重复页面**: {collapsed}\n")
+        f.write("\n---\n\n")
+
+        i = 0
+        for result in records():
+            if result.get('duplicate_of'):
+                continue
+            i += 1
+            f.write(f"## {i}. {result['title']}\n\n")
+            f.write(f"**URL**: {result['url']}\n\n")
+            if result['url'] in duplicates:
+                f.write(f"**相同内容**: {', '.join(duplicates[result['url']])}\n\n")
+            content = blobs.text(result) if blobs is not None else result['content']
+            f.write(content[:2000])  # 限制每个页面长度
+            f.write("\n\n---\n\n")
+
+
 def crawl_site(url: str, output: str = None, depth: int = DEFAULT_DEPTH,
-               max_pages: int = 50, concurrency: int = DEFAULT_CONCURRENCY):
+               max_pages: int = 50, concurrency: int = DEFAULT_CONCURRENCY,
+               browsers: int = 1, pages_per_browser: int = DEFAULT_PAGES_PER_BROWSER,
+               cache: PageCache = None, static_first: bool = False,
+               resource_profile: str = DEFAULT_PROFILE,
+               state: str = None, resume: bool = False,
+               scheduler: PolitenessScheduler = None,
+               use_sitemap: bool = False, sitemap_only: bool = False,
+               include: List[str] = None, boost: List[str] = None,
+               prioritize: bool = True,
+               bloom_capacity: int = None, bloom_only: bool = False,
+               dedup: bool = True, skip_duplicate_links: bool = False,
+               compression: str = None, manifest: str = None,
+               timing_events: str = None, prometheus: str = None,
+               workers: int = 1, shard_by: str = 'url',
+               policy: RetryPolicy = None, breaker: CircuitBreaker = None,
+               budget: Budget = None, tabs: int = 0, sessions: SessionStore = None,
+               blobs: BlobStore = None):
     """站点爬取模式"""
     print(f"模式: 站点爬取")
     print(f"目标: {url}")
     print(f"深度: {depth}")
-    print(f"最大页面: {max_pages}\n")
+    print(f"最大页面: {max_pages}")
+    if workers > 1:
+        print(f"工作进程: {workers}（按 {shard_by} 分片，每个进程并发 {concurrency}）")
+    if scheduler is not None:
+        print(f"礼貌调度: {scheduler.describe()}")
+    if budget is not None and budget.deadline is not None:
+        print(f"截止时间: {budget.deadline:.0f} 秒（预留 {budget.reserve:.0f} 秒收尾）")
+    print()
+
+    # 状态文件：显式指定，或放在输出文件旁边
+    if state is None and output:
+        state = str(Path(output).with_suffix('.state.db'))
+    if resume and state is None:
+        print("错误: --resume 需要 --state 或 --output 来定位状态文件")
+        sys.exit(1)
+    store = CrawlStore(state) if state else None
+    if store is not None:
+        print(f"状态文件: {state}")
 
-    crawler = SiteCrawler(
+    # 有输出文件时结果逐页写入 JSONL，Markdown 和站点地图在结束后从中生成
+    sink = None
+    if output:
+        try:
+            sink = JSONLSink(jsonl_path(Path(output), compression))
+        except RuntimeError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        print(f"流式输出: {sink.path}")
+
+    # 增量模式：清单与输出分开保存，跨多次运行累积
+    incremental = None
+    if manifest:
+        incremental = Manifest(manifest)
+        try:
+            # 深度或 sitemap_only 变了，范围外的页面会被当作删除，所以也算进范围
+            known = incremental.begin({'base_url': url, 'include': sorted(include or []),
+                                       'max_depth': depth, 'sitemap_only': sitemap_only})
+        except ValueError as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        print(f"增量清单: {manifest}（第 {incremental.run} 轮，已记录 {known} 个 URL）")
+
+    # 分阶段计时：汇总总是打印，事件流和 Prometheus 导出按需
+    timing = TimingRecorder(timing_events)
+
+    sharding = {'workers': workers, 'shard_by': shard_by} if workers > 1 else {}
+    crawler = (ShardedCrawler if workers > 1 else SiteCrawler)(
         base_url=url,
         max_depth=depth,
         max_pages=max_pages,
-        concurrency=concurrency
+        concurrency=concurrency,
+        browsers=browsers,
+        pages_per_browser=pages_per_browser,
+        cache=cache,
+        static_first=static_first,
+        resource_profile=resource_profile,
+        store=store,
+        resume=resume,
+        scheduler=scheduler,
+        use_sitemap=use_sitemap,
+        sitemap_only=sitemap_only,
+        include=include,
+        boost=boost,
+        prioritize=prioritize,
+        bloom_capacity=bloom_capacity,
+        bloom_only=bloom_only,
+        dedup=dedup,
+        skip_duplicate_links=skip_duplicate_links,
+        sink=sink,
+        manifest=incremental,
+        timing=timing,
+        policy=policy,
+        breaker=breaker,
+        budget=budget,
+        tabs=tabs,
+        sessions=sessions,
+        blobs=blobs,
+        **sharding
     )
 
-    results = crawler.crawl()
+    try:
+        crawler.crawl()
+    except KeyboardInterrupt:
+        print(f"\n已中断，已完成 {crawler.pages_done} 个页面")
+        if sink is not None:
+            print(f"已完成的页面已写入: {sink.path}")
+        if store is not None:
+            print(f"使用 --resume 从断点继续: {state}")
+        sys.exit(130)
+    except ValueError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    finally:
+        if sink is not None:
+            sink.close()
+        if store is not None:
+            store.close()
+        timing.close()
+
+    if blobs is not None:
+        blobs.finish_run(crawler.blob_run)
+
+    changes = None
+    if incremental is not None:
+        # 预算用完时可能还有没爬到的页面，不能据此判定删除
+        # 到截止时间或主机预算用完时同理
+        stopped_early = budget is not None and budget.stopped_early()
+        changes = incremental.finish(complete=len(crawler.visited) < max_pages and not stopped_early)
+        incremental.close()
 
     print(f"\n{'='*50}")
-    print(f"爬取完成! 共获取 {len(results)} 个页面")
+    print(f"爬取完成! 共获取 {crawler.pages_done} 个页面")
+    if crawler.browser_stats:
+        print(f"浏览器启动: {crawler.browser_stats['browser_launches']} 次, "
+              f"回收: {crawler.browser_stats['browser_recycles']} 次")
+    if crawler.tab_stats:
+        print(f"标签页池: context {crawler.tab_stats['contexts']} 个, "
+              f"新开标签页 {crawler.tab_stats['tabs_opened']} 个, 复用 {crawler.tab_stats['tab_reuses']} 次")
+    print(f"资源拦截 ({resource_profile}): {crawler.resource_stats.summary()}")
+    if scheduler is not None and workers <= 1:
+        print(f"礼貌调度: {scheduler.summary()}")
+    for shard, stats in getattr(crawler, 'shard_stats', {}).items():
+        politeness = stats['politeness']
+        print(f"分片 {shard}: {stats['pages']} 个页面, 浏览器启动 {stats['browser']['browser_launches']} 次"
+              + (f", 请求 {politeness['requests']} 次, 排队等待 {politeness['waited_seconds']} 秒, "
+                 f"退避 {politeness['backoffs']} 次" if politeness else "")
+              + (f", 熔断 {stats['breaker']['opened']} 次" if stats['breaker'] else ""))
+    if crawler.dedup is not None and crawler.dedup.duplicates:
+        print(f"近重复: {crawler.dedup.duplicates} 个页面与已爬页面重复，已折叠")
+    memory = crawler.memory_stats()
+    print(f"内存: 已访问 {memory['visited']['urls']} 个 URL 占 "
+          f"{memory['visited']['memory_bytes'] / 1024:.0f} KB ({memory['visited']['mode']}), "
+          f"frontier {memory['frontier_urls']} 个 (评分记录 {memory['scored_urls']}, "
+          f"lastmod {memory['lastmod_urls']}), 内存中正文 {memory['content_bytes'] / 1024 / 1024:.1f} MB")
+    if crawler.tier_stats:
+        print("获取方式: " + ", ".join(f"{tier} {count}" for tier, count in crawler.tier_stats.items()))
+    if crawler.failures:
+        print(f"失败原因: {summarize_outcomes(crawler.failures)}")
+    if breaker is not None and workers <= 1 and breaker.get_stats()['opened']:
+        print(f"熔断: {breaker.summary()}")
+    if cache is not None:
+        print(f"缓存: 命中 {cache.stats['hits']}, 304 重验 {cache.stats['revalidated']}, "
+              f"未命中 {cache.stats['misses']}")
+    if sessions is not None and workers <= 1:
+        print(f"登录会话: {sessions.summary()}")
+    if blobs is not None:
+        print(f"正文存储: {blobs.summary()}（run {crawler.blob_run}: {blobs.directory}）")
+    if budget is not None:
+        print(f"时间预算: {budget.summary()}")
+        if budget.stats['deadline_hit'] and memory['frontier_urls']:
+            print(f"  到截止时间时还有 {memory['frontier_urls']} 个 URL 未爬"
+                  + (f"，使用 --resume 继续: {state}" if store is not None else ""))
+    if changes is not None:
+        print(f"增量: {incremental.summary()}")
+        if not changes['complete']:
+            print(f"  达到最大页面数或时间预算，未判定删除的页面")
+    print("分阶段耗时:")
+    print(timing.summary())
+    if timing_events:
+        print(f"计时事件: {timing_events}")
+    if prometheus:
+        timing.write_prometheus(prometheus)
+        print(f"Prometheus 指标: {prometheus}")
     print(f"{'='*50}")
 
     if output:
         output_path = Path(output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # 生成合并内容
-        all_content = f"# 站点爬取结果\n\n"
-        all_content += f"**入口**: {url}\n"
-        all_content += f"**页面数**: {len(results)}\n\n"
-        all_content += "---\n\n"
-
-        for i, result in enumerate(results, 1):
-            all_content += f"## {i}. {result['title']}\n\n"
-            all_content += f"**URL**: {result['url']}\n\n"
-            all_content += result['content'][:2000]  # 限制每个页面长度
-            all_content += "\n\n---\n\n"
-
-        # 同时保存站点地图
+        # 从 JSONL 流生成站点地图和合并内容
         sitemap = crawler.get_sitemap()
+        sitemap['resource_stats'] = crawler.resource_stats.to_dict()
+        sitemap['memory'] = memory
+        sitemap['timing'] = timing.report()
+        if budget is not None:
+            sitemap['budget'] = budget.get_stats()
+        if blobs is not None:
+            sitemap['blobs'] = dict(blobs.get_stats(), directory=str(blobs.directory), run=crawler.blob_run)
         sitemap_path = output_path.with_suffix('.sitemap.json')
         import json
         sitemap_path.write_text(json.dumps(sitemap, indent=2, ensure_ascii=False), encoding='utf-8')
 
-        output_path.write_text(all_content, encoding='utf-8')
+        write_site_markdown(output_path, url, crawler.iter_results,
+                            sitemap['total_pages'], sitemap['duplicates_collapsed'], blobs)
         print(f"\n内容已保存到: {output}")
+        print(f"逐页结果 (JSONL): {sink.path}")
         print(f"站点地图已保存到: {sitemap_path}")
+        if changes is not None:
+            changes_path = output_path.with_suffix('.changes.json')
+            changes_path.write_text(json.dumps(changes, indent=2, ensure_ascii=False), encoding='utf-8')
+            print(f"变更列表已保存到: {changes_path}")
+    elif changes is not None:
+        for kind in ('added', 'modified', 'removed'):
+            for changed_url in changes[kind]:
+                print(f"{kind}: {changed_url}")
     else:
-        for result in results[:5]:  # 只显示前5个
+        for result in collapse_duplicates(crawler.results)[0][:5]:  # 只显示前5个
             print(f"\n--- {result['title']} ---")
-            print(result['content'][:500])
+            print((blobs.text(result) if blobs is not None else result['content'])[:500])
 
 
 def main():
@@ -436,15 +1764,86 @@ def main():
     parser.add_argument('url', nargs='?', help='要爬取的 URL')
     parser.add_argument('-o', '--output', help='输出文件路径')
     parser.add_argument('-w', '--wait', type=int, default=DEFAULT_WAIT,
-                        help=f'等待页面渲染的秒数 (默认: {DEFAULT_WAIT})')
+                        help=f'等待页面渲染的最长秒数，页面就绪后提前返回 (默认: {DEFAULT_WAIT})')
     parser.add_argument('-d', '--depth', type=int, default=1,
                         help='爬取深度 (1=单页, 2+=站点)')
     parser.add_argument('-m', '--max-pages', type=int, default=50,
                         help='最大页面数 (默认: 50)')
     parser.add_argument('-c', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
                         help=f'并发数 (默认: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('-r', '--retries', type=int, default=DEFAULT_RETRY,
+                        help=f'每个页面最多尝试次数，实际重试按失败类型决定，404/DNS 等不重试 (默认: {DEFAULT_RETRY})')
+    parser.add_argument('--breaker', type=int, default=DEFAULT_BREAKER_THRESHOLD,
+                        help=f'同一主机连续 N 次超时/连接错误/5xx 后熔断，0 关闭 (默认: {DEFAULT_BREAKER_THRESHOLD})')
+    parser.add_argument('--breaker-cooldown', type=float, default=DEFAULT_BREAKER_COOLDOWN,
+                        help=f'熔断后多少秒再放行一个探测请求 (默认: {DEFAULT_BREAKER_COOLDOWN:.0f})')
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help='总时长上限：到点前停止派发新页面，已完成的结果照常落盘')
+    parser.add_argument('--page-budget', type=float, default=DEFAULT_PAGE_BUDGET, metavar='SECONDS',
+                        help=f'单页预算，导航、等待就绪和提取合计 (默认: {DEFAULT_PAGE_BUDGET:.0f})')
+    parser.add_argument('--host-budget', type=float, metavar='SECONDS',
+                        help='每个主机累计页面耗时上限，用完后该主机剩余页面跳过')
+    parser.add_argument('--sessions', nargs='?', const=str(DEFAULT_SESSION_DIR), metavar='DIR',
+                        help=f'注入 browser-session.py 录制的登录会话 (目录默认: {DEFAULT_SESSION_DIR})')
+    parser.add_argument('--session-ttl', type=float, metavar='SECONDS',
+                        help='会话最长使用时间，超过后视为过期并刷新（默认只看 Cookie 过期时间）')
     parser.add_argument('--crawl', action='store_true',
                         help='启用站点爬取模式')
+    parser.add_argument('--browsers', type=int, default=1,
+                        help='站点爬取时的浏览器实例数 (默认: 1)')
+    parser.add_argument('--pages-per-browser', type=int, default=DEFAULT_PAGES_PER_BROWSER,
+                        help=f'每个浏览器服务多少页面后回收 (默认: {DEFAULT_PAGES_PER_BROWSER})')
+    parser.add_argument('--tabs', type=int, default=0,
+                        help='站点爬取时每个 context 最多保留的预热标签页数（应不小于 -c），同源页面复用 context 和标签页；0 则每个 URL 新建 context (默认: 0)')
+    parser.add_argument('--static-first', action='store_true',
+                        help='先用 HTTP GET 静态解析，正文不足或是 JS 外壳时再启动浏览器')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help=f'资源拦截配置 (默认: {DEFAULT_PROFILE})')
+    parser.add_argument('--sitemap', action='store_true',
+                        help='先从 robots.txt / sitemap.xml 预填 frontier，再沿链接补充发现')
+    parser.add_argument('--sitemap-only', action='store_true',
+                        help='只爬 sitemap 中的页面，跳过链接发现（全部并行）')
+    parser.add_argument('--include', action='append', metavar='PATTERN',
+                        help='只爬匹配的 URL（glob，匹配路径，如 "/docs/*"；可多次使用）')
+    parser.add_argument('--boost', action='append', metavar='PATTERN',
+                        help='匹配的 URL 优先爬取（glob，如 "/docs/components/*"；可多次使用）')
+    parser.add_argument('--fifo', action='store_true',
+                        help='按发现顺序爬取，不做优先级排序')
+    parser.add_argument('--bloom', type=int, metavar='N',
+                        help='预期 URL 数，在已访问集合前加 Bloom 过滤器')
+    parser.add_argument('--bloom-only', action='store_true',
+                        help='已访问集合只用 Bloom 过滤器（需 --bloom，约 2 字节/URL，0.1%% 误判）')
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='关闭近重复页面检测')
+    parser.add_argument('--skip-duplicate-links', action='store_true',
+                        help='近重复页面的链接不再展开（镜像目录整棵跳过）')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'每个主机每秒请求数，0 不限速 (默认: {DEFAULT_RATE:g})')
+    parser.add_argument('--host-concurrency', type=int,
+                        help='每个主机同时在途的请求数 (默认: 与总并发相同，即 -c × --workers)')
+    parser.add_argument('--ignore-robots', action='store_true',
+                        help='不读取 robots.txt 的 Crawl-delay')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='站点爬取的工作进程数，每个进程各自的浏览器和 -c 个并发 (默认: 1)')
+    parser.add_argument('--shard-by', choices=SHARD_KEYS, default='url',
+                        help='多进程时 frontier 的分片方式：url 负载均匀，host 按主机限速精确 (默认: url)')
+    parser.add_argument('--incremental', metavar='MANIFEST',
+                        help='增量重爬清单 (SQLite)：未变化的页面跳过，只输出新增/修改页面和变更列表')
+    parser.add_argument('--timing', metavar='EVENTS',
+                        help='每个页面的分阶段耗时写入 JSONL 事件文件')
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help='爬取结束后把各阶段 p50/p95/p99 写成 Prometheus textfile')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                        help='逐页 JSONL 输出的压缩方式（zstd 需要 pip install zstandard）')
+    parser.add_argument('--blob-store', metavar='DIR',
+                        help='正文存储目录：正文按内容哈希压缩保存（与 --compress 相同的算法，默认 gzip），'
+                             'JSONL 只记录哈希，跨运行相同的正文只存一份')
+    parser.add_argument('--state', help='站点爬取状态文件 (SQLite)，默认为 <output>.state.db')
+    parser.add_argument('--resume', action='store_true',
+                        help='从状态文件断点续爬，已完成的页面不再重新获取')
+    parser.add_argument('--cache', help='页面缓存文件路径 (SQLite)，不指定则不缓存')
+    parser.add_argument('--cache-ttl', type=int, default=DEFAULT_TTL,
+                        help=f'缓存新鲜期秒数，过期后发条件请求重验 (默认: {DEFAULT_TTL})')
 
     args = parser.parse_args()
 
@@ -452,12 +1851,39 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    if args.bloom_only and not args.bloom:
+        parser.error('--bloom-only 需要同时指定 --bloom N')
+
+    cache = PageCache(args.cache, ttl=args.cache_ttl) if args.cache else None
+    # 不指定时每主机并发跟随总并发，单站点爬取不会被压到比 -c 更低
+    scheduler = PolitenessScheduler(rate=args.rate,
+                                    host_concurrency=args.host_concurrency
+                                    or args.concurrency * max(1, args.workers),
+                                    respect_robots=not args.ignore_robots)
+    policy = RetryPolicy(args.retries)
+    breaker = CircuitBreaker(args.breaker, args.breaker_cooldown) if args.breaker > 0 else None
+    budget = Budget(deadline=args.deadline, page=args.page_budget, host=args.host_budget)
+    sessions = SessionStore(args.sessions, ttl=args.session_ttl) if args.sessions else None
+    try:
+        blobs = BlobStore(args.blob_store, args.compress) if args.blob_store else None
+    except RuntimeError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
     # 根据参数决定模式
-    if args.crawl or args.depth > 1:
-        crawl_site(args.url, args.output, args.depth, args.max_pages, args.concurrency)
+    if args.crawl or args.depth > 1 or args.sitemap or args.sitemap_only:
+        crawl_site(args.url, args.output, args.depth, args.max_pages, args.concurrency,
+                   args.browsers, args.pages_per_browser, cache, args.static_first,
+                   args.profile, args.state, args.resume, scheduler,
+                   args.sitemap, args.sitemap_only, args.include, args.boost, not args.fifo,
+                   args.bloom, args.bloom_only, not args.no_dedup, args.skip_duplicate_links,
+                   args.compress, args.incremental, args.timing, args.prometheus,
+                   args.workers, args.shard_by, policy, breaker, budget, args.tabs, sessions,
+                   blobs)
     else:
         # 单页爬取
-        crawl_single(args.url, args.output, args.wait)
+        crawl_single(args.url, args.output, args.wait, cache, args.static_first, args.profile,
+                     scheduler, policy=policy, breaker=breaker, budget=budget, sessions=sessions)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+优先级 frontier
+按 URL 价值排序而不是先进先出，固定的页面预算优先花在高价值页面上
+
+评分因素：
+- 路径模板热度：按 segment_template（url-pattern-analyzer.py 共用）把路径归成模板
+  （数字 → {id}、日期 → {date}、UUID → {uuid}，末级 → {slug}），同模板的兄弟页面越多（如 /docs/components/{slug}）分越高
+- 入链数：被越多页面链接越重要
+- 深度：越深分越低
+- 链接位置：正文中的链接高于导航/页脚中的链接
+- 用户提供的 boost 模式加分；changelog、blog、tag 等低价值路径减分
+
+实现：堆 + 惰性删除，入队、重新评分都是 O(log n)
+"""
+
+import heapq
+import itertools
+import math
+import re
+from collections import Counter
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ============ 配置 ============
+
+TEMPLATE_WEIGHT = 1.0
+INLINK_WEIGHT = 1.5
+DEPTH_WEIGHT = 2.0
+BOOST_WEIGHT = 10.0
+NAV_PENALTY = 1.0
+LOW_VALUE_PENALTY = 4.0
+
+# 低价值路径段
+LOW_VALUE_SEGMENTS = {'changelog', 'changelogs', 'releases', 'release-notes', 'blog', 'news',
+                      'tag', 'tags', 'category', 'categories', 'author', 'authors', 'page',
+                      'archive', 'archives', 'search', 'login', 'signup', 'register'}
+
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}')
+
+
+def segment_template(part: str) -> str:
+    """路径段归类：数字 → {id}、日期 → {date}、UUID → {uuid}，其余原样"""
+    if part.isdigit():
+        return '{id}'
+    if DATE_RE.match(part):
+        return '{date}'
+    if UUID_RE.match(part):
+        return '{uuid}'
+    return part
+
+
+def path_template(url: str) -> str:
+    """路径模板：/docs/components/button -> /docs/components/{slug}"""
+    template = [segment_template(p) for p in urlparse(url).path.split('/') if p]
+    if len(template) >= 2 and not template[-1].startswith('{'):
+        template[-1] = '{slug}'
+    return '/' + '/'.join(template)
+
+
+def matches_any(url: str, patterns: List[str]) -> bool:
+    """glob 模式匹配：含 :// 的模式匹配完整 URL，否则匹配路径"""
+    path = urlparse(url).path or '/'
+    for pattern in patterns:
+        target = url if '://' in pattern else path
+        if fnmatch(target, pattern):
+            return True
+    return False
+
+
+class URLScorer:
+    """URL 评分器（分数越高越先爬）"""
+
+    def __init__(self, boost: List[str] = None):
+        self.boost = boost or []
+        self.templates: Counter = Counter()  # 模板 -> 已见过的 URL 数
+        # 以下两项只保存仍在 frontier 中的 URL，出队时由 forget 删除，内存随 frontier 有界
+        self.inlinks: Counter = Counter()
+        self.regions: Dict[str, str] = {}  # URL -> 见过的最好链接位置
+
+    def observe(self, url: str, region: str = None, is_new: bool = True):
+        """记录一次链接发现"""
+        if is_new:
+            self.templates[path_template(url)] += 1
+        self.inlinks[url] += 1
+        if region == 'body' or url not in self.regions:
+            self.regions[url] = region or 'body'
+
+    def forget(self, url: str):
+        """URL 出队后不会再评分，删除它的入链和位置记录"""
+        self.inlinks.pop(url, None)
+        self.regions.pop(url, None)
+
+    def tracked(self) -> int:
+        """仍保存入链/位置记录的 URL 数"""
+        return len(self.inlinks)
+
+    def score(self, url: str, depth: int) -> float:
+        score = TEMPLATE_WEIGHT * math.log2(1 + self.templates[path_template(url)])
+        score += INLINK_WEIGHT * math.log2(1 + self.inlinks[url])
+        score -= DEPTH_WEIGHT * depth
+        if self.regions.get(url) == 'nav':
+            score -= NAV_PENALTY
+        segments = {p.lower() for p in urlparse(url).path.split('/') if p}
+        if segments & LOW_VALUE_SEGMENTS:
+            score -= LOW_VALUE_PENALTY
+        if self.boost and matches_any(url, self.boost):
+            score += BOOST_WEIGHT
+        return score
+
+
+class PriorityFrontier:
+    """
+    最优先 frontier
+    接口与 deque 的 append/extend/popleft 兼容；scorer 为 None 时退化为先进先出
+    """
+
+    def __init__(self, scorer: Optional[URLScorer] = None):
+        self.scorer = scorer
+        self._heap: List[tuple] = []  # (-score, seq, url)
+        self._entries: Dict[str, Tuple[float, int, int]] = {}  # url -> (score, depth, seq)
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def push(self, url: str, depth: int, region: str = None):
+        """入队；已在队列中的 URL 取较小深度并重新评分"""
+        entry = self._entries.get(url)
+        if entry is not None:
+            depth = min(depth, entry[1])
+        if self.scorer is not None:
+            self.scorer.observe(url, region, is_new=entry is None)
+            self._set(url, self.scorer.score(url, depth), depth)
+        elif entry is None:
+            self._set(url, 0.0, depth)
+
+    def append(self, item: Tuple[str, int]):
+        self.push(item[0], item[1])
+
+    def extend(self, items: Iterable[Tuple[str, int]]):
+        for url, depth in items:
+            self.push(url, depth)
+
+    def _set(self, url: str, score: float, depth: int):
+        seq = next(self._seq)
+        self._entries[url] = (score, depth, seq)
+        heapq.heappush(self._heap, (-score, seq, url))
+        # 过期条目太多时重建堆
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(-s, q, u) for u, (s, _, q) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def popleft(self) -> Tuple[str, int]:
+        """弹出分数最高的 (url, depth)"""
+        while self._heap:
+            _, seq, url = heapq.heappop(self._heap)
+            entry = self._entries.get(url)
+            if entry is not None and entry[2] == seq:
+                del self._entries[url]
+                if self.scorer is not None:
+                    self.scorer.forget(url)
+                return url, entry[1]
+        raise IndexError('pop from an empty frontier')
+
+    def rescore_all(self):
+        """模板热度变化后整体重新评分（O(n log n)，周期性调用）"""
+        if self.scorer is None:
+            return
+        self._heap = []
+        for url, (_, depth, seq) in list(self._entries.items()):
+            score = self.scorer.score(url, depth)
+            self._entries[url] = (score, depth, seq)
+            self._heap.append((-score, seq, url))
+        heapq.heapify(self._heap)
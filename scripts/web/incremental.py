@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+增量重爬
+manifest 记录每个 URL 的正文哈希、获取时间、sitemap lastmod、ETag/Last-Modified 和出链，
+再次爬取同一站点时只重新提取新增或变化的页面
+
+判断顺序：
+- sitemap lastmod 不晚于上次记录 → 未变化，不发请求，出链从 manifest 取回继续发现
+- 有 ETag/Last-Modified → 条件请求，304 即未变化
+- 否则重新获取，按正文哈希判断是否变化
+结束后给出变更列表：新增 / 修改 / 删除（本次完整爬完但没再出现的 URL）/ 未变化
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from hashlib import blake2b
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from page_cache import is_not_modified
+
+
+# ============ 配置 ============
+
+ADDED = 'added'
+MODIFIED = 'modified'
+UNCHANGED = 'unchanged'
+REMOVED = 'removed'
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def content_hash(content: str) -> str:
+    """正文哈希（空白归一化，排版抖动不算变化）"""
+    normalized = WHITESPACE_RE.sub(' ', content or '').strip()
+    return blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _parse_lastmod(value: str) -> Optional[datetime]:
+    """W3C datetime（2024-01-02 / 2024-01-02T10:00:00Z）→ UTC datetime"""
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def lastmod_unchanged(previous: Optional[str], current: Optional[str]) -> bool:
+    """sitemap lastmod 没有比上次记录的更新"""
+    if not previous or not current:
+        return False
+    old, new = _parse_lastmod(previous), _parse_lastmod(current)
+    if old is None or new is None:
+        return previous == current
+    return new <= old
+
+
+class Manifest:
+    """基于 SQLite 的增量爬取清单"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 站点爬取经 asyncio.to_thread 访问，统一加锁
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                content_hash TEXT,
+                lastmod TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                links TEXT,
+                fetched_at REAL,
+                seen_run INTEGER
+            );
+        """)
+        self._conn.commit()
+
+        self.run = 0
+        self.changes: Dict[str, List[str]] = {ADDED: [], MODIFIED: [], REMOVED: []}
+        self.unchanged = 0
+
+    def begin(self, config: Dict) -> int:
+        """
+        开始一轮爬取，返回清单中已有的 URL 数
+        config（入口 URL、范围等）与上次不一致时拒绝：否则范围外的页面会被误判为删除
+        """
+        config = {k: str(v) for k, v in config.items()}
+        with self._lock:
+            saved = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            mismatched = [k for k, v in config.items() if k in saved and saved[k] != v]
+            if mismatched:
+                raise ValueError(
+                    f"清单 {self.path} 属于另一个爬取范围（{', '.join(mismatched)} 不一致），"
+                    f"换一个清单文件")
+
+            self.run = int(saved.get('run', 0)) + 1
+            config['run'] = str(self.run)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", config.items())
+            self._conn.commit()
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, content_hash, lastmod, etag, last_modified, links, fetched_at "
+                "FROM pages WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        return {
+            'url': url,
+            'title': row[0],
+            'content_hash': row[1],
+            'lastmod': row[2],
+            'etag': row[3],
+            'last_modified': row[4],
+            'links': set(json.loads(row[5] or '[]')),
+            'fetched_at': row[6],
+        }
+
+    def check(self, url: str, lastmod: str = None,
+              revalidate: Union[bool, Callable[[str, str, str], bool]] = True) -> Optional[Dict]:
+        """
+        判断页面是否未变化：未变化时登记并返回清单条目（含出链），否则返回 None
+        revalidate=False 时只看 lastmod，不发条件请求；
+        也可以传入 (url, etag, last_modified) -> 是否 304 的函数代替 is_not_modified（如先占礼貌调度名额）
+        """
+        entry = self.get(url)
+        if entry is None:
+            return None
+
+        if not lastmod_unchanged(entry['lastmod'], lastmod):
+            if not revalidate or not (entry['etag'] or entry['last_modified']):
+                return None
+            conditional = revalidate if callable(revalidate) else is_not_modified
+            if not conditional(url, entry['etag'], entry['last_modified']):
+                return None
+
+        self.mark_unchanged(url)
+        return entry
+
+    def mark_unchanged(self, url: str):
+        self.touch(url)
+        with self._lock:
+            self.unchanged += 1
+
+    def touch(self, url: str):
+        """标记本轮见过（断点续爬恢复的页面），不计入变更"""
+        with self._lock:
+            self._conn.execute("UPDATE pages SET seen_run = ? WHERE url = ?", (self.run, url))
+            self._conn.commit()
+
+    def record(self, url: str, content: str, title: str = '',
+               validators: Dict = None, lastmod: str = None,
+               links: Iterable[str] = ()) -> str:
+        """登记重新获取的页面，返回 added / modified / unchanged"""
+        validators = validators or {}
+        digest = content_hash(content)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, title, content_hash, lastmod, etag, last_modified, links, fetched_at, seen_run) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, title, digest, lastmod, validators.get('etag'),
+                 validators.get('last_modified'), json.dumps(sorted(links)),
+                 time.time(), self.run))
+            self._conn.commit()
+
+            if row is None:
+                change = ADDED
+            elif row[0] != digest:
+                change = MODIFIED
+            else:
+                self.unchanged += 1
+                return UNCHANGED
+            self.changes[change].append(url)
+            return change
+
+    def finish(self, complete: bool = True) -> Dict:
+        """
+        结束本轮，返回变更列表
+        complete=False（预算耗尽或中断）时无法判断哪些页面被删除，不做删除判定
+        """
+        if complete:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT url FROM pages WHERE seen_run < ? OR seen_run IS NULL",
+                    (self.run,)).fetchall()
+                self.changes[REMOVED] = [row[0] for row in rows]
+                self._conn.execute(
+                    "DELETE FROM pages WHERE seen_run < ? OR seen_run IS NULL", (self.run,))
+                self._conn.commit()
+        return self.change_list(complete)
+
+    def change_list(self, complete: bool = True) -> Dict:
+        return {
+            'run': self.run,
+            'complete': complete,
+            'added': self.changes[ADDED],
+            'modified': self.changes[MODIFIED],
+            'removed': self.changes[REMOVED],
+            'unchanged': self.unchanged,
+        }
+
+    def summary(self) -> str:
+        return (f"新增 {len(self.changes[ADDED])}, 修改 {len(self.changes[MODIFIED])}, "
+                f"删除 {len(self.changes[REMOVED])}, 未变化 {self.unchanged}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+流式 JSONL 输出
+每完成一个页面追加一行 JSON，不在内存中积累整次爬取的结果；
+Markdown、站点地图等输出在爬取结束后从这个流生成
+
+- 可选 gzip / zstd 压缩（按扩展名 .gz / .zst 推断，zstd 需要 pip install zstandard）
+- 每 flush_every 条刷新一次，每 fsync_interval 秒 fsync 一次：崩溃时最多丢失最后一小段
+- 读取时容忍被截断的末尾（崩溃中断的文件依然可读）
+"""
+
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from url_seen import URLSeen
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# ============ 配置 ============
+
+DEFAULT_FLUSH_EVERY = 20  # 每多少条记录刷新一次缓冲
+DEFAULT_FSYNC_INTERVAL = 10.0  # 至少每多少秒 fsync 一次
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def jsonl_path(base: Path, compression: Optional[str] = None) -> Path:
+    """输出文件路径：crawl.md -> crawl.jsonl / crawl.jsonl.gz / crawl.jsonl.zst"""
+    path = Path(base).with_suffix('.jsonl')
+    if compression:
+        path = path.with_name(path.name + COMPRESSION_SUFFIXES[compression])
+    return path
+
+
+def _compression_of(path: Path) -> Optional[str]:
+    for name, suffix in COMPRESSION_SUFFIXES.items():
+        if path.name.endswith(suffix):
+            return name
+    return None
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise RuntimeError("zstd 压缩需要安装 zstandard: pip install zstandard")
+
+
+def _default(o):
+    # links 等字段是 set
+    if isinstance(o, (set, frozenset)):
+        return sorted(o)
+    return str(o)
+
+
+class JSONLSink:
+    """线程安全的 JSONL 追加写入器"""
+
+    def __init__(self,
+                 path: str,
+                 flush_every: int = DEFAULT_FLUSH_EVERY,
+                 fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+                 append: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compression = _compression_of(self.path)
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._raw = open(self.path, 'ab' if append else 'wb')
+        if self.compression == 'gzip':
+            # 追加时形成多成员 gzip，gzip 读取会自动拼接
+            self._out = gzip.GzipFile(fileobj=self._raw, mode='ab' if append else 'wb')
+        elif self.compression == 'zstd':
+            _require_zstd()
+            self._out = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._out = self._raw
+
+        self.count = 0
+        self._unflushed = 0
+        self._last_fsync = time.monotonic()
+
+    def write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, default=_default) + '\n'
+        with self._lock:
+            self._out.write(line.encode('utf-8'))
+            self.count += 1
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush(fsync=time.monotonic() - self._last_fsync >= self.fsync_interval)
+
+    def flush(self, fsync: bool = False):
+        with self._lock:
+            if not self._raw.closed:
+                self._flush(fsync)
+
+    def _flush(self, fsync: bool):
+        if self.compression == 'zstd':
+            self._out.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._out.flush()  # gzip 默认 Z_SYNC_FLUSH，已写内容可被读出
+        self._raw.flush()
+        self._unflushed = 0
+        if fsync:
+            os.fsync(self._raw.fileno())
+            self._last_fsync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._raw.closed:
+                return
+            if self.compression == 'zstd':
+                self._out.flush(zstandard.FLUSH_FRAME)
+            elif self.compression == 'gzip':
+                self._out.close()  # 写入 gzip 尾部，不会关闭底层文件
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            if self.compression == 'zstd':
+                self._out.close()  # 同时关闭底层文件
+            else:
+                self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_text(path: Path):
+    compression = _compression_of(path)
+    if compression == 'gzip':
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8')
+    if compression == 'zstd':
+        _require_zstd()
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_jsonl(path: str, unique_key: Optional[str] = 'url') -> Iterator[Dict]:
+    """
+    逐条读取 JSONL
+    unique_key 不为 None 时同一键只取第一条（断点续爬可能写入重复记录）；
+    末尾被截断的行（崩溃时正在写入）直接忽略
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    seen = URLSeen() if unique_key else None
+
+    with _open_text(path) as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if seen is not None and not seen.add(str(record.get(unique_key))):
+                    continue
+                yield record
+        except (EOFError, gzip.BadGzipFile):
+            return  # 压缩流被截断
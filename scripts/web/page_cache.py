@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+页面缓存
+把提取结果（标题、正文、链接）连同响应的 ETag/Last-Modified 持久化到磁盘，
+重复爬取时先发条件请求，304 直接返回缓存，省去浏览器渲染
+
+- 以归一化 URL 为键
+- TTL 内直接命中，过期后用条件请求重新验证
+- 超过最大条目数时按最近访问时间（LRU）淘汰
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import urllib.request
+import urllib.error
+from pathlib import Path
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from typing import Dict, Optional
+
+
+# ============ 配置 ============
+
+DEFAULT_TTL = 3600  # 缓存新鲜期（秒），过期后条件重验
+DEFAULT_MAX_ENTRIES = 5000  # 最大条目数
+REVALIDATE_TIMEOUT = 10  # 条件请求超时（秒）
+USER_AGENT = 'Mozilla/5.0 (compatible; AI-Assistant-Crawler)'
+
+
+def cache_key(url: str) -> str:
+    """缓存键：小写 scheme/host，去掉锚点和末尾斜杠，查询参数排序"""
+    parsed = urlparse(url)
+    path = parsed.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((
+        parsed.scheme.lower(),
+        parsed.netloc.lower(),
+        path,
+        '',
+        query,
+        ''
+    ))
+
+
+def is_not_modified(url: str, etag: str = None, last_modified: str = None) -> bool:
+    """发送条件请求，服务器返回 304 即未变化（没有校验器时返回 False）"""
+    headers = {'User-Agent': USER_AGENT}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    if len(headers) == 1:
+        return False
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=REVALIDATE_TIMEOUT) as response:
+            return response.status == 304
+    except urllib.error.HTTPError as e:
+        return e.code == 304
+    except Exception:
+        return False
+
+
+class PageCache:
+    """基于 SQLite 的页面缓存"""
+
+    def __init__(self,
+                 path: str,
+                 ttl: int = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # 爬虫的工作线程 / asyncio.to_thread 都会访问，统一加锁
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                content TEXT,
+                links TEXT,
+                status INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON pages(accessed_at)")
+        self._conn.commit()
+
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+
+    def _get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, title, content, links, status, etag, last_modified, stored_at "
+                "FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'url': row[0],
+            'title': row[1],
+            'content': row[2],
+            'links': set(json.loads(row[3] or '[]')),
+            'status': row[4],
+            'etag': row[5],
+            'last_modified': row[6],
+            'stored_at': row[7],
+        }
+
+    def _touch(self, key: str, refreshed: bool = False):
+        now = time.time()
+        with self._lock:
+            if refreshed:
+                self._conn.execute(
+                    "UPDATE pages SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, key))
+            else:
+                self._conn.execute(
+                    "UPDATE pages SET accessed_at = ? WHERE url = ?", (now, key))
+            self._conn.commit()
+
+    def _is_not_modified(self, url: str, entry: Dict) -> bool:
+        return is_not_modified(url, entry.get('etag'), entry.get('last_modified'))
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        查询缓存
+        新鲜 → 直接返回；过期但有校验器 → 条件请求，304 返回缓存；否则返回 None
+        """
+        key = cache_key(url)
+        entry = self._get(key)
+
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        if time.time() - entry['stored_at'] < self.ttl:
+            self._touch(key)
+            self.stats['hits'] += 1
+            return self._to_result(url, entry)
+
+        if self._is_not_modified(url, entry):
+            self._touch(key, refreshed=True)
+            self.stats['revalidated'] += 1
+            return self._to_result(url, entry)
+
+        self.stats['misses'] += 1
+        return None
+
+    def _to_result(self, url: str, entry: Dict) -> Dict:
+        return {
+            'url': url,
+            'title': entry['title'],
+            'content': entry['content'],
+            'links': entry['links'],
+            'status': entry['status'],
+            'validators': {
+                'etag': entry['etag'],
+                'last_modified': entry['last_modified'],
+            },
+            'from_cache': True,
+            'tier': 'cache',
+        }
+
+    def store(self, result: Dict):
+        """写入爬取结果（result 为 fetch_single_url 的返回值）"""
+        validators = result.get('validators') or {}
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, title, content, links, status, etag, last_modified, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    cache_key(result['url']),
+                    result.get('title', ''),
+                    result.get('content', ''),
+                    json.dumps(sorted(result.get('links') or [])),
+                    result.get('status'),
+                    validators.get('etag'),
+                    validators.get('last_modified'),
+                    now,
+                    now,
+                )
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """超出容量时淘汰最久未访问的条目（调用方已持锁）"""
+        count = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM pages WHERE url IN "
+                "(SELECT url FROM pages ORDER BY accessed_at ASC LIMIT ?)", (overflow,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
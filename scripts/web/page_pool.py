@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+标签页池
+不再为每个 URL 新建并关闭 context/page：每个浏览器按源（scheme + 主机）保留一个长期 context，
+context 中保留最多 tabs 个预热的标签页，用完导航到 about:blank 复位后给下一个页面使用
+
+- 同源页面共用一个 context：HTTP 缓存、连接池（keep-alive、TLS 会话）和 Cookie 在标签页之间共享，
+  浏览器自己的网络栈保持连接常热
+- 复位在后台进行，worker 交还标签页后立即开始下一个页面；多个 worker 共用同一组标签页，
+  一个标签页在提取时，另一个已经在导航（流水线）。每个 context 最多 tabs 个标签页，
+  都在使用或复位中时等待，tabs 不小于并发数时不会等待
+- 不同源分开 context，互不共享 Cookie；每个浏览器的 context 数超过上限时关闭最久未用的空闲 context
+- 资源拦截等 context 级设置由 setup(context) 在创建 context 时安装一次
+- 给出 sessions 时按源注入登录会话，关闭 context 前把轮换后的 Cookie 写回
+
+- AsyncPagePool: 异步版，借用 AsyncBrowserPool 的浏览器（页面计数和回收规则不变）
+- PagePool: 同步版，配合 BrowserPool，每个线程各自的 context 和标签页
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+from urllib.parse import urlparse
+from typing import Callable, Dict, List, Tuple
+
+from browser_pool import BrowserPool, AsyncBrowserPool
+from sessions import SessionStore
+
+
+# ============ 配置 ============
+
+DEFAULT_TABS = 4  # 每个 context 保留的空闲标签页数
+MAX_CONTEXTS = 8  # 每个浏览器（同步版为每个线程）保留的 context 数
+RESET_URL = 'about:blank'
+RESET_TIMEOUT = 5000  # 复位导航超时（毫秒），超时的标签页直接关闭
+
+
+def origin_of(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class _Context:
+    """一个源在一个浏览器中的 context 和它的空闲标签页"""
+
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+        self.idle: List = []
+        self.busy = 0  # 借出和正在复位的标签页
+        self.open = 0  # 已打开的标签页（空闲 + busy）
+
+
+class _Stats:
+    def __init__(self):
+        self.contexts = 0
+        self.tabs_opened = 0
+        self.reuses = 0
+        self.reset_failures = 0
+        self.lock = threading.Lock()
+
+    def add(self, name: str, n: int = 1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> Dict:
+        return {
+            'contexts': self.contexts,
+            'tabs_opened': self.tabs_opened,
+            'tab_reuses': self.reuses,
+            'reset_failures': self.reset_failures,
+        }
+
+    def summary(self) -> str:
+        return (f"context {self.contexts} 个, 新开标签页 {self.tabs_opened} 个, "
+                f"复用 {self.reuses} 次, 复位失败 {self.reset_failures} 次")
+
+
+# ============ 异步标签页池 ============
+
+class AsyncPagePool:
+    """异步标签页池：按 (浏览器, 源) 复用 context 和预热的标签页"""
+
+    def __init__(self, browsers: AsyncBrowserPool, tabs: int = DEFAULT_TABS,
+                 setup: Callable = None, max_contexts: int = MAX_CONTEXTS,
+                 sessions: SessionStore = None):
+        self.browsers = browsers
+        self.tabs = max(1, tabs)
+        self.setup = setup  # async setup(context)
+        self.sessions = sessions
+        self.max_contexts = max_contexts
+        self._contexts: 'OrderedDict[Tuple[int, str], _Context]' = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._tab_freed = asyncio.Condition(self._lock)
+        self._resets: set = set()
+        self.stats = _Stats()
+
+    async def _open_context(self, browser, key: Tuple[int, str]) -> _Context:
+        """调用方持有锁"""
+        # 浏览器回收后旧 context 随之失效
+        for stale in [k for k, e in self._contexts.items() if not e.browser.is_connected()]:
+            del self._contexts[stale]
+
+        # 该浏览器的 context 超过上限时关闭最久未用且没有借出标签页的
+        same_browser = [k for k, e in self._contexts.items() if k[0] == key[0] and e.busy == 0]
+        while same_browser and len([k for k in self._contexts if k[0] == key[0]]) >= self.max_contexts:
+            evicted_key = same_browser.pop(0)
+            await self._close_context(self._contexts.pop(evicted_key), evicted_key[1])
+
+        options = self.sessions.context_options(key[1]) if self.sessions is not None else {}
+        context = await browser.new_context(**options)
+        if self.setup is not None:
+            await self.setup(context)
+        entry = self._contexts[key] = _Context(browser, context)
+        self.stats.add('contexts')
+        return entry
+
+    async def _checkout(self, browser, url: str):
+        key = (id(browser), origin_of(url))
+        async with self._tab_freed:
+            entry = self._contexts.get(key)
+            if entry is None or entry.browser is not browser:
+                entry = await self._open_context(browser, key)
+            self._contexts.move_to_end(key)
+            # 标签页都在使用或复位中：等一个空出来，而不是再开新的
+            while not entry.idle and entry.open >= self.tabs:
+                await self._tab_freed.wait()
+            entry.busy += 1
+            page = entry.idle.pop() if entry.idle else None
+            if page is None:
+                entry.open += 1
+
+        if page is not None:
+            self.stats.add('reuses')
+            return entry, page
+        try:
+            page = await entry.context.new_page()
+        except Exception:
+            async with self._tab_freed:
+                entry.busy -= 1
+                entry.open -= 1
+                self._tab_freed.notify_all()
+            raise
+        self.stats.add('tabs_opened')
+        return entry, page
+
+    async def _reset(self, entry: _Context, page):
+        """复位标签页并放回空闲列表；复位失败（崩溃、超时）时关闭"""
+        keep = False
+        try:
+            if not page.is_closed() and entry.browser.is_connected():
+                await page.goto(RESET_URL, timeout=RESET_TIMEOUT)
+                keep = True
+        except Exception:
+            self.stats.add('reset_failures')
+
+        if not keep:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        async with self._tab_freed:
+            entry.busy -= 1
+            if keep:
+                entry.idle.append(page)
+            else:
+                entry.open -= 1
+            self._tab_freed.notify_all()
+
+    @asynccontextmanager
+    async def page(self, url: str):
+        """借出一个该 URL 所在源的标签页；交还后在后台复位，不占用调用方的时间"""
+        async with self.browsers.browser() as browser:
+            entry, page = await self._checkout(browser, url)
+            try:
+                yield page
+            finally:
+                task = asyncio.create_task(self._reset(entry, page))
+                self._resets.add(task)
+                task.add_done_callback(self._resets.discard)
+
+    async def _close_context(self, entry: _Context, origin: str):
+        try:
+            if self.sessions is not None:
+                await self.sessions.update_async(origin, entry.context)
+            await entry.context.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        """关闭所有 context（在关闭浏览器池之前调用）"""
+        if self._resets:
+            await asyncio.gather(*self._resets, return_exceptions=True)
+        async with self._lock:
+            for (_, origin), entry in self._contexts.items():
+                await self._close_context(entry, origin)
+            self._contexts.clear()
+
+    def get_stats(self) -> Dict:
+        return self.stats.to_dict()
+
+    def summary(self) -> str:
+        return self.stats.summary()
+
+
+# ============ 同步标签页池 ============
+
+class PagePool:
+    """
+    同步标签页池：配合 BrowserPool 使用，每个工作线程各自的 context 和标签页
+    （同步 API 不能跨线程；线程一次只处理一个页面，每个 context 保留一个标签页即可）
+    """
+
+    def __init__(self, browsers: BrowserPool, setup: Callable = None,
+                 max_contexts: int = MAX_CONTEXTS, sessions: SessionStore = None):
+        self.browsers = browsers
+        self.setup = setup  # setup(context)
+        self.sessions = sessions
+        self.max_contexts = max_contexts
+        self._local = threading.local()
+        self.stats = _Stats()
+
+    def _contexts(self) -> 'OrderedDict[str, _Context]':
+        contexts = getattr(self._local, 'contexts', None)
+        if contexts is None:
+            contexts = self._local.contexts = OrderedDict()
+        return contexts
+
+    def _checkout(self, browser, url: str):
+        contexts = self._contexts()
+        key = origin_of(url)
+        entry = contexts.get(key)
+        if entry is None or entry.browser is not browser or not browser.is_connected():
+            # 换了浏览器（回收重建）时旧 context 全部作废
+            for stale in [k for k, e in contexts.items() if e.browser is not browser]:
+                del contexts[stale]
+            while len(contexts) >= self.max_contexts:
+                origin, evicted = contexts.popitem(last=False)
+                self._close_context(evicted, origin)
+            options = self.sessions.context_options(key) if self.sessions is not None else {}
+            context = browser.new_context(**options)
+            if self.setup is not None:
+                self.setup(context)
+            entry = contexts[key] = _Context(browser, context)
+            self.stats.add('contexts')
+        contexts.move_to_end(key)
+
+        page = entry.idle.pop() if entry.idle else None
+        if page is not None and not page.is_closed():
+            self.stats.add('reuses')
+            return entry, page
+        page = entry.context.new_page()
+        self.stats.add('tabs_opened')
+        return entry, page
+
+    def _reset(self, entry: _Context, page):
+        try:
+            if not page.is_closed() and entry.browser.is_connected():
+                page.goto(RESET_URL, timeout=RESET_TIMEOUT)
+                entry.idle.append(page)
+                return
+        except Exception:
+            self.stats.add('reset_failures')
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def page(self, url: str):
+        """借出当前线程中该 URL 所在源的标签页，用完复位"""
+        with self.browsers.browser() as browser:
+            entry, page = self._checkout(browser, url)
+            try:
+                yield page
+            finally:
+                self._reset(entry, page)
+                if self.sessions is not None:
+                    # 同步版的 context 随浏览器关闭，不经过 _close_context，按间隔写回
+                    self.sessions.update(url, entry.context)
+
+    def _close_context(self, entry: _Context, origin: str):
+        try:
+            if self.sessions is not None:
+                self.sessions.update(origin, entry.context)
+            entry.context.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """关闭当前线程的 context（与 BrowserPool.close 一样需在各自线程调用）"""
+        for origin, entry in self._contexts().items():
+            self._close_context(entry, origin)
+        self._contexts().clear()
+
+    def get_stats(self) -> Dict:
+        return self.stats.to_dict()
+
+    def summary(self) -> str:
+        return self.stats.summary()
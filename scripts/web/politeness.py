@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+按主机的礼貌调度
+位于 frontier 和抓取 worker 之间，全局并发可以开大，单个主机仍然受控
+
+- 每个主机的并发上限
+- 每个主机一个令牌桶限制请求速率
+- 遵守 robots.txt 的 Crawl-delay / Request-rate
+- 429/503 自动退避（优先使用 Retry-After），同时把该主机的速率减半，成功后逐步恢复
+"""
+
+import asyncio
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager, asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from typing import Dict, Optional
+
+
+# ============ 配置 ============
+
+DEFAULT_RATE = 0.0  # 每个主机每秒请求数，0 表示不限速（限速需显式开启）
+DEFAULT_BURST = 3  # 令牌桶容量
+DEFAULT_HOST_CONCURRENCY = 3  # 每个主机同时在途的请求数（命令行默认与全局并发 -c 相同）
+
+BACKOFF_STATUSES = {429, 503}
+BACKOFF_BASE = 5  # 无 Retry-After 时的初始退避秒数，连续触发翻倍
+MAX_BACKOFF = 300
+MIN_RATE = 0.1  # 退避后速率下限（每秒）
+RECOVERY_STEP = 0.1  # 每次成功恢复目标速率的比例
+UNLIMITED_RECOVERY_RATE = 10.0  # 不限速的主机被限流后，恢复到这个速率即重新放开
+
+ROBOTS_TIMEOUT = 10
+POLL_INTERVAL = 0.05  # 异步等待并发名额时的轮询间隔
+USER_AGENT = 'Mozilla/5.0 (compatible; AI-Assistant-Crawler)'
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 可以是秒数或 HTTP 日期"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """令牌桶（调用方负责加锁）"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """取一个令牌；取到返回 0，否则返回还需等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _HostState:
+    """单个主机的调度状态"""
+
+    def __init__(self, rate: float, burst: float, limit: int):
+        self.target_rate = rate
+        self.bucket = TokenBucket(rate, burst)
+        self.limit = max(1, limit)
+        self.active = 0
+        self.blocked_until = 0.0
+        self.strikes = 0  # 连续 429/503 次数
+
+
+class PolitenessScheduler:
+    """按主机限速、限并发的调度器，线程和协程都可使用"""
+
+    def __init__(self,
+                 rate: float = DEFAULT_RATE,
+                 burst: float = DEFAULT_BURST,
+                 host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+                 respect_robots: bool = True,
+                 user_agent: str = USER_AGENT):
+        self.rate = rate
+        self.burst = burst
+        self.host_concurrency = host_concurrency
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._hosts: Dict[str, _HostState] = {}
+        self._robots: Dict[str, Optional[float]] = {}  # 主机 -> robots 要求的最小间隔（秒）
+        self._robots_locks: Dict[str, threading.Lock] = {}  # 同一主机的 robots.txt 只取一次
+
+        self.stats = {'requests': 0, 'waited_seconds': 0.0, 'backoffs': 0}
+
+    # ---------- robots.txt ----------
+
+    def _robots_interval(self, url: str) -> Optional[float]:
+        """读取 robots.txt 的 Crawl-delay / Request-rate，换算成请求间隔（阻塞，按主机缓存）"""
+        host = host_of(url)
+        if not self.respect_robots or host in self._robots:
+            return self._robots.get(host)
+
+        with self._lock:
+            fetch_lock = self._robots_locks.setdefault(host, threading.Lock())
+        with fetch_lock:
+            if host in self._robots:
+                return self._robots[host]
+            return self._fetch_robots(url, host)
+
+    def _fetch_robots(self, url: str, host: str) -> Optional[float]:
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        interval = None
+        try:
+            request = urllib.request.Request(robots_url, headers={'User-Agent': self.user_agent})
+            with urllib.request.urlopen(request, timeout=ROBOTS_TIMEOUT) as response:
+                lines = response.read().decode('utf-8', errors='replace').splitlines()
+            parser = RobotFileParser()
+            parser.parse(lines)
+            parser.modified()  # 不调用的话 crawl_delay() 始终返回 None
+            delay = parser.crawl_delay(self.user_agent)
+            request_rate = parser.request_rate(self.user_agent)
+            if delay:
+                interval = float(delay)
+            if request_rate and request_rate.requests:
+                interval = max(interval or 0.0, request_rate.seconds / request_rate.requests)
+        except (urllib.error.URLError, OSError, ValueError):
+            pass
+
+        with self._lock:
+            self._robots[host] = interval
+        if interval:
+            print(f"robots.txt: {host} 要求请求间隔 {interval:g} 秒")
+        return interval
+
+    # ---------- 名额 ----------
+
+    def _state(self, host: str) -> _HostState:
+        """取主机状态（调用方已持锁）"""
+        state = self._hosts.get(host)
+        if state is None:
+            rate, burst = self.rate, self.burst
+            interval = self._robots.get(host)
+            if interval:
+                robots_rate = 1.0 / interval
+                rate = min(rate, robots_rate) if rate > 0 else robots_rate
+                burst = 1
+            state = _HostState(rate, burst, self.host_concurrency)
+            self._hosts[host] = state
+        return state
+
+    def _try_acquire(self, host: str) -> float:
+        """尝试占用名额（调用方已持锁）；成功返回 0，否则返回建议等待秒数"""
+        state = self._state(host)
+        now = time.monotonic()
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        if state.active >= state.limit:
+            return POLL_INTERVAL
+        wait = state.bucket.take(now)
+        if wait == 0:
+            state.active += 1
+            self.stats['requests'] += 1
+        return wait
+
+    def _release(self, host: str):
+        with self._lock:
+            self._hosts[host].active -= 1
+            self._released.notify_all()
+
+    @contextmanager
+    def slot(self, url: str):
+        """同步：等到该主机有名额再执行（用于线程池 worker）"""
+        host = host_of(url)
+        self._robots_interval(url)
+        start = time.monotonic()
+        with self._lock:
+            while True:
+                wait = self._try_acquire(host)
+                if wait == 0:
+                    break
+                self._released.wait(timeout=wait)
+            self.stats['waited_seconds'] += time.monotonic() - start
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    @asynccontextmanager
+    async def slot_async(self, url: str):
+        """异步：等到该主机有名额再执行（只挂起当前协程）"""
+        host = host_of(url)
+        await asyncio.to_thread(self._robots_interval, url)
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire(host)
+                if wait == 0:
+                    self.stats['waited_seconds'] += time.monotonic() - start
+                    break
+            await asyncio.sleep(min(wait, 1.0) if wait > POLL_INTERVAL else POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    # ---------- 反馈 ----------
+
+    def report(self, url: str, status: int, headers: Optional[Dict] = None):
+        """回报响应状态：429/503 退避并降速，成功则逐步恢复速率"""
+        host = host_of(url)
+        headers = headers or {}
+
+        with self._lock:
+            state = self._state(host)
+            if status in BACKOFF_STATUSES:
+                state.strikes += 1
+                delay = parse_retry_after(headers.get('retry-after'))
+                if delay is None:
+                    delay = BACKOFF_BASE * 2 ** (state.strikes - 1)
+                delay = min(delay, MAX_BACKOFF)
+                state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                current = state.bucket.rate if state.bucket.rate > 0 else UNLIMITED_RECOVERY_RATE
+                state.bucket.rate = max(MIN_RATE, current / 2)
+                state.bucket.tokens = min(state.bucket.tokens, 1.0)
+                self.stats['backoffs'] += 1
+                print(f"⏸ {host} 返回 {status}，暂停 {delay:.0f} 秒，"
+                      f"速率降到 {state.bucket.rate:.2f}/秒")
+            elif status < 400:
+                state.strikes = 0
+                rate = state.bucket.rate
+                if state.target_rate <= 0:
+                    if rate > 0:
+                        rate += UNLIMITED_RECOVERY_RATE * RECOVERY_STEP
+                        state.bucket.rate = 0.0 if rate >= UNLIMITED_RECOVERY_RATE else rate
+                elif rate < state.target_rate:
+                    state.bucket.rate = min(state.target_rate, rate + state.target_rate * RECOVERY_STEP)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hosts': len(self._hosts),
+                'requests': self.stats['requests'],
+                'waited_seconds': round(self.stats['waited_seconds'], 1),
+                'backoffs': self.stats['backoffs'],
+            }
+
+    def describe(self) -> str:
+        """生效的限制，启动时打印"""
+        rate = f"每主机 {self.rate:g} 次/秒" if self.rate > 0 else "不限速"
+        robots = "遵守 robots.txt 的 Crawl-delay" if self.respect_robots else "忽略 robots.txt"
+        return f"{rate}, 每主机并发 {self.host_concurrency}, {robots}"
+
+    def summary(self) -> str:
+        stats = self.get_stats()
+        return (f"{stats['hosts']} 个主机, {stats['requests']} 次请求, "
+                f"排队等待 {stats['waited_seconds']} 秒, 退避 {stats['backoffs']} 次")
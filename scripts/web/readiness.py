@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+页面就绪检测
+替代固定时长的 sleep：页面一旦稳定就返回，最长不超过给定上限
+
+判定条件（同时满足）：
+1. 网络在短窗口内空闲（networkidle，最多等 NETWORK_IDLE_WINDOW 秒）
+2. DOM 在 quiet_ms 内没有变更（MutationObserver）
+3. 正文容器的文本达到 min_chars；
+   正文一直很短的页面，DOM 静默足够久（quiet_ms * SHORT_PAGE_FACTOR）也视为就绪
+"""
+
+import time
+from typing import Dict
+
+
+# ============ 配置 ============
+
+DEFAULT_MIN_CHARS = 200  # 正文容器最少字符数
+DEFAULT_QUIET_MS = 300  # DOM 静默时长
+NETWORK_IDLE_WINDOW = 1.5  # 等待 networkidle 的短窗口（秒）
+SHORT_PAGE_FACTOR = 4
+POLL_MS = 100
+
+# 正文容器选择器（按优先级），fetch-url.py 的正文提取也使用这份列表
+CONTENT_SELECTORS = [
+    'main', 'article', '[role="main"]', '.content', '.main-content', '#content',
+    '.docs-content', '.documentation', '.prose'
+]
+
+READY_JS = """
+async ({maxWait, quietMs, minChars, selectors, shortPageFactor, pollMs}) => {
+    const start = performance.now();
+    let lastMutation = start;
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+
+    const lastResource = () => {
+        let latest = 0;
+        for (const entry of performance.getEntriesByType('resource')) {
+            latest = Math.max(latest, entry.responseEnd || entry.startTime);
+        }
+        return latest;
+    };
+
+    const textLength = () => {
+        for (const selector of selectors) {
+            const el = document.querySelector(selector);
+            if (el && (el.innerText || '').length >= minChars) return el.innerText.length;
+        }
+        return document.body ? (document.body.innerText || '').length : 0;
+    };
+
+    return await new Promise(resolve => {
+        const finish = (ready, reason, length) => {
+            observer.disconnect();
+            resolve({ready, reason, elapsed_ms: Math.round(performance.now() - start), text_length: length});
+        };
+        const tick = () => {
+            const now = performance.now();
+            const quietFor = now - Math.max(lastMutation, lastResource());
+            const length = textLength();
+            if (quietFor >= quietMs && length >= minChars) return finish(true, 'content', length);
+            if (quietFor >= quietMs * shortPageFactor) return finish(true, 'quiet', length);
+            if (now - start >= maxWait) return finish(false, 'timeout', length);
+            setTimeout(tick, pollMs);
+        };
+        tick();
+    });
+}
+"""
+
+
+def _ready_args(max_wait_ms: float, min_chars: int, quiet_ms: int) -> Dict:
+    return {
+        'maxWait': max(0, max_wait_ms),
+        'quietMs': quiet_ms,
+        'minChars': min_chars,
+        'selectors': CONTENT_SELECTORS,
+        'shortPageFactor': SHORT_PAGE_FACTOR,
+        'pollMs': POLL_MS,
+    }
+
+
+def wait_for_ready(page,
+                   max_wait: float,
+                   min_chars: int = DEFAULT_MIN_CHARS,
+                   quiet_ms: int = DEFAULT_QUIET_MS) -> Dict:
+    """
+    等待页面就绪，max_wait 为上限秒数
+    返回 {ready, reason, elapsed_ms, text_length}
+    """
+    start = time.monotonic()
+
+    try:
+        page.wait_for_load_state('networkidle', timeout=min(NETWORK_IDLE_WINDOW, max_wait) * 1000)
+    except Exception:
+        pass  # 长连接/轮询的页面永远不会 networkidle，交给 DOM 静默判断
+
+    remaining_ms = (max_wait - (time.monotonic() - start)) * 1000
+    try:
+        state = page.evaluate(READY_JS, _ready_args(remaining_ms, min_chars, quiet_ms))
+    except Exception as e:
+        return {'ready': False, 'reason': f'error: {e}',
+                'elapsed_ms': int((time.monotonic() - start) * 1000), 'text_length': 0}
+
+    state['elapsed_ms'] = int((time.monotonic() - start) * 1000)
+    return state
+
+
+async def wait_for_ready_async(page,
+                               max_wait: float,
+                               min_chars: int = DEFAULT_MIN_CHARS,
+                               quiet_ms: int = DEFAULT_QUIET_MS) -> Dict:
+    """等待页面就绪（异步版）"""
+    start = time.monotonic()
+
+    try:
+        await page.wait_for_load_state('networkidle', timeout=min(NETWORK_IDLE_WINDOW, max_wait) * 1000)
+    except Exception:
+        pass
+
+    remaining_ms = (max_wait - (time.monotonic() - start)) * 1000
+    try:
+        state = await page.evaluate(READY_JS, _ready_args(remaining_ms, min_chars, quiet_ms))
+    except Exception as e:
+        return {'ready': False, 'reason': f'error: {e}',
+                'elapsed_ms': int((time.monotonic() - start) * 1000), 'text_length': 0}
+
+    state['elapsed_ms'] = int((time.monotonic() - start) * 1000)
+    return state
@@ -8,6 +8,7 @@
 - 提取关键信息
 - 生成目录结构
 - 整理页面关系
+- 读取 JSON 或逐页 JSONL 结果；正文在正文存储中时（blob 字段）按哈希读出
 """
 
 import json
@@ -15,8 +16,12 @@ import re
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from pathlib import Path
 from urllib.parse import urlparse
 
+from blob_store import BlobStore
+from jsonl_sink import iter_jsonl
+
 
 @dataclass
 class PageSummary:
@@ -37,9 +42,14 @@ class ReportGenerator:
     def __init__(self, base_url: str = None):
         self.base_url = base_url
         self.pages: List[Dict] = []
+        self.duplicates: Dict[str, List[str]] = {}  # 规范页 URL -> 近重复页 URL
 
     def add_page(self, page_data: Dict):
-        """添加页面"""
+        """添加页面（近重复页面只记录到规范页下）"""
+        duplicate_of = page_data.get('duplicate_of')
+        if duplicate_of:
+            self.duplicates.setdefault(duplicate_of, []).append(page_data.get('url', ''))
+            return
         self.pages.append(page_data)
 
     def generate_summary(self) -> str:
@@ -59,7 +69,11 @@ class ReportGenerator:
         summary += f"- 页面总数: {total_pages}\n"
         summary += f"- 总字数: {total_words:,}\n"
         summary += f"- 代码块: {total_code}\n"
-        summary += f"- 表格: {total_tables}\n\n"
+        summary += f"- 表格: {total_tables}\n"
+        if self.duplicates:
+            collapsed = sum(len(urls) for urls in self.duplicates.values())
+            summary += f"- 近重复页面（已折叠）: {collapsed}\n"
+        summary += "\n"
 
         return summary
 
@@ -127,7 +141,10 @@ class ReportGenerator:
             page_list += f"- URL: {url}\n"
             page_list += f"- 字数: {word_count:,}\n"
             page_list += f"- 代码块: {code_blocks}\n"
-            page_list += f"- 摘要: {summary}...\n\n"
+            page_list += f"- 摘要: {summary}...\n"
+            if url in self.duplicates:
+                page_list += f"- 相同内容: {', '.join(self.duplicates[url])}\n"
+            page_list += "\n"
 
         return page_list
 
@@ -251,22 +268,29 @@ class ReportGenerator:
             'generated_at': datetime.now().isoformat(),
             'stats': {
                 'total_pages': len(self.pages),
+                'duplicates_collapsed': sum(len(urls) for urls in self.duplicates.values()),
                 'total_words': sum(p.get('word_count', 0) for p in self.pages),
                 'total_code_blocks': sum(p.get('code_blocks', 0) for p in self.pages),
             },
-            'pages': self.pages
+            'pages': self.pages,
+            'duplicates': self.duplicates
         }
 
 
-def generate_from_crawl_results(results_file: str, output_file: str = None) -> str:
-    """从爬取结果生成报告"""
-    # 加载结果
-    with open(results_file, 'r') as f:
-        data = json.load(f)
+def generate_from_crawl_results(results_file: str, output_file: str = None,
+                                blobs: BlobStore = None) -> str:
+    """从爬取结果生成报告（blobs 为 --blob-store 爬取时的正文存储）"""
+    # 加载结果：逐页 JSONL（站点爬取、批量爬取的流式输出）或 JSON
+    if '.jsonl' in Path(results_file).name:
+        data = list(iter_jsonl(results_file))
+    else:
+        with open(results_file, 'r') as f:
+            data = json.load(f)
 
     # 如果是列表格式
     if isinstance(data, list):
         pages = data
+        base_url = ''
     elif isinstance(data, dict) and 'pages' in data:
         pages = data['pages']
         base_url = data.get('base_url', '')
@@ -280,18 +304,19 @@ def generate_from_crawl_results(results_file: str, output_file: str = None) -> s
     # 添加页面
     for page in pages:
         if isinstance(page, dict):
-            result = page.get('result', {})
+            # 批量爬取的条目把页面放在 result 中，站点爬取的记录本身就是页面
+            result = page.get('result', page)
 
             # 提取标题
             title = result.get('title', 'Untitled')
 
             # 提取内容
-            content = result.get('content', '')
+            content = blobs.text(result) if blobs is not None else result.get('content', '')
 
             # 基本统计
             word_count = len(content)
-            code_blocks = content.count('```')
-            links = len(result.get('links', []))
+            code_blocks_detail = result.get('code_blocks', [])
+            links = result.get('links_count', len(result.get('links', [])))
 
             # 简单摘要
             summary = ' '.join(content.split()[:50])
@@ -301,12 +326,15 @@ def generate_from_crawl_results(results_file: str, output_file: str = None) -> s
                 'title': title,
                 'content': content,
                 'word_count': word_count,
-                'code_blocks': code_blocks // 2,  # 每个代码块有两个 ```
+                # 页面提取时已返回代码块；旧结果退回按 ``` 计数（每个代码块有两个）
+                'code_blocks': len(code_blocks_detail) or content.count('```') // 2,
+                'code_blocks_detail': code_blocks_detail,
                 'tables': 0,
                 'links': links,
                 'summary': summary,
-                'headings': [],  # 可以进一步解析
+                'headings': result.get('headings', []),
                 'apis': [],  # 可以进一步解析
+                'duplicate_of': page.get('duplicate_of') or result.get('duplicate_of'),
             })
 
     # 生成报告
@@ -325,12 +353,15 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description='报告生成器')
-    parser.add_argument('results', help='爬取结果文件 (JSON)')
+    parser.add_argument('results', help='爬取结果文件 (JSON 或 JSONL)')
     parser.add_argument('-o', '--output', help='输出文件')
+    parser.add_argument('--blob-store', metavar='DIR',
+                        help='爬取时的 --blob-store 目录，结果中只有正文哈希时从这里读出')
 
     args = parser.parse_args()
 
-    report = generate_from_crawl_results(args.results, args.output)
+    blobs = BlobStore(args.blob_store) if args.blob_store else None
+    report = generate_from_crawl_results(args.results, args.output, blobs)
 
     if not args.output:
         print(report)
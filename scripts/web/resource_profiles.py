@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+资源拦截配置
+在创建 context（或 page）时按配置拦截不需要的请求，减少带宽和加载时间
+
+- text-only: 拦截图片、媒体、字体、样式表，以及统计/广告域名（纯文本提取）
+- render:    保留 CSS，拦截图片、媒体、字体和统计/广告域名（需要布局/样式时）
+- full:      不拦截（调试、截图、样式检查）
+
+注意：Playwright 开启路由后浏览器 HTTP 缓存会被禁用，full 配置不安装路由。
+"""
+
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+from typing import Dict, Optional
+
+
+# ============ 配置 ============
+
+DEFAULT_PROFILE = 'text-only'
+
+PROFILES = {
+    'text-only': {
+        'resource_types': {'image', 'media', 'font', 'stylesheet'},
+        'block_trackers': True,
+    },
+    'render': {
+        'resource_types': {'image', 'media', 'font'},
+        'block_trackers': True,
+    },
+    'full': {
+        'resource_types': set(),
+        'block_trackers': False,
+    },
+}
+
+# 统计/广告域名（匹配自身及子域名）
+TRACKER_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'googlesyndication.com', 'googleadservices.com', 'adservice.google.com',
+    'facebook.net', 'connect.facebook.net', 'hotjar.com', 'clarity.ms',
+    'segment.io', 'segment.com', 'mixpanel.com', 'amplitude.com',
+    'fullstory.com', 'heap.io', 'intercom.io', 'plausible.io',
+    'hm.baidu.com', 'cnzz.com', 'scorecardresearch.com', 'quantserve.com',
+)
+
+# 被拦截请求的体积估算（字节），请求未发出无法得知真实大小
+ESTIMATED_BYTES = {
+    'image': 40 * 1024,
+    'media': 500 * 1024,
+    'font': 30 * 1024,
+    'stylesheet': 20 * 1024,
+    'script': 30 * 1024,
+}
+DEFAULT_ESTIMATED_BYTES = 5 * 1024
+
+
+class ResourceStats:
+    """拦截统计（多个 context / 线程共享）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.blocked = 0
+        self.allowed = 0
+        self.saved_bytes = 0  # 估算值
+        self.blocked_by_type: Counter = Counter()
+
+    def record(self, resource_type: str, blocked: bool):
+        with self._lock:
+            if blocked:
+                self.blocked += 1
+                self.blocked_by_type[resource_type] += 1
+                self.saved_bytes += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+            else:
+                self.allowed += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            'blocked_requests': self.blocked,
+            'allowed_requests': self.allowed,
+            'saved_bytes_estimate': self.saved_bytes,
+            'blocked_by_type': dict(self.blocked_by_type),
+        }
+
+    def merge(self, data: Dict):
+        """累加另一份统计（to_dict 的结果，如分片工作进程回报的）"""
+        with self._lock:
+            self.blocked += data.get('blocked_requests', 0)
+            self.allowed += data.get('allowed_requests', 0)
+            self.saved_bytes += data.get('saved_bytes_estimate', 0)
+            self.blocked_by_type.update(data.get('blocked_by_type', {}))
+
+    def summary(self) -> str:
+        return (f"拦截请求 {self.blocked} 个（放行 {self.allowed} 个），"
+                f"估算节省 {self.saved_bytes / 1024 / 1024:.1f} MB")
+
+
+def is_tracker(url: str) -> bool:
+    """是否为统计/广告域名"""
+    host = urlparse(url).hostname or ''
+    return any(host == h or host.endswith('.' + h) for h in TRACKER_HOSTS)
+
+
+def should_block(profile: str, resource_type: str, url: str) -> bool:
+    """按配置判断是否拦截该请求"""
+    rules = PROFILES[profile]
+    if resource_type in rules['resource_types']:
+        return True
+    return rules['block_trackers'] and is_tracker(url)
+
+
+def _check_profile(profile: str):
+    if profile not in PROFILES:
+        raise ValueError(f"未知的资源配置: {profile}（可选: {', '.join(PROFILES)}）")
+
+
+def apply_resource_profile(target, profile: str = DEFAULT_PROFILE,
+                           stats: Optional[ResourceStats] = None):
+    """给 context 或 page 安装拦截路由（同步 API）"""
+    _check_profile(profile)
+    if profile == 'full':
+        return
+
+    def handler(route):
+        request = route.request
+        blocked = should_block(profile, request.resource_type, request.url)
+        if stats is not None:
+            stats.record(request.resource_type, blocked)
+        if blocked:
+            route.abort()
+        else:
+            route.continue_()
+
+    target.route('**/*', handler)
+
+
+async def apply_resource_profile_async(target, profile: str = DEFAULT_PROFILE,
+                                       stats: Optional[ResourceStats] = None):
+    """给 context 或 page 安装拦截路由（异步 API）"""
+    _check_profile(profile)
+    if profile == 'full':
+        return
+
+    async def handler(route):
+        request = route.request
+        blocked = should_block(profile, request.resource_type, request.url)
+        if stats is not None:
+            stats.record(request.resource_type, blocked)
+        if blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await target.route('**/*', handler)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+重试策略与熔断
+把每次获取失败归到一种结果（HTTP 状态类别、超时、DNS、导航错误、正文为空……），
+按结果决定是否重试、等多久；同一主机连续失败时熔断，不再继续请求
+
+- 404/410、其他 4xx、DNS 失败不重试：再试一次结果也一样
+- 429/5xx、超时、连接错误按指数退避重试，延迟加全抖动（0 ~ 上限之间均匀取值），避免同时重试
+- 有 Retry-After 时至少等到它给出的时间
+- 熔断器：某主机连续 threshold 次主机级失败（超时、DNS、连接错误、5xx）后打开，
+  冷却期内该主机的请求直接判失败；冷却结束放行一个探测请求，成功即关闭
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+from typing import Dict, Optional
+
+
+# ============ 配置 ============
+
+OK = 'ok'
+NOT_FOUND = 'not_found'  # 404 / 410
+CLIENT_ERROR = 'client_error'  # 其他 4xx
+RATE_LIMITED = 'rate_limited'  # 429
+SERVER_ERROR = 'server_error'  # 5xx
+TIMEOUT = 'timeout'
+DNS = 'dns'
+NAVIGATION = 'navigation'  # 连接被拒/重置、TLS 等导航错误
+EMPTY = 'empty'  # 正文过短
+CIRCUIT_OPEN = 'circuit_open'  # 熔断中，未发请求
+ERROR = 'error'  # 其他异常（浏览器崩溃等）
+
+# 结果 -> (最多重试次数, 退避基数秒, 退避上限秒)
+DEFAULT_RULES = {
+    NOT_FOUND: (0, 0, 0),
+    CLIENT_ERROR: (0, 0, 0),
+    DNS: (0, 0, 0),
+    CIRCUIT_OPEN: (0, 0, 0),
+    EMPTY: (1, 1.0, 2.0),  # 可能只是渲染慢，再给一次机会
+    TIMEOUT: (1, 2.0, 8.0),
+    RATE_LIMITED: (3, 5.0, 60.0),
+    SERVER_ERROR: (2, 1.0, 10.0),
+    NAVIGATION: (2, 1.0, 8.0),
+    ERROR: (2, 1.0, 8.0),
+}
+
+# 说明主机本身有问题的结果（计入熔断）；404、正文为空等只是单个页面的问题
+HOST_FAILURES = {SERVER_ERROR, TIMEOUT, DNS, NAVIGATION}
+
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 60.0
+
+
+class FetchError(Exception):
+    """带结果分类的获取失败"""
+
+    def __init__(self, outcome: str, message: str = '', status: int = None,
+                 retry_after: float = None):
+        super().__init__(message or outcome)
+        self.outcome = outcome
+        self.status = status
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_exception(cls, exc: Exception) -> 'FetchError':
+        if isinstance(exc, FetchError):
+            return exc
+        # Playwright 的错误信息带多行调用日志，只保留第一行
+        return cls(classify_exception(exc), (str(exc).splitlines() or [''])[0])
+
+
+def outcome_for_status(status: int) -> str:
+    if status < 400:
+        return OK
+    if status in (404, 410):
+        return NOT_FOUND
+    if status == 429:
+        return RATE_LIMITED
+    if status >= 500:
+        return SERVER_ERROR
+    return CLIENT_ERROR
+
+
+def classify_exception(exc: Exception) -> str:
+    """Playwright / urllib 异常 → 结果分类（按异常类型和 net::ERR_* 信息）"""
+    if isinstance(exc, FetchError):
+        return exc.outcome
+    message = str(exc)
+    if 'ERR_NAME_NOT_RESOLVED' in message or 'ERR_NAME_RESOLUTION_FAILED' in message:
+        return DNS
+    if isinstance(exc, TimeoutError) or type(exc).__name__ == 'TimeoutError' \
+            or 'ERR_TIMED_OUT' in message or 'ERR_CONNECTION_TIMED_OUT' in message:
+        return TIMEOUT
+    if 'net::ERR_' in message or isinstance(exc, ConnectionError):
+        return NAVIGATION
+    return ERROR
+
+
+class RetryPolicy:
+    """按结果分类决定是否重试和退避时长"""
+
+    def __init__(self, max_attempts: int = 3, rules: Dict[str, tuple] = None,
+                 jitter: bool = True, rng: random.Random = None):
+        self.max_attempts = max(1, max_attempts)  # 总尝试次数上限（含第一次）
+        self.rules = dict(DEFAULT_RULES)
+        self.rules.update(rules or {})
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    def should_retry(self, outcome: str, attempt: int) -> bool:
+        """attempt 为已经重试过的次数"""
+        retries = self.rules.get(outcome, self.rules[ERROR])[0]
+        return attempt < retries and attempt + 1 < self.max_attempts
+
+    def delay(self, outcome: str, attempt: int, retry_after: float = None) -> float:
+        """第 attempt 次重试前的等待秒数：min(上限, 基数 * 2^attempt)，全抖动"""
+        _, base, cap = self.rules.get(outcome, self.rules[ERROR])
+        ceiling = min(cap, base * 2 ** attempt)
+        if self.jitter:
+            with self._lock:
+                ceiling = self._rng.uniform(0, ceiling)
+        if retry_after is not None:
+            ceiling = max(ceiling, min(retry_after, cap))
+        return ceiling
+
+
+class _Circuit:
+    def __init__(self):
+        self.failures = 0  # 连续主机级失败次数
+        self.opened_at: Optional[float] = None
+        self.probing = False  # 半开：已放行一个探测请求
+
+
+class CircuitBreaker:
+    """按主机的熔断器（线程和协程都可使用）"""
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD,
+                 cooldown: float = DEFAULT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _Circuit] = {}
+        self.stats = {'opened': 0, 'rejected': 0}
+
+    def allow(self, url: str) -> bool:
+        """该主机当前是否可以请求"""
+        host = urlparse(url).netloc
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is None or circuit.opened_at is None:
+                return True
+            if time.monotonic() - circuit.opened_at >= self.cooldown and not circuit.probing:
+                circuit.probing = True
+                return True
+            self.stats['rejected'] += 1
+            return False
+
+    def record(self, url: str, outcome: str):
+        """登记一次请求结果"""
+        host = urlparse(url).netloc
+        with self._lock:
+            circuit = self._hosts.setdefault(host, _Circuit())
+            if outcome not in HOST_FAILURES:
+                # 成功或页面级失败都说明主机可达
+                circuit.failures = 0
+                circuit.opened_at = None
+                circuit.probing = False
+                return
+
+            circuit.failures += 1
+            if circuit.probing or (circuit.opened_at is None and circuit.failures >= self.threshold):
+                if circuit.opened_at is None:
+                    self.stats['opened'] += 1
+                    print(f"⛔ {host} 连续失败 {circuit.failures} 次，熔断 {self.cooldown:.0f} 秒")
+                circuit.opened_at = time.monotonic()
+                circuit.probing = False
+
+    def is_open(self, url: str) -> bool:
+        """该主机是否处于熔断状态（只查询，不占用探测名额）"""
+        with self._lock:
+            circuit = self._hosts.get(urlparse(url).netloc)
+            return circuit is not None and circuit.opened_at is not None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, open_hosts=sum(1 for c in self._hosts.values()
+                                                   if c.opened_at is not None))
+
+    def summary(self) -> str:
+        stats = self.get_stats()
+        return (f"熔断 {stats['opened']} 次, 跳过请求 {stats['rejected']} 个, "
+                f"仍在熔断的主机 {stats['open_hosts']} 个")
+
+
+def summarize_outcomes(outcomes: Counter) -> str:
+    """失败原因汇总：'not_found 3, timeout 1'"""
+    return ", ".join(f"{outcome} {count}" for outcome, count in outcomes.most_common())
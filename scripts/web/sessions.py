@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+登录会话
+登录一次，把 Playwright 的 storage_state（Cookie + localStorage）按主机保存下来，
+之后每个浏览器 context 创建时直接注入，静态层请求带上同样的 Cookie，
+需要登录或有 Cookie 同意弹窗的页面不再每页重新登录/重新渲染遮罩
+
+- 每个主机一个 JSON 文件（权限 600），查找时依次尝试主机和上级域名
+- 过期判断：超过 ttl，或该主机所有持久 Cookie 都已过期
+- 过期时执行录制时登记的刷新命令（脚本化登录，把新状态写到 $SESSION_FILE），没有则提示重新录制
+- 爬取过程中服务端轮换的 Cookie 写回文件（每个主机最多每 UPDATE_INTERVAL 秒一次），会话随使用续期
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+from typing import Dict, List, Optional
+
+
+# ============ 配置 ============
+
+DEFAULT_SESSION_DIR = Path.home() / '.cache' / 'web-crawler' / 'sessions'
+UPDATE_INTERVAL = 60  # 写回轮换后的 Cookie 的最小间隔（秒）
+REFRESH_TIMEOUT = 300  # 刷新命令的超时（秒）
+
+
+def _cookie_matches(cookie: Dict, host: str, path: str, secure: bool, now: float) -> bool:
+    domain = cookie.get('domain', '').lstrip('.')
+    if host != domain and not host.endswith('.' + domain):
+        return False
+    if not path.startswith(cookie.get('path') or '/'):
+        return False
+    if cookie.get('secure') and not secure:
+        return False
+    expires = cookie.get('expires', -1)
+    return expires is None or expires < 0 or expires > now
+
+
+class SessionStore:
+    """按主机保存的登录会话（线程安全）"""
+
+    def __init__(self, directory: str = None, ttl: float = None):
+        self.directory = Path(directory) if directory else DEFAULT_SESSION_DIR
+        self.ttl = ttl  # 会话最长使用时间（秒），None 则只看 Cookie 过期时间
+        self._lock = threading.Lock()
+        self._records: Dict[str, Optional[Dict]] = {}  # 主机 -> 记录（None 表示没有）
+        self._updated: Dict[str, float] = {}
+        self.stats = {'injected': 0, 'refreshed': 0, 'updated': 0, 'expired': 0}
+
+    # ---------- 存取 ----------
+
+    def path_for(self, host: str) -> Path:
+        return self.directory / f"{host.replace(':', '_')}.json"
+
+    def _load(self, host: str) -> Optional[Dict]:
+        """调用方持有锁"""
+        if host not in self._records:
+            path = self.path_for(host)
+            try:
+                self._records[host] = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._records[host] = None
+        return self._records[host]
+
+    def load(self, host: str) -> Optional[Dict]:
+        with self._lock:
+            return self._load(host)
+
+    def save(self, host: str, state: Dict, login_url: str = None, refresh_cmd: str = None):
+        """保存会话；未给出的 login_url / refresh_cmd 沿用原记录"""
+        with self._lock:
+            self._save(host, state, login_url, refresh_cmd)
+
+    def _save(self, host: str, state: Dict, login_url: str = None, refresh_cmd: str = None):
+        previous = self._load(host) or {}
+        record = {
+            'host': host,
+            'saved_at': time.time(),
+            'login_url': login_url or previous.get('login_url'),
+            'refresh_cmd': refresh_cmd or previous.get('refresh_cmd'),
+            'state': state,
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(host)
+        tmp = path.with_suffix('.tmp')
+        # 会话等同于登录凭据，只允许本人读写
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        self._records[host] = record
+
+    def remove(self, host: str) -> bool:
+        with self._lock:
+            self._records.pop(host, None)
+            try:
+                self.path_for(host).unlink()
+                return True
+            except FileNotFoundError:
+                return False
+
+    def list(self) -> List[Dict]:
+        """所有会话的概要"""
+        sessions = []
+        for path in sorted(self.directory.glob('*.json')):
+            try:
+                record = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            sessions.append({
+                'host': record['host'],
+                'saved_at': record['saved_at'],
+                'cookies': len(record['state'].get('cookies', [])),
+                'origins': len(record['state'].get('origins', [])),
+                'expired': self.is_expired(record),
+                'refresh_cmd': record.get('refresh_cmd'),
+            })
+        return sessions
+
+    # ---------- 查找与过期 ----------
+
+    def _host_for(self, url: str) -> Optional[str]:
+        """有会话的主机：URL 的主机或其上级域名（调用方持有锁）"""
+        host = urlparse(url).netloc
+        parts = host.split('.')
+        for i in range(max(1, len(parts) - 1)):
+            candidate = '.'.join(parts[i:])
+            if self._load(candidate) is not None:
+                return candidate
+        return None
+
+    def is_expired(self, record: Dict) -> bool:
+        if self.ttl is not None and time.time() - record['saved_at'] > self.ttl:
+            return True
+        persistent = [c.get('expires', -1) for c in record['state'].get('cookies', [])
+                      if c.get('expires', -1) is not None and c.get('expires', -1) > 0]
+        return bool(persistent) and max(persistent) <= time.time()
+
+    def _refresh(self, host: str, record: Dict) -> Optional[Dict]:
+        """执行刷新命令，成功返回新记录（调用方持有锁）"""
+        command = record.get('refresh_cmd')
+        if not command:
+            print(f"⚠ {host} 的登录会话已过期，请重新录制: browser-session.py record {record.get('login_url') or host}")
+            return None
+
+        print(f"🔑 {host} 的登录会话已过期，执行刷新命令...")
+        path = self.path_for(host)
+        fresh = path.with_suffix('.refresh.json')
+        env = dict(os.environ, SESSION_HOST=host, SESSION_FILE=str(fresh))
+        try:
+            subprocess.run(command, shell=True, env=env, check=True, timeout=REFRESH_TIMEOUT)
+            state = json.loads(fresh.read_text(encoding='utf-8'))
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            print(f"⚠ 刷新 {host} 的会话失败: {e}")
+            return None
+        finally:
+            fresh.unlink(missing_ok=True)
+
+        self._save(host, state)
+        self.stats['refreshed'] += 1
+        return self._records[host]
+
+    def state_for(self, url: str) -> Optional[Dict]:
+        """URL 对应的 storage_state；没有会话或已过期且刷新失败时返回 None"""
+        with self._lock:
+            host = self._host_for(url)
+            if host is None:
+                return None
+            record = self._records[host]
+            if self.is_expired(record):
+                self.stats['expired'] += 1
+                record = self._refresh(host, record)
+                if record is None:
+                    self._records[host] = None  # 本次运行不再尝试
+                    return None
+            self.stats['injected'] += 1
+            return record['state']
+
+    # ---------- 注入 ----------
+
+    def context_options(self, url: str) -> Dict:
+        """browser.new_context(**options) 的参数"""
+        state = self.state_for(url)
+        return {'storage_state': state} if state else {}
+
+    def cookie_header(self, url: str) -> Optional[str]:
+        """静态层请求用的 Cookie 头"""
+        state = self.state_for(url)
+        if not state:
+            return None
+        parsed = urlparse(url)
+        now = time.time()
+        cookies = [f"{c['name']}={c['value']}" for c in state.get('cookies', [])
+                   if _cookie_matches(c, parsed.hostname or '', parsed.path or '/',
+                                      parsed.scheme == 'https', now)]
+        return '; '.join(cookies) or None
+
+    def headers(self, url: str) -> Dict:
+        cookie = self.cookie_header(url)
+        return {'Cookie': cookie} if cookie else {}
+
+    # ---------- 写回 ----------
+
+    def _due(self, url: str) -> Optional[str]:
+        """该 URL 的会话是否到了写回时间，是则返回主机"""
+        with self._lock:
+            host = self._host_for(url)
+            if host is None or time.time() - self._updated.get(host, 0) < UPDATE_INTERVAL:
+                return None
+            self._updated[host] = time.time()
+            return host
+
+    def _store_update(self, host: str, state: Dict):
+        with self._lock:
+            record = self._records.get(host)
+            if record is None or record['state'].get('cookies') == state.get('cookies'):
+                return
+            self._save(host, state)
+            self.stats['updated'] += 1
+
+    def update(self, url: str, context):
+        """把 context 当前的状态写回（服务端轮换的 Cookie）"""
+        host = self._due(url)
+        if host is None:
+            return
+        try:
+            state = context.storage_state()
+        except Exception:
+            return
+        self._store_update(host, state)
+
+    async def update_async(self, url: str, context):
+        """update 的异步版"""
+        host = self._due(url)
+        if host is None:
+            return
+        try:
+            state = await context.storage_state()
+        except Exception:
+            return
+        self._store_update(host, state)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def summary(self) -> str:
+        stats = self.get_stats()
+        return (f"注入 {stats['injected']} 次, 过期 {stats['expired']} 次, "
+                f"刷新 {stats['refreshed']} 次, 写回 {stats['updated']} 次")
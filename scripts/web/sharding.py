@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+多进程分片爬取
+协调进程持有 frontier、已访问集合、近重复索引、状态存储和输出（唯一的写入方），
+工作进程各自运行事件循环和浏览器池，只负责获取、正文/链接提取和 SimHash 计算，
+结果经队列回到协调进程，一个 Python 进程不再被 GIL 限制在一个核上
+
+- 按 URL 哈希分片（默认）：单站点爬取时负载最均匀，每个进程分到 1/N 的主机速率和并发
+- 按主机哈希分片：同一主机的请求都在一个进程里，按主机限速/限并发保持精确（多子域站点）
+"""
+
+import asyncio
+import importlib.util
+import queue
+import sys
+import threading
+from hashlib import blake2b
+from multiprocessing import get_context
+from pathlib import Path
+from urllib.parse import urlparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from frontier import PriorityFrontier
+
+
+# ============ 配置 ============
+
+SHARD_KEYS = ('url', 'host')
+POLL_INTERVAL = 0.5  # 结果队列轮询间隔（秒），顺便检查工作进程是否存活
+JOIN_TIMEOUT = 30
+
+
+def shard_of(url: str, shards: int, by: str = 'url') -> int:
+    """URL 所属分片（稳定哈希，各进程、各次运行一致）"""
+    if shards <= 1:
+        return 0
+    key = urlparse(url).netloc if by == 'host' else url
+    digest = blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+
+def split_limits(rate: float, host_concurrency: int, shards: int, by: str) -> List[Tuple[float, int]]:
+    """
+    各工作进程的主机速率和并发
+    按 URL 分片时同一主机分散在所有进程里，总量按进程数均分（并发向下取整，余数给前几个分片，
+    各分片之和恰好等于上限）；按主机分片时不变
+    """
+    if by == 'host' or shards <= 1:
+        return [(rate, host_concurrency)] * shards
+    if host_concurrency < shards:
+        raise ValueError(f"主机并发 {host_concurrency} 小于分片数 {shards}，按 URL 分片无法均分，请按主机分片")
+    base, extra = divmod(host_concurrency, shards)
+    return [(rate / shards, base + (1 if shard < extra else 0)) for shard in range(shards)]
+
+
+class ShardedFrontier:
+    """
+    按分片拆开的 frontier：每个分片一个 PriorityFrontier，共用一个评分器
+    入队接口与 PriorityFrontier 相同，出队时指定分片
+    """
+
+    def __init__(self, shards: int, by: str = 'url', scorer=None):
+        self.shards = shards
+        self.by = by
+        self.scorer = scorer
+        self.frontiers = [PriorityFrontier(scorer) for _ in range(shards)]
+
+    def __len__(self) -> int:
+        return sum(len(f) for f in self.frontiers)
+
+    def __bool__(self) -> bool:
+        return any(self.frontiers)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.frontiers[shard_of(url, self.shards, self.by)]
+
+    def size(self, shard: int) -> int:
+        return len(self.frontiers[shard])
+
+    def push(self, url: str, depth: int, region: str = None):
+        self.frontiers[shard_of(url, self.shards, self.by)].push(url, depth, region)
+
+    def append(self, item: Tuple[str, int]):
+        self.push(item[0], item[1])
+
+    def extend(self, items: Iterable[Tuple[str, int]]):
+        for url, depth in items:
+            self.push(url, depth)
+
+    def popleft(self, shard: int = 0) -> Tuple[str, int]:
+        return self.frontiers[shard].popleft()
+
+    def rescore_all(self):
+        for frontier in self.frontiers:
+            frontier.rescore_all()
+
+
+def _run_worker(script: str, entry: str, *args):
+    """
+    工作进程入口
+    爬虫脚本带连字符，不能按模块名导入，这里按路径加载后调用其中的 entry
+    """
+    spec = importlib.util.spec_from_file_location('_shard_script', script)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['_shard_script'] = module
+    spec.loader.exec_module(module)
+    getattr(module, entry)(*args)
+
+
+class ShardPool:
+    """
+    工作进程组：每个分片一个任务队列，共用一个结果队列
+    工作进程发回的消息：
+    - ('result', task_id, result, timer, fingerprint)
+    - ('stats', shard, stats)  退出前的统计
+    """
+
+    def __init__(self, shards: int, script: str, entry: str, options: Dict):
+        self.shards = shards
+        ctx = get_context('spawn')  # 不 fork 带线程的协调进程
+        self.tasks = [ctx.Queue() for _ in range(shards)]
+        self.results = ctx.Queue()
+        self.processes = [
+            ctx.Process(target=_run_worker,
+                        args=(str(Path(script).resolve()), entry, shard, options,
+                              self.tasks[shard], self.results),
+                        daemon=True)
+            for shard in range(shards)
+        ]
+
+        self.stats: Dict[int, Dict] = {}
+        self.dead: set = set()  # 意外退出的分片，其任务直接判为失败
+        self._futures: Dict[int, Tuple[int, asyncio.Future]] = {}  # task_id -> (分片, future)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._collector: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        for process in self.processes:
+            process.start()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    async def submit(self, shard: int, url: str, timer=None):
+        """把 URL 交给分片的工作进程，返回 (result, timer, fingerprint)"""
+        future = self._loop.create_future()
+        with self._lock:
+            if shard in self.dead:
+                return None, timer, None
+            task_id = self._next_id
+            self._next_id += 1
+            self._futures[task_id] = (shard, future)
+        self.tasks[shard].put((task_id, url, timer))
+        return await future
+
+    def _resolve(self, task_id: int, value):
+        with self._lock:
+            entry = self._futures.pop(task_id, None)
+        if entry is not None:
+            future = entry[1]
+            self._loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(value))
+
+    def _collect(self):
+        """收集线程：把结果交还给事件循环；工作进程崩溃时让它的在途任务失败"""
+        while True:
+            try:
+                message = self.results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                self._reap()
+                if self._stopping and not any(p.is_alive() for p in self.processes):
+                    return
+                continue
+
+            if message[0] == 'result':
+                _, task_id, result, timer, fingerprint = message
+                self._resolve(task_id, (result, timer, fingerprint))
+            elif message[0] == 'stats':
+                self.stats[message[1]] = message[2]
+
+    def _reap(self):
+        for shard, process in enumerate(self.processes):
+            if process.is_alive() or shard in self.dead:
+                continue
+            if self._stopping and process.exitcode == 0:
+                continue
+            print(f"⚠ 分片 {shard} 的工作进程意外退出 (exit {process.exitcode})，其任务判为失败")
+            with self._lock:
+                self.dead.add(shard)
+                lost = [task_id for task_id, (s, _) in self._futures.items() if s == shard]
+            for task_id in lost:
+                self._resolve(task_id, (None, None, None))
+
+    async def close(self):
+        """通知工作进程退出，等待其统计回报"""
+        self._stopping = True
+        for shard, tasks in enumerate(self.tasks):
+            if shard not in self.dead:
+                tasks.put(None)
+        await asyncio.to_thread(self._join)
+
+    def _join(self):
+        for process in self.processes:
+            process.join(JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        if self._collector is not None:
+            self._collector.join(JOIN_TIMEOUT)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Sitemap 播种
+从 robots.txt 的 Sitemap 声明和常见的 sitemap.xml 位置读取站点 URL，预先填充 frontier
+
+- 支持 sitemap index（递归展开）和 .gz 压缩的 sitemap
+- 流式解析（iterparse），大 sitemap 不整体载入内存
+- 带出每个 URL 的 lastmod
+"""
+
+import gzip
+import io
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import deque
+from urllib.parse import urlparse, urljoin
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# ============ 配置 ============
+
+SITEMAP_TIMEOUT = 15
+MAX_SITEMAP_FILES = 50  # 最多读取多少个 sitemap 文件（含 index 展开）
+DEFAULT_SITEMAP_PATHS = ['/sitemap.xml', '/sitemap_index.xml']
+USER_AGENT = 'Mozilla/5.0 (compatible; AI-Assistant-Crawler)'
+
+
+def _open(url: str):
+    """打开 URL，gzip 内容自动解压（按魔数判断，不依赖扩展名和响应头）"""
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    response = urllib.request.urlopen(request, timeout=SITEMAP_TIMEOUT)
+    stream = io.BufferedReader(response)
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def sitemaps_from_robots(base_url: str) -> List[str]:
+    """robots.txt 中声明的 Sitemap 地址"""
+    parsed = urlparse(base_url)
+    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+    sitemaps = []
+    try:
+        with _open(robots_url) as f:
+            for line in io.TextIOWrapper(f, encoding='utf-8', errors='replace'):
+                key, _, value = line.partition(':')
+                if key.strip().lower() == 'sitemap' and value.strip():
+                    sitemaps.append(urljoin(robots_url, value.strip()))
+    except (urllib.error.URLError, OSError, ValueError):
+        pass
+    return sitemaps
+
+
+def _local(tag: str) -> str:
+    """去掉命名空间：{http://www.sitemaps.org/...}loc -> loc"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_sitemap(url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    流式解析单个 sitemap 文件
+    产出 (kind, loc, lastmod)，kind 为 'url'（页面）或 'sitemap'（index 中的子 sitemap）
+    """
+    with _open(url) as f:
+        root = None
+        loc = lastmod = None
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+
+            tag = _local(elem.tag)
+            if tag == 'loc':
+                loc = (elem.text or '').strip()
+            elif tag == 'lastmod':
+                lastmod = (elem.text or '').strip() or None
+            elif tag in ('url', 'sitemap'):
+                if loc:
+                    yield tag, loc, lastmod
+                loc = lastmod = None
+                root.clear()  # 释放已处理的条目
+
+
+def seed_urls(base_url: str,
+              limit: int,
+              in_scope: Callable[[str], bool] = None,
+              sitemap_urls: List[str] = None) -> List[Dict]:
+    """
+    收集站点 URL：robots.txt 声明的 sitemap，没有则尝试常见位置
+    返回 [{url, lastmod}]，按 sitemap 中的顺序去重，最多 limit 个
+    """
+    if sitemap_urls is None:
+        sitemap_urls = sitemaps_from_robots(base_url)
+    if not sitemap_urls:
+        sitemap_urls = [urljoin(base_url, path) for path in DEFAULT_SITEMAP_PATHS]
+
+    queue = deque(sitemap_urls)
+    read: set = set()
+    seen: set = set()
+    entries: List[Dict] = []
+
+    while queue and len(read) < MAX_SITEMAP_FILES and len(entries) < limit:
+        sitemap_url = queue.popleft()
+        if sitemap_url in read:
+            continue
+        read.add(sitemap_url)
+
+        count = children = 0
+        try:
+            for kind, loc, lastmod in iter_sitemap(sitemap_url):
+                if kind == 'sitemap':
+                    queue.append(urljoin(sitemap_url, loc))
+                    children += 1
+                    continue
+                if loc in seen or (in_scope is not None and not in_scope(loc)):
+                    continue
+                seen.add(loc)
+                entries.append({'url': loc, 'lastmod': lastmod})
+                count += 1
+                if len(entries) >= limit:
+                    break
+        except urllib.error.HTTPError as e:
+            if e.code != 404:  # 常见位置猜测不中很正常，不提示
+                print(f"sitemap 读取失败: {sitemap_url} (HTTP {e.code})")
+            continue
+        except (urllib.error.URLError, OSError, ET.ParseError, EOFError) as e:
+            print(f"sitemap 读取失败: {sitemap_url} ({e})")
+            continue
+
+        if children:
+            print(f"sitemap index: {sitemap_url} → {children} 个子 sitemap")
+        else:
+            print(f"sitemap: {sitemap_url} → {count} 个 URL")
+
+    return entries
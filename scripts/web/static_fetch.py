@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+静态抓取
+服务端渲染的文档站直接 HTTP GET + HTML 解析就能拿到正文，无需启动浏览器
+
+- 按 readiness.CONTENT_SELECTORS（浏览器层正文提取同一份列表）的顺序挑选正文容器
+- 正文过短或页面像 JS 外壳（空挂载点、noscript 提示）时返回 None，由调用方升级到浏览器
+"""
+
+import re
+import urllib.request
+import urllib.error
+from html import unescape
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from typing import Callable, Dict, List, Optional, Tuple
+
+from readiness import CONTENT_SELECTORS
+
+
+# ============ 配置 ============
+
+STATIC_TIMEOUT = 15  # HTTP 超时（秒）
+STATIC_MIN_CONTENT = 500  # 静态正文至少这么长才采用（与 extract_main_content 的阈值一致）
+MAX_HTML_BYTES = 5 * 1024 * 1024
+USER_AGENT = 'Mozilla/5.0 (compatible; AI-Assistant-Crawler)'
+
+SELECTOR_ATTR_RE = re.compile(r'^\[([\w-]+)="([^"]*)"\]$')
+
+
+def _candidate(selector: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """简单选择器 → (标签, 属性, 值)：main / .class / #id / [attr="value"]"""
+    if selector.startswith('.'):
+        return None, 'class', selector[1:]
+    if selector.startswith('#'):
+        return None, 'id', selector[1:]
+    match = SELECTOR_ATTR_RE.match(selector)
+    if match:
+        return None, match.group(1), match.group(2)
+    return selector, None, None
+
+
+# 与浏览器层相同的正文容器及优先级
+CONTENT_CANDIDATES = [_candidate(selector) for selector in CONTENT_SELECTORS]
+
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head'}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+             'link', 'meta', 'source', 'track', 'wbr'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+NAV_TAGS = {'nav', 'header', 'footer', 'aside'}
+BLOCK_TAGS = {'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'nav',
+              'aside', 'li', 'ul', 'ol', 'table', 'tr', 'pre', 'blockquote',
+              'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'hr', 'dt', 'dd', 'figure'}
+
+LANGUAGE_RE = re.compile(r'(?:language|lang)-([\w+#-]+)')
+
+# JS 外壳特征
+EMPTY_MOUNT_RE = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|___gatsby)["\'][^>]*>\s*</div>', re.IGNORECASE)
+NOSCRIPT_JS_RE = re.compile(
+    r'<noscript[^>]*>[^<]*(?:enable|need|requires?)[^<]*javascript', re.IGNORECASE)
+
+
+class _ContentParser(HTMLParser):
+    """把 HTML 解析成标题、各候选容器文本、链接"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.anchors: List[Dict] = []  # {href, text, region}
+        self.base_href: Optional[str] = None
+
+        self._stack: List[tuple] = []  # (tag, 该元素开启的候选下标)
+        self._skip_depth = 0
+        self._in_title = False
+        self._buffers: Dict[int, List[str]] = {}  # 候选下标 -> 文本片段，-1 为 body
+        self._open: List[int] = []  # 当前处于其中的候选
+        self._nav_depth = 0
+        self._anchor: Optional[Dict] = None
+
+        self.headings: List[Dict] = []  # {level, text}
+        self.code_blocks: List[Dict] = []  # {language, code}
+        self._heading: Optional[Dict] = None
+        self._code: Optional[Dict] = None
+
+    def _match(self, tag: str, attrs: Dict) -> Optional[int]:
+        for i, (c_tag, c_attr, c_value) in enumerate(CONTENT_CANDIDATES):
+            if i in self._buffers:
+                continue  # 每个选择器只取第一个匹配（同 locator().first）
+            if c_tag and tag != c_tag:
+                continue
+            if c_attr == 'class':
+                if c_value not in (attrs.get('class') or '').split():
+                    continue
+            elif c_attr and attrs.get(c_attr) != c_value:
+                continue
+            return i
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == 'a' and attrs.get('href'):
+            self._anchor = {
+                'href': attrs['href'],
+                'text': '',
+                'region': 'nav' if self._nav_depth else 'body',
+            }
+            self.anchors.append(self._anchor)
+        elif tag == 'base' and attrs.get('href') and self.base_href is None:
+            self.base_href = attrs['href']
+        elif tag == 'title':
+            self._in_title = True
+        elif tag in HEADING_TAGS and self._heading is None:
+            self._heading = {'level': int(tag[1]), 'text': ''}
+        elif tag == 'pre' and self._code is None:
+            self._code = {'language': _language_of(attrs) or 'text', 'code': ''}
+        elif tag == 'code' and self._code is not None and self._code['language'] == 'text':
+            self._code['language'] = _language_of(attrs) or 'text'
+        elif tag == 'body' and -1 not in self._buffers:
+            self._buffers[-1] = []
+            self._open.append(-1)
+
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS:
+                self._write('\n')
+            return
+
+        opened = self._match(tag, attrs)
+        if opened is not None:
+            self._buffers[opened] = []
+            self._open.append(opened)
+        self._stack.append((tag, opened))
+
+        if tag in NAV_TAGS:
+            self._nav_depth += 1
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._write('\n')
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag == 'a':
+            self._anchor = None
+        elif tag in HEADING_TAGS and self._heading is not None:
+            if self._heading['text'].strip():
+                self._heading['text'] = self._heading['text'].strip()
+                self.headings.append(self._heading)
+            self._heading = None
+        elif tag == 'pre' and self._code is not None:
+            if self._code['code'].strip():
+                self.code_blocks.append(self._code)
+            self._code = None
+        if tag in VOID_TAGS:
+            return
+        # 容错：弹出到匹配的开始标签为止
+        if not any(t == tag for t, _ in self._stack):
+            return
+        while self._stack:
+            t, opened = self._stack.pop()
+            if opened is not None and opened in self._open:
+                self._open.remove(opened)
+            if t in SKIP_TAGS:
+                self._skip_depth = max(0, self._skip_depth - 1)
+            if t in NAV_TAGS:
+                self._nav_depth = max(0, self._nav_depth - 1)
+            if t == tag:
+                break
+        if tag in BLOCK_TAGS:
+            self._write('\n')
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth:
+            return
+        if self._heading is not None:
+            self._heading['text'] += data
+        if self._code is not None:
+            self._code['code'] += data
+        if self._anchor is not None and data.strip() and len(self._anchor['text']) < 200:
+            self._anchor['text'] = (self._anchor['text'] + ' ' + data.strip()).strip()
+        self._write(re.sub(r'[ \t\r\f\v]+', ' ', data.replace('\n', ' ')))
+
+    def _write(self, text: str):
+        for i in self._open:
+            self._buffers[i].append(text)
+
+    def text_of(self, index: int) -> str:
+        return _clean(''.join(self._buffers.get(index, [])))
+
+    def main_text(self) -> str:
+        """按候选顺序取第一个超过阈值的容器，否则退回 body"""
+        content = ''
+        for i in range(len(CONTENT_CANDIDATES)):
+            if i in self._buffers:
+                content = self.text_of(i)
+                if len(content) > STATIC_MIN_CONTENT:
+                    return content
+        body = self.text_of(-1)
+        return body if len(body) > len(content) else content
+
+
+def _language_of(attrs: Dict) -> Optional[str]:
+    """从 class="language-xxx" / data-language 推断代码语言"""
+    match = LANGUAGE_RE.search(attrs.get('class') or '')
+    if match:
+        return match.group(1)
+    return attrs.get('data-language')
+
+
+def _clean(text: str) -> str:
+    lines = []
+    prev_empty = False
+    for line in text.split('\n'):
+        line = line.strip()
+        if line:
+            lines.append(line)
+            prev_empty = False
+        elif not prev_empty:
+            lines.append('')
+            prev_empty = True
+    return '\n'.join(lines).strip()
+
+
+def fetch_html(url: str, timeout: int = STATIC_TIMEOUT, headers: Dict = None) -> Optional[Dict]:
+    """HTTP GET 获取 HTML，非 HTML 或失败返回 None；headers 为附加请求头（如登录会话的 Cookie）"""
+    request = urllib.request.Request(url, headers={
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml',
+        **(headers or {}),
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            content_type = response.headers.get('Content-Type', '')
+            if 'html' not in content_type.lower():
+                return None
+            charset = response.headers.get_content_charset() or 'utf-8'
+            raw = response.read(MAX_HTML_BYTES)
+            return {
+                'url': response.geturl(),
+                'status': response.status,
+                'html': raw.decode(charset, errors='replace'),
+                'headers': {k.lower(): v for k, v in response.headers.items()},
+            }
+    except urllib.error.HTTPError as e:
+        headers = {k.lower(): v for k, v in e.headers.items()} if e.headers else {}
+        return {'url': url, 'status': e.code, 'html': '', 'headers': headers}
+    except Exception:
+        return None
+
+
+def parse_html(html: str, base_url: str) -> Dict:
+    """解析 HTML：标题、正文、解析成绝对地址的链接"""
+    parser = _ContentParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+
+    base = urljoin(base_url, parser.base_href) if parser.base_href else base_url
+    anchors = []
+    for anchor in parser.anchors:
+        if anchor['href'].startswith('#'):
+            continue
+        anchor['href'] = urljoin(base, anchor['href'])
+        anchors.append(anchor)
+
+    return {
+        'title': unescape(parser.title).strip(),
+        'content': parser.main_text(),
+        'anchors': anchors,
+        'headings': parser.headings,
+        'code_blocks': parser.code_blocks,
+    }
+
+
+def looks_like_js_shell(html: str, content: str) -> bool:
+    """页面是否只是等 JS 渲染的外壳"""
+    if EMPTY_MOUNT_RE.search(html):
+        return True
+    if NOSCRIPT_JS_RE.search(html) and len(content) < STATIC_MIN_CONTENT * 2:
+        return True
+    # 大量脚本、极少文本
+    scripts = html.lower().count('<script')
+    return scripts >= 10 and len(content) < len(html) * 0.01
+
+
+def fetch_static(url: str, min_content: int = STATIC_MIN_CONTENT,
+                 timeout: int = STATIC_TIMEOUT,
+                 on_response: Callable[[int, Dict], None] = None,
+                 headers: Dict = None) -> Optional[Dict]:
+    """
+    静态层抓取
+    成功返回 {url, title, content, anchors, headings, code_blocks, status, headers}；
+    需要浏览器渲染（失败、非 HTML、正文过短、JS 外壳）时返回 None
+    on_response(status, headers) 在拿到响应后回调（供限速调度器退避）
+    """
+    page = fetch_html(url, timeout, headers)
+    if page is not None and on_response is not None:
+        on_response(page['status'], page['headers'])
+    if page is None or page['status'] >= 400 or not page['html']:
+        return None
+
+    parsed = parse_html(page['html'], page['url'])
+    if len(parsed['content']) < min_content:
+        return None
+    if looks_like_js_shell(page['html'], parsed['content']):
+        return None
+
+    parsed.update({
+        'url': url,
+        'status': page['status'],
+        'headers': page['headers'],
+    })
+    return parsed
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+分阶段计时
+给每个页面记录各阶段耗时，判断慢爬取卡在网络、渲染还是浏览器往返（IPC）上
+
+阶段：
+- cache: 缓存查询（含条件重验）
+- queue: 批量爬取中等待工作线程
+- politeness: 等待主机限速/并发名额
+- acquire: 取浏览器、建 context 和 page
+- static: 静态层 HTTP GET + 解析
+- goto: 导航到 domcontentloaded（网络）
+- ready: 等待渲染就绪（渲染）
+- content / links: 正文、链接提取（浏览器往返）
+- write: 缓存、状态存储、输出写入
+
+每个页面一条 JSONL 事件；结束时按阶段、按主机汇总 p50/p95/p99，可导出 Prometheus textfile
+"""
+
+import math
+import os
+import threading
+import time
+from array import array
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from pathlib import Path
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
+
+from jsonl_sink import JSONLSink
+
+
+# ============ 配置 ============
+
+PHASES = ('cache', 'queue', 'politeness', 'acquire', 'static',
+          'goto', 'ready', 'content', 'links', 'write')
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values, q: float) -> float:
+    """最近秩百分位（输入已排序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class PageTimer:
+    """单个页面的阶段计时（同一阶段多次进入时累加，如重试）"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.host = urlparse(url).netloc
+        self.spans: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    def add(self, phase: str, ms: float):
+        self.spans[phase] = self.spans.get(phase, 0.0) + ms
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @contextmanager
+    def span(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, (time.perf_counter() - start) * 1000)
+
+
+def span(timer: Optional[PageTimer], phase: str):
+    """计时上下文；timer 为 None 时为空上下文"""
+    return timer.span(phase) if timer is not None else nullcontext()
+
+
+@contextmanager
+def timed_enter(timer: Optional[PageTimer], phase: str, cm):
+    """只计 cm 的进入耗时（等待名额、取浏览器），块内的工作不计入"""
+    start = time.perf_counter()
+    with cm as value:
+        if timer is not None:
+            timer.add(phase, (time.perf_counter() - start) * 1000)
+        yield value
+
+
+@asynccontextmanager
+async def timed_enter_async(timer: Optional[PageTimer], phase: str, cm):
+    """timed_enter 的异步版"""
+    start = time.perf_counter()
+    async with cm as value:
+        if timer is not None:
+            timer.add(phase, (time.perf_counter() - start) * 1000)
+        yield value
+
+
+class TimingRecorder:
+    """汇总页面计时：写出事件流，按阶段/主机统计百分位"""
+
+    def __init__(self, events_path: str = None):
+        self.sink = JSONLSink(events_path) if events_path else None
+        self._lock = threading.Lock()
+        self._phases: Dict[str, array] = {}
+        self._hosts: Dict[Tuple[str, str], array] = {}
+        self.pages = 0
+
+    def start(self, url: str) -> PageTimer:
+        return PageTimer(url)
+
+    def finish(self, timer: PageTimer, **fields):
+        """页面结束：记录样本并写出事件（fields 如 tier、ok）"""
+        total = timer.elapsed_ms()
+        samples = list(timer.spans.items()) + [('total', total)]
+        with self._lock:
+            self.pages += 1
+            for phase, ms in samples:
+                self._phases.setdefault(phase, array('d')).append(ms)
+                self._hosts.setdefault((timer.host, phase), array('d')).append(ms)
+
+        if self.sink is not None:
+            event = {
+                'ts': round(time.time(), 3),
+                'url': timer.url,
+                'host': timer.host,
+                'total_ms': round(total, 1),
+                'spans': {phase: round(ms, 1) for phase, ms in timer.spans.items()},
+            }
+            event.update(fields)
+            self.sink.write(event)
+
+    @staticmethod
+    def _stats(values: array) -> Dict:
+        ordered = sorted(values)
+        total = sum(ordered)
+        stats = {'count': len(ordered), 'sum_ms': round(total, 1),
+                 'mean_ms': round(total / len(ordered), 1)}
+        for q in QUANTILES:
+            stats[f'p{int(q * 100)}_ms'] = round(percentile(ordered, q), 1)
+        return stats
+
+    def _ordered_phases(self, phases) -> List[str]:
+        order = {phase: i for i, phase in enumerate(PHASES + ('total',))}
+        return sorted(phases, key=lambda p: (order.get(p, len(order)), p))
+
+    def report(self) -> Dict:
+        """{'phases': {阶段: 统计}, 'hosts': {主机: {阶段: 统计}}}"""
+        with self._lock:
+            phases = {p: self._stats(v) for p, v in self._phases.items()}
+            hosts: Dict[str, Dict] = {}
+            for (host, phase), values in self._hosts.items():
+                hosts.setdefault(host, {})[phase] = self._stats(values)
+        return {
+            'pages': self.pages,
+            'phases': {p: phases[p] for p in self._ordered_phases(phases)},
+            'hosts': hosts,
+        }
+
+    def summary(self) -> str:
+        """一行一个阶段：p50 / p95 / p99"""
+        phases = self.report()['phases']
+        if not phases:
+            return "无计时数据"
+        lines = []
+        for phase, stats in phases.items():
+            lines.append(f"  {phase:<10} n={stats['count']:<5} p50 {stats['p50_ms']:>8.1f}ms  "
+                         f"p95 {stats['p95_ms']:>8.1f}ms  p99 {stats['p99_ms']:>8.1f}ms")
+        return "\n".join(lines)
+
+    def write_prometheus(self, path: str, job: str = 'crawl'):
+        """
+        导出 Prometheus textfile（node_exporter textfile collector 格式）
+        先写临时文件再原子替换，采集端不会读到半个文件
+        """
+        report = self.report()
+        lines = []
+
+        def emit(metric: str, labels: str, stats: Dict):
+            for q in QUANTILES:
+                value = stats[f'p{int(q * 100)}_ms'] / 1000
+                lines.append(f'{metric}{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f'{metric}_sum{{{labels}}} {stats["sum_ms"] / 1000:.6f}')
+            lines.append(f'{metric}_count{{{labels}}} {stats["count"]}')
+
+        # 按主机的序列和全部主机的汇总分成两个指标：放在同一指标下 sum() 会把每次观测算两遍；
+        # 百分位不能跨主机相加，汇总仍需单独导出
+        lines.append("# HELP crawl_phase_seconds Per-page time spent in each fetch phase, by host.")
+        lines.append("# TYPE crawl_phase_seconds summary")
+        for host, phases in sorted(report['hosts'].items()):
+            for phase in self._ordered_phases(phases):
+                emit('crawl_phase_seconds', f'job="{job}",host="{_escape(host)}",phase="{phase}"',
+                     phases[phase])
+
+        lines.append("# HELP crawl_phase_seconds_all Per-page time spent in each fetch phase, all hosts.")
+        lines.append("# TYPE crawl_phase_seconds_all summary")
+        for phase, stats in report['phases'].items():
+            emit('crawl_phase_seconds_all', f'job="{job}",phase="{phase}"', stats)
+
+        lines.append("# HELP crawl_pages Pages timed in the last crawl.")
+        lines.append("# TYPE crawl_pages gauge")
+        lines.append(f'crawl_pages{{job="{job}"}} {report["pages"]}')
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text("\n".join(lines) + "\n", encoding='utf-8')
+        os.replace(tmp, path)
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -16,6 +16,8 @@ from urllib.parse import urlparse, urlunparse
 from collections import defaultdict, Counter
 from typing import List, Dict, Set, Optional
 
+from frontier import segment_template
+
 
 class URLPatternAnalyzer:
     """URL 模式分析器"""
@@ -104,20 +106,8 @@ class URLPatternAnalyzer:
         for path in paths:
             parts = [p for p in path.split('/') if p]
 
-            # 生成模式（替换变量）
-            pattern_parts = []
-            for i, part in enumerate(parts):
-                # 检查是否是数字
-                if part.isdigit():
-                    pattern_parts.append('{id}')
-                # 检查是否是日期
-                elif re.match(r'^\d{4}-\d{2}-\d{2}$', part):
-                    pattern_parts.append('{date}')
-                # 检查是否是 UUID
-                elif re.match(r'^[0-9a-f]{8}-[0-9a-f]{4}', part):
-                    pattern_parts.append('{uuid}')
-                else:
-                    pattern_parts.append(part)
+            # 生成模式（替换变量，规则与 frontier 的路径模板相同）
+            pattern_parts = [segment_template(part) for part in parts]
 
             pattern = '/' + '/'.join(pattern_parts)
             patterns.append(pattern)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+紧凑的 URL 去重集合
+百万级 URL 的爬取中，用 Python set 保存完整 URL 字符串会占用数 GB 内存
+
+- 每个 URL 只保存 64 位指纹（blake2b），放在 array('Q') 开放寻址哈希表中，约 8~16 字节/URL
+- 可选 Bloom 过滤器：放在哈希表前面快速排除新 URL；
+  也可只用 Bloom（exact=False），内存更小，误判率按配置有界
+- 64 位指纹在百万 URL 规模下碰撞概率约 1e-8，可忽略
+"""
+
+import math
+from array import array
+from hashlib import blake2b
+from typing import Dict, Iterable
+
+
+# ============ 配置 ============
+
+INITIAL_CAPACITY = 1024  # 哈希表初始槽位数（2 的幂）
+MAX_LOAD = 0.6  # 装载因子超过此值时扩容
+DEFAULT_FP_RATE = 0.001  # Bloom 过滤器目标误判率
+
+_EMPTY = 0
+
+
+def fingerprint(url: str) -> int:
+    """URL 的 64 位指纹（0 保留为空槽标记）"""
+    fp = int.from_bytes(blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+    return fp or 1
+
+
+class BloomFilter:
+    """按预期容量和误判率确定大小的 Bloom 过滤器"""
+
+    def __init__(self, capacity: int, fp_rate: float = DEFAULT_FP_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fp: int):
+        # 双重哈希：由一个 64 位指纹派生 k 个位置
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, fp: int):
+        for pos in self._positions(fp):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, fp: int) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fp))
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class URLSeen:
+    """
+    URL 去重集合，接口与 set 的 add / in / len / update 兼容
+    bloom_capacity: 预期 URL 数，指定后在哈希表前加 Bloom 过滤器
+    exact=False: 只用 Bloom（必须指定 bloom_capacity），已见过的 URL 有 fp_rate 的概率被误判为见过
+    """
+
+    def __init__(self,
+                 bloom_capacity: int = None,
+                 fp_rate: float = DEFAULT_FP_RATE,
+                 exact: bool = True):
+        if not exact and not bloom_capacity:
+            raise ValueError("exact=False 需要指定 bloom_capacity")
+        self.exact = exact
+        self.bloom = BloomFilter(bloom_capacity, fp_rate) if bloom_capacity else None
+        self._table = array('Q', bytes(8 * INITIAL_CAPACITY)) if exact else array('Q')
+        self._mask = INITIAL_CAPACITY - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _probe(self, fp: int) -> int:
+        """线性探测：返回指纹所在槽位，或应插入的空槽"""
+        i = fp & self._mask
+        table = self._table
+        while True:
+            slot = table[i]
+            if slot == fp or slot == _EMPTY:
+                return i
+            i = (i + 1) & self._mask
+
+    def __contains__(self, url: str) -> bool:
+        fp = fingerprint(url)
+        if self.bloom is not None and fp not in self.bloom:
+            return False
+        if not self.exact:
+            return True
+        return self._table[self._probe(fp)] == fp
+
+    def add(self, url: str) -> bool:
+        """加入集合，新 URL 返回 True"""
+        fp = fingerprint(url)
+        if not self.exact:
+            if fp in self.bloom:
+                return False
+            self.bloom.add(fp)
+            self._count += 1
+            return True
+
+        i = self._probe(fp)
+        if self._table[i] == fp:
+            return False
+        self._table[i] = fp
+        self._count += 1
+        if self.bloom is not None:
+            self.bloom.add(fp)
+        if self._count > len(self._table) * MAX_LOAD:
+            self._grow()
+        return True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def _grow(self):
+        old = self._table
+        self._table = array('Q', bytes(8 * len(old) * 2))
+        self._mask = len(self._table) - 1
+        for fp in old:
+            if fp != _EMPTY:
+                self._table[self._probe(fp)] = fp
+
+    def memory_bytes(self) -> int:
+        size = len(self._table) * self._table.itemsize
+        if self.bloom is not None:
+            size += self.bloom.memory_bytes()
+        return size
+
+    def stats(self) -> Dict:
+        return {
+            'urls': self._count,
+            'memory_bytes': self.memory_bytes(),
+            'bytes_per_url': round(self.memory_bytes() / self._count, 1) if self._count else 0,
+            'mode': ('exact+bloom' if self.bloom else 'exact') if self.exact else 'bloom',
+        }
@@ -0,0 +1,8 @@
+"""
+scripts/web 下的爬虫模块以平铺方式互相导入（from frontier import ...），测试同样如此
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts' / 'web'))
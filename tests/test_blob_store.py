@@ -0,0 +1,61 @@
+import pytest
+
+from blob_store import BlobStore, zstandard
+
+URL = 'https://example.com/page'
+
+
+def test_put_get_roundtrip_and_dedup(tmp_path):
+    store = BlobStore(tmp_path)
+    text = '正文 content ' * 100
+    digest = store.put(text)
+    assert store.put(text) == digest
+    assert store.get(digest) == text
+    assert store.put('') is None
+    stats = store.get_stats()
+    assert (stats['written'], stats['reused'], stats['total_blobs']) == (1, 1, 1)
+    assert stats['total_stored_bytes'] < stats['total_bytes']
+    with pytest.raises(KeyError):
+        store.get('0' * 64)
+
+
+def test_detach_replaces_content_with_blob(tmp_path):
+    store = BlobStore(tmp_path)
+    run = store.begin_run('site')
+    result = {'url': URL, 'title': 'Page', 'content': 'hello world'}
+    digest = store.detach(run, URL, result)
+    assert 'content' not in result
+    assert result['blob'] == digest
+    assert result['content_length'] == len('hello world')
+    assert store.text(result) == 'hello world'
+    assert store.text({'content': 'inline'}) == 'inline'
+
+
+def test_runs_and_carry_forward(tmp_path):
+    store = BlobStore(tmp_path)
+    first = store.begin_run('site')
+    digest = store.add(first, URL, 'v1', 'Page')
+    store.finish_run(first)
+
+    second = store.begin_run('site')
+    assert store.carry_forward(second, URL) == digest
+    assert store.carry_forward(second, 'https://example.com/new') is None
+    store.finish_run(second)
+
+    assert [r['pages'] for r in store.runs()] == [1, 1]
+    assert list(store.iter_run(second)) == [{'url': URL, 'title': 'Page', 'blob': digest}]
+    assert store.get_stats()['carried'] == 1
+
+
+def test_reopen_keeps_index(tmp_path):
+    store = BlobStore(tmp_path)
+    digest = store.put('persisted')
+    store.close()
+    assert BlobStore(tmp_path).get(digest) == 'persisted'
+
+
+@pytest.mark.skipif(zstandard is None, reason='需要 zstandard')
+def test_zstd(tmp_path):
+    store = BlobStore(tmp_path, 'zstd')
+    digest = store.put('zstd body ' * 50)
+    assert store.get(digest) == 'zstd body ' * 50
@@ -0,0 +1,57 @@
+import pytest
+
+from budget import DEADLINE, HOST_BUDGET, MIN_PAGE_BUDGET, Budget, PageDeadline
+from retry_policy import FetchError, TIMEOUT
+
+URL = 'https://example.com/page'
+
+
+def test_unlimited_budget():
+    budget = Budget()
+    assert budget.remaining() is None
+    assert not budget.expired()
+    assert budget.allow(URL) is None
+    assert budget.can_retry(URL, 1000)
+
+
+def test_deadline_expiry():
+    budget = Budget(deadline=60, reserve=0)
+    assert budget.allow(URL) is None
+    budget.started -= 60  # 时间用完
+    assert budget.expired()
+    assert budget.allow(URL) == DEADLINE
+    assert budget.allow(URL) == DEADLINE  # 同一 URL 重复出队只计一次
+    assert budget.stopped_early()
+    assert budget.get_stats()[DEADLINE] == 1
+
+
+def test_reserve_stops_dispatch_before_deadline():
+    budget = Budget(deadline=100)
+    assert budget.reserve == 5  # 5% 留给收尾
+    budget.started -= 100 - budget.reserve - MIN_PAGE_BUDGET / 2
+    assert budget.expired()
+
+
+def test_page_deadline_is_clamped_by_remaining_time():
+    budget = Budget(deadline=100, page=30, reserve=0)
+    assert budget.page_deadline(URL).seconds == 30
+    budget.started -= 90
+    assert budget.page_deadline(URL).seconds <= 10
+    assert not budget.can_retry(URL, 10)
+
+
+def test_host_budget():
+    budget = Budget(host=10)
+    budget.charge(URL, 9.5)
+    assert budget.allow(URL) == HOST_BUDGET
+    assert budget.allow('https://other.example/') is None
+    assert budget.get_stats()['hosts_exhausted'] == 1
+    assert budget.stopped_early()
+
+
+def test_page_deadline_check():
+    deadline = PageDeadline(0)
+    assert deadline.timeout_ms() >= 1
+    with pytest.raises(FetchError) as error:
+        deadline.check('navigate')
+    assert error.value.outcome == TIMEOUT
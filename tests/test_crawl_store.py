@@ -0,0 +1,71 @@
+import pytest
+
+from crawl_store import DONE, FAILED, PENDING, CrawlStore, _decode, _encode
+
+BASE = 'https://example.com'
+CONFIG = {'url': f'{BASE}/docs/', 'depth': 2}
+
+
+def test_decode_restores_links_as_set():
+    page = {'url': f'{BASE}/a', 'links': {f'{BASE}/c', f'{BASE}/b'}}
+    text = _encode(page)
+    assert '["https://example.com/b", "https://example.com/c"]' in text
+    assert _decode(text)['links'] == {f'{BASE}/b', f'{BASE}/c'}
+
+    # 批量爬取的条目：links 在 result 里
+    entry = _decode(_encode({'url': f'{BASE}/a', 'result': page}))
+    assert entry['result']['links'] == {f'{BASE}/b', f'{BASE}/c'}
+
+
+def test_resume_rejects_other_config(tmp_path):
+    store = CrawlStore(tmp_path / 'state.db')
+    store.begin(CONFIG)
+    store.add([(f'{BASE}/docs/', 0)])
+    with pytest.raises(ValueError):
+        store.begin(dict(CONFIG, depth=3), resume=True)
+    # 拒绝恢复时不动旧状态
+    assert store.pending() == [(f'{BASE}/docs/', 0)]
+    # 不恢复则清空重新开始
+    assert store.begin(dict(CONFIG, depth=3)) == {PENDING: 0, DONE: 0, FAILED: 0}
+    store.close()
+
+
+def test_resume_requeues_failed(tmp_path):
+    path = tmp_path / 'state.db'
+    store = CrawlStore(path)
+    store.begin(CONFIG)
+    store.add([(f'{BASE}/a', 0), (f'{BASE}/b', 1)])
+    store.complete(f'{BASE}/a', {'url': f'{BASE}/a', 'links': set()})
+    store.complete(f'{BASE}/b', None)
+    assert store.counts() == {PENDING: 0, DONE: 1, FAILED: 1}
+    store.close()
+
+    store = CrawlStore(path)
+    assert store.begin(CONFIG, resume=True) == {PENDING: 1, DONE: 1, FAILED: 0}
+    assert store.pending() == [(f'{BASE}/b', 1)]
+    assert store.finished() == {f'{BASE}/a'}
+    store.close()
+
+
+def test_complete_is_one_transaction(tmp_path):
+    path = tmp_path / 'state.db'
+    store = CrawlStore(path)
+    store.begin(CONFIG)
+    store.add([(f'{BASE}/a', 0)])
+    store.complete(f'{BASE}/a', {'url': f'{BASE}/a', 'links': {f'{BASE}/b'}}, [(f'{BASE}/b', 1)])
+    assert store.pending() == [(f'{BASE}/b', 1)]
+    assert [r['url'] for r in store.results()] == [f'{BASE}/a']
+
+    def broken_links():
+        yield f'{BASE}/c', 2
+        raise RuntimeError('crash while enqueuing')
+
+    # 入队途中崩溃：结果、状态和新链接都不应落盘
+    with pytest.raises(RuntimeError):
+        store.complete(f'{BASE}/b', {'url': f'{BASE}/b', 'links': set()}, broken_links())
+    store._conn.close()  # 模拟崩溃：不提交直接断开
+
+    store = CrawlStore(path)
+    assert store.counts() == {PENDING: 1, DONE: 1, FAILED: 0}
+    assert [r['url'] for r in store.results()] == [f'{BASE}/a']
+    store.close()
@@ -0,0 +1,64 @@
+import random
+
+from dedup import DuplicateIndex, collapse_duplicates, hamming, simhash
+
+WORDS = ('crawler frontier browser page fetch render extract markdown content link sitemap '
+         'robots host queue worker budget retry breaker cache store index shard token bucket').split()
+
+
+def _document(seed: int, length: int = 400) -> str:
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def test_simhash_identical_and_whitespace():
+    text = _document(1)
+    assert simhash(text) == simhash(text)
+    assert simhash(text) == simhash('  '.join(text.split()))
+
+
+def test_simhash_distance_tracks_similarity():
+    text = _document(1)
+    words = text.split()
+    words[200] = 'changed'
+    near = ' '.join(words)
+    assert hamming(simhash(text), simhash(near)) <= 8
+    assert hamming(simhash(text), simhash(_document(2))) > 16
+
+
+def test_index_flags_near_duplicate_within_threshold():
+    index = DuplicateIndex(max_distance=3)
+    text = _document(3)
+    assert index.check('https://example.com/a', text) is None
+    # 指纹相同（同一正文的不同 URL）
+    assert index.check('https://example.com/a?ref=nav', text) == 'https://example.com/a'
+    assert index.check('https://example.com/b', _document(4)) is None
+    assert index.stats() == {'pages': 3, 'duplicates': 1}
+
+
+def test_index_threshold_uses_hamming_distance():
+    index = DuplicateIndex(max_distance=3)
+    text = _document(5)
+    fp = simhash(text)
+    assert index.check('https://example.com/a', text, fp) is None
+    # 相差 3 位仍是近重复，4 位不是（给定指纹，与正文无关）
+    assert index.check('https://example.com/b', text, fp ^ 0b111) == 'https://example.com/a'
+    assert index.check('https://example.com/c', text, fp ^ (0b1111 << 40)) is None
+
+
+def test_short_content_is_ignored():
+    index = DuplicateIndex()
+    assert index.check('https://example.com/a', 'short') is None
+    assert index.check('https://example.com/b', 'short') is None
+    assert index.pages == 0
+
+
+def test_collapse_duplicates():
+    results = [
+        {'url': 'https://example.com/a'},
+        {'url': 'https://example.com/a2', 'duplicate_of': 'https://example.com/a'},
+        {'url': 'https://example.com/b'},
+    ]
+    canonical, groups = collapse_duplicates(results)
+    assert [r['url'] for r in canonical] == ['https://example.com/a', 'https://example.com/b']
+    assert groups == {'https://example.com/a': ['https://example.com/a2']}
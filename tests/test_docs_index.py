@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from docs_index import DocsIndex, build_query, segment, slugify, split_markdown, unsegment
+
+GUIDE = """---
+title: ignored
+---
+# Hooks Guide
+
+Intro paragraph.
+
+## PreToolUse
+
+Runs before a tool call. The matcher selects tools.
+
+```bash
+# not a heading
+```
+
+## 会话管理
+
+恢复之前的会话。
+"""
+
+
+def test_split_markdown():
+    title, sections = split_markdown(GUIDE, 'fallback')
+    assert title == 'Hooks Guide'
+    assert [s['heading'] for s in sections] == ['Hooks Guide', 'PreToolUse', '会话管理']
+    assert sections[1]['anchor'] == 'pretooluse'
+    assert sections[1]['line'] == 8
+    assert '# not a heading' in sections[1]['body']
+
+
+def test_query_helpers():
+    assert unsegment(segment('恢复会话 hooks')) == '恢复会话 hooks'
+    assert build_query('dialog focus*') == '"dialog" "focus"*'
+    assert slugify('Hooks & Matchers') == 'hooks--matchers'
+
+
+@pytest.fixture
+def index(tmp_path):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'hooks.md').write_text(GUIDE, encoding='utf-8')
+    (docs / 'other.md').write_text('# Other\n\nNothing about tools here.\n', encoding='utf-8')
+    crawl = tmp_path / 'crawl.jsonl'
+    crawl.write_text(json.dumps({
+        'url': 'https://example.com/docs/matcher',
+        'title': 'Matcher reference',
+        'content': 'Matcher syntax for hook events.',
+    }) + '\n', encoding='utf-8')
+    docs_index = DocsIndex(tmp_path / 'index.db')
+    docs_index.update([str(docs), str(crawl)])
+    yield docs_index, docs
+    docs_index.close()
+
+
+def test_search_ranks_sections(index):
+    docs_index, docs = index
+    results = docs_index.search('matcher')
+    assert {r['kind'] for r in results} == {'markdown', 'crawl'}
+    markdown = next(r for r in results if r['kind'] == 'markdown')
+    assert markdown['heading'] == 'PreToolUse'
+    assert markdown['location'] == f"{(docs / 'hooks.md').resolve()}:8"
+    assert docs_index.search('会话')[0]['heading'] == '会话管理'
+    assert docs_index.search('matcher', source='https://*')[0]['location'] == 'https://example.com/docs/matcher'
+
+
+def test_incremental_update_and_prune(index):
+    docs_index, docs = index
+    docs_index.update()
+    assert docs_index.stats['files_skipped'] >= 3
+
+    (docs / 'other.md').unlink()
+    (docs / 'hooks.md').write_text(GUIDE.replace('matcher', 'selector'), encoding='utf-8')
+    docs_index.update()
+    assert [r['kind'] for r in docs_index.search('matcher')] == ['crawl']
+    assert docs_index.search('selector')
+    assert docs_index.get_stats()['documents'] == {'markdown': 1, 'crawl': 1}
+
+
+def test_raw_query_errors(index):
+    docs_index, _ = index
+    with pytest.raises(ValueError):
+        docs_index.search('"unbalanced', raw=True)
@@ -0,0 +1,87 @@
+import pytest
+
+from frontier import PriorityFrontier, URLScorer, path_template, segment_template
+
+BASE = 'https://example.com'
+
+
+def test_path_template():
+    assert path_template(f'{BASE}/docs/components/button') == '/docs/components/{slug}'
+    assert path_template(f'{BASE}/blog/2024-01-02/post') == '/blog/{date}/{slug}'
+    assert path_template(f'{BASE}/issues/42') == '/issues/{id}'
+    assert path_template(f'{BASE}/docs') == '/docs'
+
+
+def test_segment_template():
+    assert [segment_template(p) for p in ('42', '2024-01-02', '0f8fad5b-d9cb-469f', 'guide')] == \
+        ['{id}', '{date}', '{uuid}', 'guide']
+
+
+def test_fifo_without_scorer():
+    frontier = PriorityFrontier()
+    frontier.extend([(f'{BASE}/a', 0), (f'{BASE}/b', 0), (f'{BASE}/c', 0)])
+    frontier.append((f'{BASE}/a', 1))  # 已在队列中，不重复入队
+    assert len(frontier) == 3
+    assert [frontier.popleft()[0] for _ in range(3)] == [f'{BASE}/a', f'{BASE}/b', f'{BASE}/c']
+
+
+def test_repush_raises_priority_and_keeps_smaller_depth():
+    frontier = PriorityFrontier(URLScorer())
+    frontier.push(f'{BASE}/x/first', 2)
+    frontier.push(f'{BASE}/y/second', 2)
+    # 再次发现：入链数增加、深度取较小值，应排到前面
+    frontier.push(f'{BASE}/y/second', 1)
+    frontier.push(f'{BASE}/y/second', 3)
+
+    assert frontier.popleft() == (f'{BASE}/y/second', 1)
+    assert frontier.popleft() == (f'{BASE}/x/first', 2)
+    assert not frontier
+
+
+def test_stale_heap_entries_are_skipped():
+    frontier = PriorityFrontier(URLScorer())
+    url = f'{BASE}/docs/page'
+    for _ in range(100):
+        frontier.push(url, 1)
+    assert len(frontier) == 1
+    assert frontier.popleft() == (url, 1)
+    with pytest.raises(IndexError):
+        frontier.popleft()
+
+
+def test_boost_low_value_and_nav():
+    scorer = URLScorer(boost=['/docs/api/*'])
+    frontier = PriorityFrontier(scorer)
+    frontier.push(f'{BASE}/blog/news', 1)
+    frontier.push(f'{BASE}/docs/guide', 1, region='nav')
+    frontier.push(f'{BASE}/docs/intro', 1, region='body')
+    frontier.push(f'{BASE}/docs/api/fetch', 1)
+    order = [frontier.popleft()[0] for _ in range(4)]
+    assert order == [f'{BASE}/docs/api/fetch', f'{BASE}/docs/intro',
+                     f'{BASE}/docs/guide', f'{BASE}/blog/news']
+
+
+def test_pop_forgets_per_url_scores():
+    scorer = URLScorer()
+    frontier = PriorityFrontier(scorer)
+    for i in range(10):
+        frontier.push(f'{BASE}/docs/page-{i}', 1, region='body')
+    assert scorer.tracked() == 10
+    while frontier:
+        frontier.popleft()
+    assert scorer.tracked() == 0
+    assert not scorer.regions
+    # 模板热度是聚合统计，保留
+    assert scorer.templates['/docs/{slug}'] == 10
+
+
+def test_rescore_all_reorders():
+    scorer = URLScorer()
+    frontier = PriorityFrontier(scorer)
+    frontier.push(f'{BASE}/a/one', 1)
+    frontier.push(f'{BASE}/b/one', 1)
+    # 模板 /b/{slug} 变热后整体重新评分
+    for i in range(8):
+        scorer.observe(f'{BASE}/b/other-{i}')
+    frontier.rescore_all()
+    assert frontier.popleft()[0] == f'{BASE}/b/one'
@@ -0,0 +1,117 @@
+import pytest
+
+from incremental import (ADDED, MODIFIED, UNCHANGED, Manifest, content_hash, lastmod_unchanged)
+
+A = 'https://example.com/a'
+B = 'https://example.com/b'
+C = 'https://example.com/c'
+CONFIG = {'base_url': 'https://example.com/'}
+
+
+def test_content_hash_ignores_whitespace():
+    assert content_hash('a  b\n c') == content_hash('a b c')
+    assert content_hash('a b c') != content_hash('a b d')
+
+
+def test_lastmod_unchanged():
+    assert lastmod_unchanged('2024-01-02', '2024-01-02T00:00:00Z')
+    assert lastmod_unchanged('2024-01-02T10:00:00+00:00', '2024-01-01')
+    assert not lastmod_unchanged('2024-01-02', '2024-01-03')
+    assert not lastmod_unchanged(None, '2024-01-03')
+    assert lastmod_unchanged('v1', 'v1')
+
+
+def test_runs_report_added_modified_removed(tmp_path):
+    path = tmp_path / 'manifest.db'
+    manifest = Manifest(path)
+    assert manifest.begin(CONFIG) == 0
+    assert manifest.record(A, 'alpha', links=[B]) == ADDED
+    assert manifest.record(B, 'beta') == ADDED
+    assert manifest.record(C, 'gamma') == ADDED
+    assert manifest.finish()['added'] == [A, B, C]
+    manifest.close()
+
+    manifest = Manifest(path)
+    assert manifest.begin(CONFIG) == 3
+    assert manifest.run == 2
+    assert manifest.record(A, 'alpha  ') == UNCHANGED
+    assert manifest.record(B, 'beta v2') == MODIFIED
+    changes = manifest.finish()
+    assert changes['modified'] == [B]
+    assert changes['removed'] == [C]
+    assert changes['unchanged'] == 1
+    assert manifest.get(C) is None
+    manifest.close()
+
+
+def test_incomplete_run_keeps_unseen_pages(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.db')
+    manifest.begin(CONFIG)
+    manifest.record(A, 'alpha')
+    manifest.record(B, 'beta')
+    manifest.finish()
+
+    manifest.begin(CONFIG)
+    manifest.touch(A)
+    changes = manifest.finish(complete=False)
+    assert changes['removed'] == []
+    assert manifest.get(B) is not None
+
+
+def test_check_by_lastmod_returns_entry_with_links(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.db')
+    manifest.begin(CONFIG)
+    manifest.record(A, 'alpha', lastmod='2024-01-02', links=[B, C])
+    manifest.finish()
+
+    manifest.begin(CONFIG)
+    entry = manifest.check(A, '2024-01-02', revalidate=False)
+    assert entry['links'] == {B, C}
+    assert manifest.check(A, '2024-02-01', revalidate=False) is None
+    assert manifest.check(B, revalidate=False) is None
+    assert manifest.finish()['unchanged'] == 1
+
+
+def test_rejects_other_scope(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.db')
+    manifest.begin(CONFIG)
+    with pytest.raises(ValueError):
+        manifest.begin({'base_url': 'https://other.example/'})
+
+
+def test_smaller_depth_is_another_scope(tmp_path):
+    # 较浅的重爬看不到更深的页面，若沿用同一清单会把它们判为删除
+    scope = dict(CONFIG, include=[], max_depth=3, sitemap_only=False)
+    manifest = Manifest(tmp_path / 'manifest.db')
+    manifest.begin(scope)
+    manifest.record(A, 'alpha')
+    manifest.record(C, 'deep page')
+    manifest.finish()
+
+    with pytest.raises(ValueError):
+        manifest.begin(dict(scope, max_depth=1))
+    with pytest.raises(ValueError):
+        manifest.begin(dict(scope, sitemap_only=True))
+    assert manifest.get(C) is not None
+    assert manifest.begin(scope) == 2
+
+
+def test_check_revalidates_with_callback(tmp_path):
+    manifest = Manifest(tmp_path / 'manifest.db')
+    manifest.begin(CONFIG)
+    manifest.record(A, 'alpha', validators={'etag': '"v1"'}, lastmod='2024-01-02')
+    manifest.record(B, 'beta')  # 没有校验器，不发条件请求
+    manifest.finish()
+
+    manifest.begin(CONFIG)
+    calls = []
+
+    def revalidate(url, etag, last_modified):
+        calls.append((url, etag, last_modified))
+        return True
+
+    assert manifest.check(A, '2024-01-02', revalidate) is not None  # lastmod 未变，不发请求
+    assert manifest.check(A, '2024-03-01', revalidate) is not None
+    assert manifest.check(B, None, revalidate) is None
+    assert calls == [(A, '"v1"', None)]
+    assert manifest.check(A, '2024-03-01', lambda *args: False) is None
@@ -0,0 +1,76 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from jsonl_sink import COMPRESSION_SUFFIXES, JSONLSink, iter_jsonl, jsonl_path, zstandard
+
+PAGES = [{'url': f'https://example.com/{i}', 'content': f'页面 {i}', 'links': {'b', 'a'}}
+         for i in range(5)]
+
+
+def test_jsonl_path_mapping():
+    assert jsonl_path(Path('out/crawl.md')) == Path('out/crawl.jsonl')
+    assert jsonl_path(Path('out/crawl.md'), 'gzip') == Path('out/crawl.jsonl.gz')
+    assert jsonl_path(Path('out/crawl.md'), 'zstd') == Path('out/crawl.jsonl.zst')
+    assert set(COMPRESSION_SUFFIXES) == {'gzip', 'zstd'}
+
+
+def test_gzip_write_and_read_back(tmp_path):
+    path = jsonl_path(tmp_path / 'crawl.md', 'gzip')
+    with JSONLSink(path) as sink:
+        for page in PAGES:
+            sink.write(page)
+    assert sink.count == 5
+    assert gzip.decompress(path.read_bytes()).count(b'\n') == 5
+
+    records = list(iter_jsonl(path))
+    assert [r['url'] for r in records] == [p['url'] for p in PAGES]
+    assert records[0]['links'] == ['a', 'b']
+    assert records[0]['content'] == '页面 0'
+
+
+def test_append_dedups_by_url(tmp_path):
+    # 断点续爬追加写入：gzip 形成多成员文件，重复 URL 只取第一条
+    path = tmp_path / 'crawl.jsonl.gz'
+    with JSONLSink(path) as sink:
+        sink.write(PAGES[0])
+    with JSONLSink(path, append=True) as sink:
+        sink.write(dict(PAGES[0], content='retry'))
+        sink.write(PAGES[1])
+    records = list(iter_jsonl(path))
+    assert [r['content'] for r in records] == ['页面 0', '页面 1']
+    assert len(list(iter_jsonl(path, unique_key=None))) == 3
+
+
+def test_truncated_trailing_record(tmp_path):
+    path = tmp_path / 'crawl.jsonl'
+    with JSONLSink(path) as sink:
+        for page in PAGES[:3]:
+            sink.write(page)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"url": "https://example.com/cut", "content": "半')
+    assert [r['url'] for r in iter_jsonl(path)] == [p['url'] for p in PAGES[:3]]
+
+
+def test_truncated_gzip_stream(tmp_path):
+    # 崩溃时没有写入 gzip 尾部：已刷新的记录仍可读出
+    path = tmp_path / 'crawl.jsonl.gz'
+    sink = JSONLSink(path, flush_every=1)
+    for page in PAGES[:3]:
+        sink.write(page)
+    data = path.read_bytes()
+    sink.close()
+
+    crashed = tmp_path / 'crashed.jsonl.gz'
+    crashed.write_bytes(data)
+    assert [r['url'] for r in iter_jsonl(crashed)] == [p['url'] for p in PAGES[:3]]
+
+
+@pytest.mark.skipif(zstandard is None, reason='需要 zstandard')
+def test_zstd_write_and_read_back(tmp_path):
+    path = jsonl_path(tmp_path / 'crawl.md', 'zstd')
+    with JSONLSink(path) as sink:
+        for page in PAGES:
+            sink.write(page)
+    assert [r['url'] for r in iter_jsonl(path)] == [p['url'] for p in PAGES]
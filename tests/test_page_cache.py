@@ -0,0 +1,83 @@
+import types
+
+import pytest
+
+import page_cache
+from page_cache import PageCache, cache_key
+
+URL = 'https://example.com/docs/guide'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 固定时钟：TTL 和 LRU 都按 time.time() 判断
+    fake = types.SimpleNamespace(now=1000.0)
+    fake.time = lambda: fake.now
+    monkeypatch.setattr(page_cache, 'time', fake)
+    return fake
+
+
+def _result(url, content='body', validators=None):
+    return {'url': url, 'title': 'Title', 'content': content, 'links': {f'{url}/next'},
+            'status': 200, 'validators': validators or {}}
+
+
+def test_cache_key_normalisation():
+    assert cache_key('HTTPS://Example.COM/docs/?b=2&a=1#intro') == 'https://example.com/docs?a=1&b=2'
+    assert cache_key('https://example.com') == 'https://example.com/'
+    assert cache_key('https://example.com/') == 'https://example.com/'
+    assert cache_key('https://example.com/Docs') != cache_key('https://example.com/docs')
+
+
+def test_fresh_hit_and_ttl_expiry(tmp_path, clock):
+    cache = PageCache(tmp_path / 'cache.db', ttl=60)
+    cache.store(_result(URL))
+    hit = cache.lookup(URL + '/#top')
+    assert hit['from_cache'] and hit['links'] == {f'{URL}/next'}
+
+    # 过期且没有校验器：is_not_modified 不发请求，直接未命中
+    clock.now += 61
+    assert cache.lookup(URL) is None
+    assert cache.stats == {'hits': 1, 'revalidated': 0, 'misses': 1}
+    cache.close()
+
+
+def test_validators_are_stored_and_reused(tmp_path, clock, monkeypatch):
+    calls = []
+
+    def not_modified(url, etag=None, last_modified=None):
+        calls.append((url, etag, last_modified))
+        return True
+
+    monkeypatch.setattr(page_cache, 'is_not_modified', not_modified)
+    cache = PageCache(tmp_path / 'cache.db', ttl=60)
+    validators = {'etag': '"v1"', 'last_modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    cache.store(_result(URL, validators=validators))
+
+    clock.now += 61
+    hit = cache.lookup(URL)
+    assert calls == [(URL, '"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT')]
+    assert hit['validators'] == validators
+    assert cache.stats['revalidated'] == 1
+
+    # 304 后刷新了存储时间，TTL 内不再重验
+    clock.now += 30
+    assert cache.lookup(URL) is not None
+    assert len(calls) == 1
+    cache.close()
+
+
+def test_lru_eviction_at_size_cap(tmp_path, clock):
+    cache = PageCache(tmp_path / 'cache.db', ttl=3600, max_entries=2)
+    cache.store(_result('https://example.com/a'))
+    clock.now += 1
+    cache.store(_result('https://example.com/b'))
+    clock.now += 1
+    cache.lookup('https://example.com/a')  # a 最近被访问，b 成为最久未访问
+    clock.now += 1
+    cache.store(_result('https://example.com/c'))
+
+    assert cache.lookup('https://example.com/b') is None
+    assert cache.lookup('https://example.com/a') is not None
+    assert cache.lookup('https://example.com/c') is not None
+    cache.close()
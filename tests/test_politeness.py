@@ -0,0 +1,57 @@
+from politeness import DEFAULT_RATE, PolitenessScheduler, TokenBucket, parse_retry_after
+
+URL = 'https://example.com/page'
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    now = bucket.updated
+    assert [bucket.take(now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(now) == 0.5  # 下一个令牌 1/rate 秒后
+    assert bucket.take(now + 0.5) == 0.0
+    # 空闲再久也只攒到容量上限
+    assert [bucket.take(now + 100) for _ in range(4)][-1] > 0
+
+
+def test_token_bucket_unlimited():
+    bucket = TokenBucket(rate=0, capacity=1)
+    assert all(bucket.take(bucket.updated) == 0.0 for _ in range(100))
+
+
+def test_rate_limiting_is_opt_in():
+    assert DEFAULT_RATE == 0
+    scheduler = PolitenessScheduler(respect_robots=False)
+    assert '不限速' in scheduler.describe()
+
+
+def test_host_concurrency_limit():
+    scheduler = PolitenessScheduler(rate=0, host_concurrency=2, respect_robots=False)
+    host = 'example.com'
+    with scheduler._lock:
+        assert scheduler._try_acquire(host) == 0
+        assert scheduler._try_acquire(host) == 0
+        assert scheduler._try_acquire(host) > 0
+        assert scheduler._try_acquire('other.example') == 0
+    scheduler._release(host)
+    with scheduler._lock:
+        assert scheduler._try_acquire(host) == 0
+
+
+def test_backoff_halves_rate_and_blocks_host():
+    scheduler = PolitenessScheduler(rate=4.0, respect_robots=False)
+    scheduler.report(URL, 429, {'retry-after': '30'})
+    state = scheduler._hosts['example.com']
+    assert state.bucket.rate == 2.0
+    with scheduler._lock:
+        assert scheduler._try_acquire('example.com') > 25
+    # 成功后逐步恢复到目标速率
+    for _ in range(20):
+        scheduler.report(URL, 200)
+    assert state.bucket.rate == 4.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,82 @@
+import random
+
+from retry_policy import (CircuitBreaker, FetchError, RetryPolicy, NOT_FOUND, OK, RATE_LIMITED,
+                          SERVER_ERROR, TIMEOUT, outcome_for_status)
+
+URL = 'https://example.com/page'
+
+
+def test_outcome_for_status():
+    assert outcome_for_status(200) == OK
+    assert outcome_for_status(404) == NOT_FOUND
+    assert outcome_for_status(429) == RATE_LIMITED
+    assert outcome_for_status(503) == SERVER_ERROR
+
+
+def test_policy_never_retries_not_found():
+    policy = RetryPolicy(max_attempts=5)
+    assert not policy.should_retry(NOT_FOUND, 0)
+    assert policy.should_retry(TIMEOUT, 0)
+
+
+def test_policy_respects_max_attempts():
+    policy = RetryPolicy(max_attempts=2)
+    assert policy.should_retry(SERVER_ERROR, 0)
+    assert not policy.should_retry(SERVER_ERROR, 1)
+
+
+def test_delay_is_capped_and_honours_retry_after():
+    policy = RetryPolicy(jitter=False)
+    delays = [policy.delay(SERVER_ERROR, attempt) for attempt in range(10)]
+    assert delays == sorted(delays)
+    assert delays[-1] == delays[-2]  # 达到上限
+    jittered = RetryPolicy(rng=random.Random(0))
+    assert 0 <= jittered.delay(SERVER_ERROR, 1) <= policy.delay(SERVER_ERROR, 1)
+    assert policy.delay(RATE_LIMITED, 0, retry_after=7) >= 7
+
+
+def test_fetch_error_keeps_outcome():
+    error = FetchError(TIMEOUT, 'slow', status=None)
+    assert error.outcome == TIMEOUT
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    for _ in range(2):
+        breaker.record(URL, SERVER_ERROR)
+    assert breaker.allow(URL)
+    breaker.record(URL, SERVER_ERROR)
+    assert breaker.is_open(URL)
+    assert not breaker.allow(URL)
+    assert breaker.allow('https://other.example/page')  # 按主机隔离
+    assert breaker.get_stats() == {'opened': 1, 'rejected': 1, 'open_hosts': 1}
+
+
+def test_page_level_failures_do_not_open():
+    breaker = CircuitBreaker(threshold=2)
+    for _ in range(5):
+        breaker.record(URL, NOT_FOUND)
+    assert not breaker.is_open(URL)
+
+
+def test_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker(threshold=1, cooldown=0)
+    breaker.record(URL, TIMEOUT)
+    assert breaker.is_open(URL)
+    # 冷却结束：只放行一个探测请求
+    assert breaker.allow(URL)
+    assert not breaker.allow(URL)
+    breaker.record(URL, OK)
+    assert not breaker.is_open(URL)
+    assert breaker.allow(URL) and breaker.allow(URL)
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    breaker.record(URL, TIMEOUT)
+    breaker._hosts['example.com'].opened_at -= 60  # 冷却期已过
+    assert breaker.allow(URL)
+    breaker.record(URL, TIMEOUT)
+    assert breaker.is_open(URL)
+    assert not breaker.allow(URL)
+    assert breaker.get_stats()['opened'] == 1  # 重新熔断不重复计数
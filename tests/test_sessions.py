@@ -0,0 +1,86 @@
+import os
+import stat
+import time
+
+from sessions import SessionStore, _cookie_matches
+
+NOW = 1_700_000_000.0
+
+
+def _cookie(**kwargs):
+    cookie = {'name': 'sid', 'value': 'abc', 'domain': '.example.com', 'path': '/',
+              'secure': False, 'expires': -1}
+    cookie.update(kwargs)
+    return cookie
+
+
+def test_cookie_matches_domain_suffix():
+    assert _cookie_matches(_cookie(), 'example.com', '/', False, NOW)
+    assert _cookie_matches(_cookie(), 'docs.example.com', '/', False, NOW)
+    assert not _cookie_matches(_cookie(), 'badexample.com', '/', False, NOW)
+    assert not _cookie_matches(_cookie(domain='docs.example.com'), 'example.com', '/', False, NOW)
+
+
+def test_cookie_matches_path_secure_expiry():
+    assert _cookie_matches(_cookie(path='/docs'), 'example.com', '/docs/guide', False, NOW)
+    assert not _cookie_matches(_cookie(path='/docs'), 'example.com', '/blog', False, NOW)
+    assert not _cookie_matches(_cookie(secure=True), 'example.com', '/', False, NOW)
+    assert _cookie_matches(_cookie(secure=True), 'example.com', '/', True, NOW)
+    assert _cookie_matches(_cookie(expires=NOW + 60), 'example.com', '/', False, NOW)
+    assert not _cookie_matches(_cookie(expires=NOW - 60), 'example.com', '/', False, NOW)
+    assert _cookie_matches(_cookie(expires=None), 'example.com', '/', False, NOW)
+
+
+def _record(cookies, saved_at=None):
+    return {'host': 'example.com', 'saved_at': saved_at or time.time(), 'state': {'cookies': cookies}}
+
+
+def test_is_expired_by_ttl_and_persistent_cookies(tmp_path):
+    store = SessionStore(tmp_path)
+    # 只有会话 Cookie（expires=-1）：不按 Cookie 判断过期
+    assert not store.is_expired(_record([_cookie()]))
+    assert not store.is_expired(_record([_cookie(expires=time.time() + 3600)]))
+    # 所有持久 Cookie 都已过期才算过期
+    assert not store.is_expired(_record([_cookie(expires=time.time() - 10),
+                                         _cookie(expires=time.time() + 3600)]))
+    assert store.is_expired(_record([_cookie(), _cookie(expires=time.time() - 10)]))
+
+    store = SessionStore(tmp_path, ttl=60)
+    assert not store.is_expired(_record([_cookie()], saved_at=time.time() - 30))
+    assert store.is_expired(_record([_cookie()], saved_at=time.time() - 120))
+
+
+def test_host_for_parent_domain(tmp_path):
+    store = SessionStore(tmp_path)
+    store.save('example.com', {'cookies': [_cookie()]})
+    store.save('localhost:8080', {'cookies': []})
+    assert store._host_for('https://docs.example.com/guide') == 'example.com'
+    assert store._host_for('https://example.com/') == 'example.com'
+    assert store._host_for('http://localhost:8080/') == 'localhost:8080'
+    # 不回退到顶级域名
+    assert store._host_for('https://other.com/') is None
+
+
+def test_save_writes_private_file(tmp_path):
+    store = SessionStore(tmp_path / 'sessions')
+    store.save('example.com', {'cookies': [_cookie()]}, login_url='https://example.com/login')
+    path = store.path_for('example.com')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert not path.with_suffix('.tmp').exists()
+
+    # 再次保存沿用原来的 login_url
+    store.save('example.com', {'cookies': []})
+    assert SessionStore(tmp_path / 'sessions').load('example.com')['login_url'] == 'https://example.com/login'
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_cookie_header_filters_cookies(tmp_path):
+    store = SessionStore(tmp_path)
+    store.save('example.com', {'cookies': [
+        _cookie(),
+        _cookie(name='secure', secure=True),
+        _cookie(name='docs', path='/docs'),
+    ]})
+    assert store.cookie_header('http://www.example.com/docs/a') == 'sid=abc; docs=abc'
+    assert store.cookie_header('https://example.com/') == 'sid=abc; secure=abc'
+    assert store.cookie_header('https://other.com/') is None
@@ -0,0 +1,44 @@
+import pytest
+
+from sharding import ShardedFrontier, shard_of, split_limits
+
+
+def test_split_limits_sums_to_limit():
+    for limit in range(3, 20):
+        for shards in range(1, limit + 1):
+            limits = split_limits(2.0, limit, shards, 'url')
+            assert len(limits) == shards
+            assert sum(concurrency for _, concurrency in limits) == limit
+            assert min(concurrency for _, concurrency in limits) >= 1
+            assert sum(rate for rate, _ in limits) == pytest.approx(2.0)
+
+
+def test_split_limits_remainder_goes_to_first_shards():
+    assert [c for _, c in split_limits(0, 5, 3, 'url')] == [2, 2, 1]
+
+
+def test_split_limits_by_host_is_unchanged():
+    assert split_limits(1.0, 2, 4, 'host') == [(1.0, 2)] * 4
+
+
+def test_split_limits_rejects_more_shards_than_slots():
+    with pytest.raises(ValueError):
+        split_limits(0, 2, 3, 'url')
+
+
+def test_shard_of_host_keeps_host_together():
+    urls = [f'https://docs.example.com/page/{i}' for i in range(20)]
+    assert len({shard_of(url, 4, 'host') for url in urls}) == 1
+    assert len({shard_of(url, 4, 'url') for url in urls}) > 1
+
+
+def test_sharded_frontier_routes_by_shard():
+    frontier = ShardedFrontier(3)
+    urls = [f'https://example.com/page/{i}' for i in range(30)]
+    frontier.extend((url, 1) for url in urls)
+    assert len(frontier) == 30
+    for shard in range(3):
+        while frontier.frontiers[shard]:
+            url, _ = frontier.popleft(shard)
+            assert shard_of(url, 3, 'url') == shard
+    assert not frontier
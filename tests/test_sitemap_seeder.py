@@ -0,0 +1,66 @@
+import gzip
+
+from sitemap_seeder import iter_sitemap, seed_urls
+
+BASE = 'https://example.com'
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _urlset(*entries):
+    body = ''.join(
+        f'<url><loc>{loc}</loc>' + (f'<lastmod>{lastmod}</lastmod>' if lastmod else '') + '</url>'
+        for loc, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{body}</urlset>'.encode()
+
+
+def _index(*locs):
+    body = ''.join(f'<sitemap><loc>{loc}</loc></sitemap>' for loc in locs)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{body}</sitemapindex>'.encode()
+
+
+def _sitemaps(tmp_path):
+    # 本地文件走 file:// 协议，经过真实的 _open（包括 gzip 魔数判断）
+    (tmp_path / 'docs.xml').write_bytes(_urlset(
+        (f'{BASE}/docs/a', '2024-01-02'), (f'{BASE}/docs/b', None), (f'{BASE}/blog/x', '2024-03-04')))
+    # 压缩内容但扩展名是 .xml：只能靠魔数识别
+    (tmp_path / 'more.xml').write_bytes(gzip.compress(_urlset(
+        (f'{BASE}/docs/c', '2024-05-06'), (f'{BASE}/docs/a', '2024-01-02'))))
+    (tmp_path / 'index.xml').write_bytes(_index('docs.xml', 'more.xml'))
+    return (tmp_path / 'index.xml').as_uri()
+
+
+def test_iter_sitemap_yields_kind_loc_lastmod(tmp_path):
+    index = _sitemaps(tmp_path)
+    assert list(iter_sitemap(index)) == [('sitemap', 'docs.xml', None), ('sitemap', 'more.xml', None)]
+    assert list(iter_sitemap((tmp_path / 'more.xml').as_uri())) == [
+        ('url', f'{BASE}/docs/c', '2024-05-06'), ('url', f'{BASE}/docs/a', '2024-01-02')]
+
+
+def test_index_expansion_and_lastmod(tmp_path):
+    entries = seed_urls(BASE, limit=100, sitemap_urls=[_sitemaps(tmp_path)])
+    # 子 sitemap 按 index 顺序展开，重复 URL 只保留第一次
+    assert entries == [
+        {'url': f'{BASE}/docs/a', 'lastmod': '2024-01-02'},
+        {'url': f'{BASE}/docs/b', 'lastmod': None},
+        {'url': f'{BASE}/blog/x', 'lastmod': '2024-03-04'},
+        {'url': f'{BASE}/docs/c', 'lastmod': '2024-05-06'},
+    ]
+
+
+def test_limit_and_scope(tmp_path):
+    index = _sitemaps(tmp_path)
+    in_docs = lambda url: url.startswith(f'{BASE}/docs/')
+    entries = seed_urls(BASE, limit=100, in_scope=in_docs, sitemap_urls=[index])
+    assert [e['url'] for e in entries] == [f'{BASE}/docs/a', f'{BASE}/docs/b', f'{BASE}/docs/c']
+
+    entries = seed_urls(BASE, limit=2, in_scope=in_docs, sitemap_urls=[index])
+    assert [e['url'] for e in entries] == [f'{BASE}/docs/a', f'{BASE}/docs/b']
+
+
+def test_broken_sitemap_is_skipped(tmp_path, capsys):
+    (tmp_path / 'broken.xml').write_bytes(b'<urlset><url><loc>')
+    (tmp_path / 'ok.xml').write_bytes(_urlset((f'{BASE}/docs/a', None)))
+    entries = seed_urls(BASE, limit=10, sitemap_urls=[
+        (tmp_path / 'broken.xml').as_uri(), (tmp_path / 'missing.xml').as_uri(), (tmp_path / 'ok.xml').as_uri()])
+    assert entries == [{'url': f'{BASE}/docs/a', 'lastmod': None}]
+    assert capsys.readouterr().out.count('sitemap 读取失败') == 2
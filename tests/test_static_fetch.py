@@ -0,0 +1,74 @@
+from readiness import CONTENT_SELECTORS
+from static_fetch import (CONTENT_CANDIDATES, STATIC_MIN_CONTENT, looks_like_js_shell, parse_html)
+
+BASE = 'https://example.com/docs/guide'
+PARAGRAPH = 'Static documentation text explains how the crawler extracts content. ' * 12
+
+ARTICLE = f"""<!doctype html>
+<html><head><title>Guide &amp; Reference</title><script src="/app.js"></script></head>
+<body>
+  <nav><a href="/docs/">Docs</a><a href="#top">Top</a></nav>
+  <div class="sidebar">Sidebar links that are not part of the main content.</div>
+  <main>
+    <h1>Guide</h1>
+    <p>{PARAGRAPH}</p>
+    <h2>Install</h2>
+    <pre><code class="language-bash">pip install crawler</code></pre>
+    <a href="install">Install page</a>
+  </main>
+  <footer>Footer text</footer>
+</body></html>
+"""
+
+JS_SHELL = """<!doctype html>
+<html><head><title>App</title><script src="/static/js/main.js"></script></head>
+<body><noscript>You need to enable JavaScript to run this app.</noscript>
+<div id="root"></div></body></html>
+"""
+
+
+def test_candidates_follow_shared_selectors():
+    assert len(CONTENT_CANDIDATES) == len(CONTENT_SELECTORS)
+    assert CONTENT_CANDIDATES[:3] == [('main', None, None), ('article', None, None),
+                                      (None, 'role', 'main')]
+    assert (None, 'class', 'content') in CONTENT_CANDIDATES
+    assert (None, 'id', 'content') in CONTENT_CANDIDATES
+
+
+def test_parse_real_content():
+    parsed = parse_html(ARTICLE, BASE)
+    assert parsed['title'] == 'Guide & Reference'
+    assert parsed['content'].startswith('Guide')
+    assert 'Sidebar links' not in parsed['content']
+    assert 'Footer text' not in parsed['content']
+    assert len(parsed['content']) > STATIC_MIN_CONTENT
+    assert [h['text'] for h in parsed['headings']] == ['Guide', 'Install']
+    assert parsed['code_blocks'][0]['language'] == 'bash'
+    hrefs = {a['href']: a['region'] for a in parsed['anchors']}
+    assert hrefs == {'https://example.com/docs/': 'nav', 'https://example.com/docs/install': 'body'}
+    assert not looks_like_js_shell(ARTICLE, parsed['content'])
+
+
+def test_js_shell_escalates():
+    parsed = parse_html(JS_SHELL, BASE)
+    assert len(parsed['content']) < STATIC_MIN_CONTENT
+    assert looks_like_js_shell(JS_SHELL, parsed['content'])
+
+
+def test_many_scripts_and_little_text_is_a_shell():
+    html = '<html><body>' + '<script>var x = 1;</script>' * 12 + '<p>Loading</p>' + 'x' * 5000 + '</body></html>'
+    assert looks_like_js_shell(html, 'Loading')
+
+
+def test_candidate_priority():
+    # main 优先于 article；正文不够长时依次尝试后面的候选
+    html = (f'<body><article>{PARAGRAPH} article</article>'
+            f'<main>{PARAGRAPH} main</main></body>')
+    assert parse_html(html, BASE)['content'].endswith('main')
+
+    html = (f'<body><div class="content">{PARAGRAPH} content</div>'
+            f'<div role="main">{PARAGRAPH} aria</div></body>')
+    assert parse_html(html, BASE)['content'].endswith('aria')
+
+    html = f'<body><main>short</main><div id="content">{PARAGRAPH} fallback</div></body>'
+    assert parse_html(html, BASE)['content'].endswith('fallback')
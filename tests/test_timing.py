@@ -0,0 +1,38 @@
+from timing import TimingRecorder
+
+
+def _record(recorder, url, static_ms):
+    timer = recorder.start(url)
+    timer.add('static', static_ms)
+    recorder.finish(timer)
+
+
+def test_report_percentiles_by_phase_and_host():
+    recorder = TimingRecorder()
+    for ms in range(1, 101):
+        _record(recorder, f'https://a.example/{ms}', ms)
+    _record(recorder, 'https://b.example/', 500)
+    report = recorder.report()
+    assert report['pages'] == 101
+    assert report['phases']['static']['count'] == 101
+    assert set(report['hosts']) == {'a.example', 'b.example'}
+    assert report['hosts']['a.example']['static']['p50_ms'] <= 51
+    assert list(report['phases']) == ['static', 'total']
+
+
+def test_prometheus_rollup_is_a_separate_metric(tmp_path):
+    recorder = TimingRecorder()
+    _record(recorder, 'https://a.example/1', 10)
+    _record(recorder, 'https://b.example/1', 30)
+    path = tmp_path / 'crawl.prom'
+    recorder.write_prometheus(str(path))
+    lines = path.read_text().splitlines()
+
+    # 按主机的 _count 相加等于页面数，汇总不混在同一指标里
+    per_host = [l for l in lines if l.startswith('crawl_phase_seconds_count{') and 'phase="static"' in l]
+    assert sum(int(l.rsplit(' ', 1)[1]) for l in per_host) == 2
+    assert not any('host=""' in l for l in lines)
+    assert 'crawl_phase_seconds_all_count{job="crawl",phase="static"} 2' in lines
+    assert '# TYPE crawl_pages gauge' in lines
+    assert 'crawl_pages{job="crawl"} 2' in lines
+    assert not (tmp_path / 'crawl.prom.tmp').exists()
@@ -0,0 +1,59 @@
+import pytest
+
+from url_seen import INITIAL_CAPACITY, BloomFilter, URLSeen, fingerprint
+
+
+def test_fingerprint_is_stable_and_nonzero():
+    assert fingerprint('https://example.com/') == fingerprint('https://example.com/')
+    assert fingerprint('https://example.com/a') != fingerprint('https://example.com/b')
+    assert fingerprint('') != 0
+
+
+def test_add_and_contains():
+    seen = URLSeen()
+    assert seen.add('https://example.com/a')
+    assert not seen.add('https://example.com/a')
+    assert 'https://example.com/a' in seen
+    assert 'https://example.com/b' not in seen
+    assert len(seen) == 1
+
+
+def test_resize_keeps_every_url():
+    seen = URLSeen()
+    urls = [f'https://example.com/page/{i}' for i in range(INITIAL_CAPACITY * 4)]
+    seen.update(urls)
+    assert len(seen) == len(urls)
+    assert all(url in seen for url in urls)
+    assert 'https://example.com/page/missing' not in seen
+    # 扩容后装载因子仍在上限以内
+    assert len(seen._table) >= INITIAL_CAPACITY * 4
+    assert seen.stats()['mode'] == 'exact'
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    fps = [fingerprint(f'https://example.com/{i}') for i in range(1000)]
+    for fp in fps:
+        bloom.add(fp)
+    assert all(fp in bloom for fp in fps)
+
+    false_positives = sum(fingerprint(f'https://other.example/{i}') in bloom for i in range(10000))
+    assert false_positives < 10000 * 0.01 * 3
+
+
+def test_exact_with_bloom():
+    seen = URLSeen(bloom_capacity=100)
+    seen.update(f'https://example.com/{i}' for i in range(200))
+    assert len(seen) == 200
+    assert all(f'https://example.com/{i}' in seen for i in range(200))
+    assert seen.stats()['mode'] == 'exact+bloom'
+
+
+def test_bloom_only():
+    seen = URLSeen(bloom_capacity=1000, exact=False)
+    assert seen.add('https://example.com/a')
+    assert not seen.add('https://example.com/a')
+    assert 'https://example.com/a' in seen
+    assert seen.stats()['mode'] == 'bloom'
+    with pytest.raises(ValueError):
+        URLSeen(exact=False)